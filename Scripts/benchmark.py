@@ -0,0 +1,263 @@
+import argparse
+import copy
+import gc
+import json
+import os
+import platform
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+import config_path_routes
+import numpy as np
+import pandas as pd
+import psutil
+from loguru import logger
+from Controllers.config_loader import ConfigLoader
+from Utils.escritores_functions import crear_escritores
+from Utils.perfilado_functions import MonitorRecursos
+from Utils.sinteticos_functions import GeneradorSintetico
+from Scripts.homologacion import crear_verificador
+from Scripts.procesar_insumos import ProcesarInsumos
+
+
+# Etapas medidas en cada tamaño, en orden de ejecución
+ETAPAS = ["generacion", "carga_drivers", "indice_drivers", "carga_vtas", "homologacion", "exportacion"]
+
+
+def _info_maquina() -> Dict[str, Any]:
+    return {
+        "plataforma": platform.platform(),
+        "python": platform.python_version(),
+        "cpus": os.cpu_count(),
+        "memoria_total_mb": round(psutil.virtual_memory().total / 1024**2),
+        "pandas": pd.__version__,
+        "numpy": np.__version__,
+    }
+
+
+def medir_tamano(
+    filas: int,
+    generador: GeneradorSintetico,
+    config_insumos: Dict[str, Any],
+    dict_cols: Dict[str, Any],
+    reglas: Optional[Dict[str, Any]],
+    cfg_result: Dict[str, Any],
+    dir_trabajo: Path,
+    formato_vtas: Optional[str] = None,
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Genera insumos de `filas` filas y mide cada etapa del flujo por separado.
+
+    Args:
+        filas (int): Filas de la base de ventas.
+        generador (GeneradorSintetico): Generador de insumos.
+        config_insumos (Dict[str, Any]): Sección `config_insumos` (la caché se desactiva).
+        dict_cols (Dict[str, Any]): Diccionario global de columnas.
+        reglas (Dict[str, Any] | None): Sección `reglas_homologacion`.
+        cfg_result (Dict[str, Any]): Sección `Resultados` (formatos de exportación).
+        dir_trabajo (Path): Carpeta temporal de insumos y resultados.
+        formato_vtas (str | None): Formato del insumo de ventas (ver `GeneradorSintetico.escribir`).
+
+    Returns:
+        Dict[str, Dict[str, Any]]: Resumen de `MonitorRecursos` por etapa.
+    """
+    config_insumos = copy.deepcopy(config_insumos)
+    config_insumos["cache"] = {"activo": False}
+    etapas: Dict[str, Dict[str, Any]] = {}
+
+    with MonitorRecursos("generacion") as m:
+        path_vtas, path_drivers = generador.escribir(
+            path_dir=dir_trabajo,
+            filas=filas,
+            nom_vtas=Path(config_insumos["base_vtas"]["nom_base"]).stem,
+            hoja_vtas=config_insumos["base_vtas"]["nom_hoja"],
+            nom_drivers=Path(config_insumos["drivers"]["nom_base"]).stem,
+            hoja_drivers=config_insumos["drivers"]["nom_hoja"],
+            formato_vtas=formato_vtas,
+        )
+    m.filas = filas
+    etapas["generacion"] = m.resumen()
+
+    procesador = ProcesarInsumos(config_insumos=config_insumos, dict_cols=dict_cols)
+
+    with MonitorRecursos("carga_drivers") as m:
+        df_drivers = procesador.carga_drivers(path_drivers=str(path_drivers))
+    m.filas = len(df_drivers)
+    etapas["carga_drivers"] = m.resumen()
+
+    with MonitorRecursos("indice_drivers") as m:
+        verificador = crear_verificador(df_drivers, dict_cols, reglas, cfg_canon=procesador.cfg_canon)
+    m.filas = len(df_drivers)
+    etapas["indice_drivers"] = m.resumen()
+
+    with MonitorRecursos("carga_vtas") as m:
+        df_vtas = procesador.carga_vtas(path_vtas=str(path_vtas))
+    m.filas = len(df_vtas)
+    etapas["carga_vtas"] = m.resumen()
+
+    with MonitorRecursos("homologacion") as m:
+        df_vtas = verificador.para_lote(df_vtas).aplicar()
+    m.filas = len(df_vtas)
+    etapas["homologacion"] = m.resumen()
+
+    with MonitorRecursos("exportacion") as m:
+        with crear_escritores(cfg_result, dir_trabajo / "resultado") as escritor:
+            escritor.escribir_df(df_vtas)
+    m.filas = escritor.filas
+    etapas["exportacion"] = m.resumen()
+
+    for nombre, resumen in etapas.items():
+        logger.info(
+            f"[{filas} filas] {nombre}: {resumen['segundos']:.2f} s, "
+            f"pico {resumen['rss_pico_mb']:.0f} MB, {resumen.get('filas_seg')} filas/s"
+        )
+    del df_vtas, df_drivers, verificador
+    gc.collect()
+    return etapas
+
+
+def comparar_resultados(actual: Dict[str, Any], previo: Dict[str, Any], umbral: float = 1.2) -> List[Dict[str, Any]]:
+    """
+    Compara dos resultados de benchmark por (filas, etapa) y señala las regresiones.
+
+    Args:
+        actual (Dict[str, Any]): Resultado de esta ejecución.
+        previo (Dict[str, Any]): Resultado de referencia (JSON de una ejecución anterior).
+        umbral (float): Razón actual/previo de tiempo o de pico de memoria a partir de la
+            cual la etapa se considera una regresión.
+
+    Returns:
+        List[Dict[str, Any]]: Una entrada por etapa comparable (filas, etapa, razones, regresion).
+    """
+    distintos = {
+        k for k in set(actual["parametros"]) | set(previo.get("parametros", {}))
+        if k != "filas" and actual["parametros"].get(k) != previo.get("parametros", {}).get(k)
+    }
+    if distintos:
+        logger.warning(f"La referencia se midió con otros parámetros {sorted(distintos)}; la comparación es orientativa.")
+
+    previos = {r["filas"]: r["etapas"] for r in previo.get("resultados", [])}
+    comparacion = []
+    for resultado in actual["resultados"]:
+        etapas_previas = previos.get(resultado["filas"])
+        if etapas_previas is None:
+            continue
+        for etapa, medida in resultado["etapas"].items():
+            ref = etapas_previas.get(etapa)
+            if not ref or not ref["segundos"] or not ref["rss_pico_mb"]:
+                continue
+            razon_tiempo = medida["segundos"] / ref["segundos"]
+            razon_memoria = medida["rss_pico_mb"] / ref["rss_pico_mb"]
+            fila = {
+                "filas": resultado["filas"],
+                "etapa": etapa,
+                "razon_tiempo": round(razon_tiempo, 3),
+                "razon_memoria": round(razon_memoria, 3),
+                "regresion": razon_tiempo > umbral or razon_memoria > umbral,
+            }
+            comparacion.append(fila)
+            if fila["regresion"]:
+                logger.warning(
+                    f"Regresión en {etapa} ({resultado['filas']} filas): "
+                    f"tiempo x{razon_tiempo:.2f}, memoria x{razon_memoria:.2f}"
+                )
+    return comparacion
+
+
+def ejecutar_benchmark(args: argparse.Namespace) -> Path:
+    """
+    Ejecuta el benchmark para cada tamaño pedido y guarda el resultado en JSON.
+
+    Args:
+        args (argparse.Namespace): Argumentos de línea de comandos (ver `_argumentos`).
+
+    Returns:
+        Path: Ruta del JSON de resultados.
+    """
+    config = ConfigLoader()
+    config_insumos = config.get_config("config_insumos")
+    dict_cols = config.get_config("dict_cols")
+    reglas = config.get_config("reglas_homologacion")
+    cfg_result = dict(config.get_config("Resultados"))
+    if args.formatos:
+        cfg_result["formatos"] = args.formatos
+
+    parametros = {
+        "filas": args.filas,
+        "prop_tipo_i": args.prop_tipo_i,
+        "prop_cod_hash": args.prop_cod_hash,
+        "prop_sin_asignar": args.prop_sin_asignar,
+        "prop_drv_duplicados": args.prop_drv_duplicados,
+        "formato_vtas": args.formato_vtas,
+        "formatos_resultado": cfg_result.get("formatos"),
+        "motor_excel": config_insumos.get("lectura", {}).get("motor_excel"),
+        "semilla": args.semilla,
+    }
+    generador = GeneradorSintetico(
+        cols_vtas=dict_cols["cols_ventas"],
+        cols_drivers=dict_cols["cols_drivers"],
+        prop_tipo_i=args.prop_tipo_i,
+        prop_cod_hash=args.prop_cod_hash,
+        prop_sin_asignar=args.prop_sin_asignar,
+        prop_drv_duplicados=args.prop_drv_duplicados,
+        semilla=args.semilla,
+    )
+
+    if args.dir_trabajo:
+        Path(args.dir_trabajo).mkdir(parents=True, exist_ok=True)
+    resultados = []
+    for filas in args.filas:
+        logger.info(f"Benchmark: {filas} filas")
+        with tempfile.TemporaryDirectory(prefix="benchmark_", dir=args.dir_trabajo) as dir_trabajo:
+            etapas = medir_tamano(
+                filas, generador, config_insumos, dict_cols, reglas, cfg_result,
+                Path(dir_trabajo), formato_vtas=args.formato_vtas
+            )
+        resultados.append({"filas": filas, "etapas": etapas})
+
+    resultado = {
+        "fecha": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "maquina": _info_maquina(),
+        "parametros": parametros,
+        "resultados": resultados,
+    }
+    if args.comparar:
+        previo = json.loads(Path(args.comparar).read_text(encoding="utf-8"))
+        resultado["comparacion"] = {
+            "referencia": str(args.comparar),
+            "umbral": args.umbral,
+            "etapas": comparar_resultados(resultado, previo, args.umbral),
+        }
+
+    path_salida = Path(args.salida)
+    path_salida.mkdir(parents=True, exist_ok=True)
+    path_json = path_salida / f"benchmark_{time.strftime('%Y%m%d_%H%M%S')}.json"
+    path_json.write_text(json.dumps(resultado, indent=2, ensure_ascii=False), encoding="utf-8")
+    logger.success(f"Resultados del benchmark: {path_json}")
+    return path_json
+
+
+def _argumentos() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark de carga, homologación y exportación con insumos sintéticos.")
+    parser.add_argument("--filas", type=int, nargs="+", default=[10_000, 100_000],
+                        help="Tamaños de la base de ventas (p. ej. 10000 100000 1000000 5000000).")
+    parser.add_argument("--prop-tipo-i", type=float, default=0.5, help='Proporción de Tipo de Venta "I".')
+    parser.add_argument("--prop-cod-hash", type=float, default=0.1, help='Proporción de claves de agente "#".')
+    parser.add_argument("--prop-sin-asignar", type=float, default=0.2, help='Proporción de agentes "Sin asignar".')
+    parser.add_argument("--prop-drv-duplicados", type=float, default=0.02,
+                        help="Proporción de llaves de cliente duplicadas en drivers.")
+    parser.add_argument("--formato-vtas", choices=["xlsx", "csv", "parquet"], default=None,
+                        help="Formato del insumo de ventas (por defecto xlsx si cabe en una hoja, si no parquet).")
+    parser.add_argument("--formatos", nargs="+", choices=["xlsx", "csv", "parquet"], default=None,
+                        help="Formatos de exportación (por defecto los de Resultados.formatos).")
+    parser.add_argument("--semilla", type=int, default=0)
+    parser.add_argument("--dir-trabajo", default=None, help="Carpeta para los archivos temporales.")
+    parser.add_argument("--salida", default="Benchmarks/", help="Carpeta del JSON de resultados.")
+    parser.add_argument("--comparar", default=None, help="JSON de una ejecución anterior para detectar regresiones.")
+    parser.add_argument("--umbral", type=float, default=1.2, help="Razón actual/anterior que se considera regresión.")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    ejecutar_benchmark(_argumentos())
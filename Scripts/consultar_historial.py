@@ -0,0 +1,70 @@
+import argparse
+import sys
+import time
+from pathlib import Path
+import config_path_routes
+import pandas as pd
+from loguru import logger
+from Controllers.config_loader import ConfigLoader
+from Utils.historial_functions import HistorialVentas
+
+
+def consultar(args: argparse.Namespace) -> pd.DataFrame:
+    """
+    Ejecuta la consulta pedida sobre el historial configurado en `Resultados.historial`.
+
+    Args:
+        args (argparse.Namespace): Argumentos de la línea de comandos.
+
+    Returns:
+        pd.DataFrame: Resultado de la consulta.
+    """
+    config = ConfigLoader()
+    config_insumos = config.get_config("config_insumos")
+    cfg_historial = config.get_config("Resultados").get("historial") or {}
+    path_db = Path(cfg_historial.get("path_db", "Historial/historial.sqlite"))
+    if not path_db.is_file():
+        logger.error(f"No existe el historial {path_db}; active Resultados.historial y ejecute la homologación.")
+        sys.exit(1)
+
+    historial = HistorialVentas(path_db, config_insumos["base_vtas"]["cols_vtas"])
+    try:
+        inicio = time.perf_counter()
+        if args.consulta == "cliente":
+            df = historial.historial_cliente(args.clave, todas_corridas=args.todas_corridas)
+        elif args.consulta == "agentes":
+            df = historial.totales_agente(agente=args.agente, desde=args.desde, hasta=args.hasta)
+        else:
+            df = historial.corridas()
+        logger.info(f"Consulta '{args.consulta}': {len(df)} filas en {(time.perf_counter() - inicio) * 1000:.1f} ms")
+    finally:
+        historial.cerrar()
+    return df
+
+
+def _argumentos() -> argparse.Namespace:
+    comun = argparse.ArgumentParser(add_help=False)
+    comun.add_argument("--csv", default=None, help="Guardar el resultado en este archivo CSV en lugar de mostrarlo.")
+    parser = argparse.ArgumentParser(description="Consultas sobre el historial de ventas homologadas.")
+    consultas = parser.add_subparsers(dest="consulta", required=True)
+    consultas.add_parser("corridas", parents=[comun],
+                         help="Corridas registradas (id, fecha, archivo, huella de drivers, filas).")
+    cliente = consultas.add_parser("cliente", parents=[comun], help="Status y asignación de un Cliente - Clave por periodo.")
+    cliente.add_argument("clave")
+    cliente.add_argument("--todas-corridas", action="store_true",
+                         help="Incluir cada corrida que tocó el periodo, no solo la vigente.")
+    agentes = consultas.add_parser("agentes", parents=[comun], help="Filas por status y totales de venta por agente y periodo.")
+    agentes.add_argument("--agente", default=None, help="Clave o nombre del agente.")
+    agentes.add_argument("--desde", default=None, help="Primer periodo (Año/Mes), inclusive.")
+    agentes.add_argument("--hasta", default=None, help="Último periodo (Año/Mes), inclusive.")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = _argumentos()
+    df = consultar(args)
+    if args.csv:
+        df.to_csv(args.csv, index=False, sep=";", encoding="utf-8-sig")
+    else:
+        with pd.option_context("display.max_rows", 200, "display.width", 200):
+            print(df.to_string(index=False))
@@ -0,0 +1,520 @@
+from importlib.util import find_spec
+from pathlib import Path
+from typing import TYPE_CHECKING, Callable, Dict, Any, List, Optional, Tuple
+from loguru import logger
+import numpy as np
+import pandas as pd
+from Utils.escritores_functions import EscritorMultiple, EscritorParticionado, crear_escritores
+from Utils.exclusive_functions import IndiceDrivers, VerificadorCodigos
+from Utils.historial_functions import HistorialVentas, crear_historial
+from Utils.lectores_functions import iterar_anticipado
+from Utils.incremental_functions import (
+    AlmacenDelta, AlmacenPeriodos, filas_afectadas, huella_df, huella_drivers, huella_reglas, particionar_por_periodo
+)
+from Utils.perfilado_functions import ReporteEjecucion
+from Utils.resumen_functions import ResumenSemaforo, crear_resumen
+from Scripts.procesar_insumos import ProcesarInsumos
+
+if TYPE_CHECKING:
+    from Scripts.particionado import HomologadorParticionado
+    from Utils.checkpoint_functions import AlmacenCheckpoints
+
+
+def crear_verificador(
+    df_drivers: pd.DataFrame,
+    dict_cols: Dict[str, Any],
+    reglas: Optional[Dict[str, Any]] = None,
+    motor_reglas: Optional[str] = None,
+    cfg_canon: Optional[Dict[str, Any]] = None,
+) -> VerificadorCodigos:
+    """
+    Construye un verificador base con el índice de drivers ya armado. Cada base o lote
+    de ventas se homologa con `verificador.para_lote(df).aplicar()`.
+
+    Args:
+        df_drivers (pd.DataFrame): Base de drivers.
+        dict_cols (Dict[str, Any]): Diccionario global de columnas (cols_ventas, cols_drivers).
+        reglas (Dict[str, Any] | None): Sección `reglas_homologacion` de la configuración.
+        motor_reglas (str | None): `ejecucion.motor_reglas`: "pandas" (por defecto) o "polars".
+        cfg_canon (Dict[str, Any] | None): `config_insumos.canonicalizacion`, con que se
+            normalizan las claves de ventas al buscarlas en drivers.
+
+    Returns:
+        VerificadorCodigos: Verificador sin base de ventas asociada.
+    """
+    return VerificadorCodigos(
+        df_vtas=pd.DataFrame(columns=list(dict_cols["cols_ventas"].values())),
+        df_drivers=df_drivers,
+        cols_vtas=dict_cols["cols_ventas"],
+        cols_drivers=dict_cols["cols_drivers"],
+        indice=IndiceDrivers(df_drivers, dict_cols["cols_drivers"], VerificadorCodigos.busquedas_de(reglas), cfg_canon),
+        reglas=reglas,
+        motor_reglas=motor_reglas
+    )
+
+
+def _config_busqueda(verificador: VerificadorCodigos) -> Optional[Dict[str, Any]]:
+    """
+    Reglas y normalización de claves con que se busca en drivers, para las huellas: si
+    cualquiera cambia, los resultados almacenados dejan de estar vigentes.
+    """
+    if verificador.indice.cfg_canon is None:
+        return verificador.reglas
+    return {**(verificador.reglas or {}), "canonicalizacion": verificador.indice.cfg_canon}
+
+
+def _columna_particion(alias: str, verificador: VerificadorCodigos) -> Callable[[pd.DataFrame], pd.Series]:
+    """
+    Valor de partición por fila: una columna de ventas o, si `alias` es de drivers, su valor
+    cruzado por Cliente - Clave → Cod Actual (p. ej. la Regional de cada cliente).
+    """
+    if alias in verificador.cols_vtas:
+        columna = verificador.cols_vtas[alias]
+        return lambda lote: lote[columna]
+    if alias in verificador.cols_drivers:
+        V, D = verificador.V, verificador.D
+        return lambda lote: verificador.indice.resolver(lote[V.cliente_clave], D.cod_actual, verificador.cols_drivers[alias])
+    raise ValueError(f"Columna de partición desconocida: '{alias}' (alias de cols_vtas o cols_drivers)")
+
+
+def _crear_escritores(
+    cfg_result: Dict[str, Any],
+    out_path: str,
+    cfg_concurrencia: Optional[Dict[str, Any]],
+    verificador: Optional[VerificadorCodigos] = None,
+) -> EscritorMultiple | EscritorParticionado:
+    """
+    Escritores del resultado; con `cfg_concurrencia`, en segundo plano (un hilo por formato).
+    Con `Resultados.particionado` activo, un resultado por valor de la columna de partición.
+    """
+    cfg_particionado = cfg_result.get("particionado") or {}
+    if cfg_particionado.get("activo"):
+        return EscritorParticionado(
+            cfg_result,
+            out_path,
+            _columna_particion(cfg_particionado["columna"], verificador),
+            workers=cfg_particionado.get("workers"),
+            max_filas_archivo=cfg_particionado.get("max_filas_archivo")
+        )
+    cfg_concurrencia = cfg_concurrencia or {}
+    return crear_escritores(
+        cfg_result,
+        out_path,
+        segundo_plano=bool(cfg_concurrencia.get("escritura_segundo_plano")),
+        max_pendientes=cfg_concurrencia.get("max_lotes_pendientes", 2)
+    )
+
+
+def _registrar_cruces(verificador: VerificadorCodigos, df_vtas: pd.DataFrame, reporte: ReporteEjecucion) -> None:
+    """Acumula en `reporte.datos["cruces"]` la cobertura de cada cruce con drivers (antes de homologar)."""
+    cruces = reporte.datos.setdefault("cruces", {})
+    for nombre, conteo in verificador.para_lote(df_vtas).tasas_cruce().items():
+        acumulado = cruces.setdefault(nombre, {"filas": 0, "con_clave": 0, "encontradas": 0})
+        for clave, valor in conteo.items():
+            acumulado[clave] += valor
+        acumulado["tasa"] = round(acumulado["encontradas"] / acumulado["con_clave"], 4) if acumulado["con_clave"] else None
+
+
+def _informar_cruces(reporte: ReporteEjecucion) -> None:
+    for nombre, conteo in reporte.datos.get("cruces", {}).items():
+        tasa = "-" if conteo["tasa"] is None else f"{conteo['tasa']:.1%}"
+        logger.info(
+            f"Cruce {nombre}: {conteo['encontradas']} de {conteo['con_clave']} filas con clave "
+            f"encontradas en drivers ({tasa})"
+        )
+
+
+def _crear_derivados(
+    cfg_result: Dict[str, Any], verificador: VerificadorCodigos
+) -> Tuple[Optional[ResumenSemaforo], Optional[HistorialVentas]]:
+    """Resumen del semáforo e historial de `Resultados` (None los que no están activos)."""
+    return (
+        crear_resumen(cfg_result.get("resumen"), verificador.cols_vtas),
+        crear_historial(cfg_result.get("historial"), verificador.cols_vtas),
+    )
+
+
+def _acumular_derivados(
+    resumen: Optional[ResumenSemaforo], historial: Optional[HistorialVentas], df_vtas: pd.DataFrame, reporte: ReporteEjecucion
+) -> None:
+    """Agrega una base o lote homologado al resumen y a la corrida en curso del historial."""
+    if resumen is not None:
+        with reporte.etapa("resumen") as etapa:
+            resumen.agregar(df_vtas)
+            etapa.filas = len(df_vtas)
+    if historial is not None:
+        with reporte.etapa("historial") as etapa:
+            historial.agregar(df_vtas)
+            etapa.filas = len(df_vtas)
+
+
+def _cerrar_derivados(
+    resumen: Optional[ResumenSemaforo],
+    historial: Optional[HistorialVentas],
+    cfg_result: Dict[str, Any],
+    out_path: str,
+    verificador: VerificadorCodigos,
+    path_vtas: str,
+    reporte: ReporteEjecucion,
+) -> List[Path]:
+    """
+    Escribe "<out_path> - resumen" en los formatos del resultado y registra la corrida en el
+    historial con la huella de drivers y reglas. Devuelve los archivos del resumen (ninguno
+    si no está activo).
+    """
+    paths: List[Path] = []
+    if resumen is not None:
+        with reporte.etapa("exportacion_resumen") as etapa:
+            df_resumen = resumen.resultado()
+            with crear_escritores(cfg_result, f"{out_path} - resumen") as escritor:
+                escritor.escribir_df(df_resumen)
+            etapa.filas = len(df_resumen)
+        paths = escritor.paths
+        totales = resumen.totales()
+        reporte.datos["resumen"] = {"grupos": len(df_resumen), "status": totales}
+        logger.info(f"Resumen del semáforo: {len(df_resumen)} grupos, filas por status {totales}")
+    if historial is not None:
+        try:
+            with reporte.etapa("historial"):
+                id_corrida = historial.confirmar(
+                    Path(path_vtas).name, huella_drivers(verificador.df_drivers, _config_busqueda(verificador))
+                )
+            reporte.datos["historial"] = {"id_corrida": id_corrida, "filas": historial.filas, "path": str(historial.path)}
+        finally:
+            historial.cerrar()
+    return paths
+
+
+def _derivar_resultado(
+    df_resultado: pd.DataFrame,
+    cfg_result: Dict[str, Any],
+    out_path: str,
+    verificador: VerificadorCodigos,
+    path_vtas: str,
+    reporte: ReporteEjecucion,
+) -> List[Path]:
+    """Resumen e historial de un resultado completo ya exportado (ver `_cerrar_derivados`)."""
+    resumen, historial = _crear_derivados(cfg_result, verificador)
+    _acumular_derivados(resumen, historial, df_resultado, reporte)
+    return _cerrar_derivados(resumen, historial, cfg_result, out_path, verificador, path_vtas, reporte)
+
+
+def homologar_base(
+    procesador: ProcesarInsumos,
+    verificador: VerificadorCodigos,
+    path_vtas: str,
+    cfg_result: Dict[str, Any],
+    out_path: str,
+    tam_lote: Optional[int] = None,
+    cfg_incremental: Optional[Dict[str, Any]] = None,
+    reporte: Optional[ReporteEjecucion] = None,
+    cfg_concurrencia: Optional[Dict[str, Any]] = None,
+    cfg_delta: Optional[Dict[str, Any]] = None,
+    particionado: Optional["HomologadorParticionado"] = None,
+    checkpoints: Optional["AlmacenCheckpoints"] = None,
+    reanudar: bool = False,
+) -> int:
+    """
+    Homologa una base de ventas contra el verificador dado y escribe el resultado.
+
+    Args:
+        procesador (ProcesarInsumos): Controlador de carga de insumos.
+        verificador (VerificadorCodigos): Verificador base (ver `crear_verificador`).
+        path_vtas (str): Ruta del insumo de ventas.
+        cfg_result (Dict[str, Any]): Sección `Resultados` de la configuración.
+        out_path (str): Ruta del resultado sin extensión.
+        tam_lote (int | None): Si se indica, la base se procesa por lotes de ese tamaño
+            (memoria acotada); si no, se carga completa en memoria.
+        cfg_incremental (Dict[str, Any] | None): Sección `ejecucion.incremental`. Si está
+            activa, solo se recalculan los periodos nuevos o modificados (ver `homologar_incremental`).
+        reporte (ReporteEjecucion | None): Reporte donde se miden las etapas carga_vtas,
+            homologacion y exportacion.
+        cfg_concurrencia (Dict[str, Any] | None): Sección `ejecucion.concurrencia`: escritura
+            en segundo plano y, por lotes, lectura anticipada del siguiente lote.
+        cfg_delta (Dict[str, Any] | None): Sección `ejecucion.delta_drivers`. Si está activa,
+            un cambio de drivers solo recalcula las filas afectadas (ver `homologar_delta`).
+        particionado (HomologadorParticionado | None): Si se indica, la base completa (o cada
+            lote) se homologa repartida por filas entre procesos. No aplica a los modos
+            incremental y delta de drivers.
+        checkpoints (AlmacenCheckpoints | None): Si se indica, la base completa se guarda
+            después de la carga y de la homologación, y los checkpoints se eliminan al
+            terminar la exportación. No aplica a los modos por lotes, incremental y delta.
+        reanudar (bool): Continuar desde el último checkpoint válido de `checkpoints`
+            (mismos insumos y configuración) en lugar de cargar y homologar desde cero.
+
+    Returns:
+        int: Número de filas homologadas.
+    """
+    reporte = reporte or ReporteEjecucion()
+    incremental = bool(cfg_incremental and cfg_incremental.get("activo"))
+    delta = bool(cfg_delta and cfg_delta.get("activo"))
+    if (incremental or delta) and find_spec("pyarrow") is None:
+        logger.warning("Los modos incremental y delta de drivers requieren pyarrow. Se homologará la base completa.")
+    elif incremental or delta:
+        if tam_lote:
+            logger.warning("Los modos incremental y delta de drivers cargan la base completa; se ignora el modo streaming.")
+        if delta:
+            if incremental:
+                logger.warning("Delta de drivers e incremental activos a la vez; se usa delta de drivers.")
+            return homologar_delta(
+                procesador=procesador,
+                verificador=verificador,
+                path_vtas=path_vtas,
+                cfg_result=cfg_result,
+                out_path=out_path,
+                cfg_delta=cfg_delta,
+                reporte=reporte,
+                cfg_concurrencia=cfg_concurrencia
+            )
+        return homologar_incremental(
+            procesador=procesador,
+            verificador=verificador,
+            path_vtas=path_vtas,
+            cfg_result=cfg_result,
+            out_path=out_path,
+            cfg_incremental=cfg_incremental,
+            reporte=reporte,
+            cfg_concurrencia=cfg_concurrencia
+        )
+
+    resumen, historial = _crear_derivados(cfg_result, verificador)
+    with _crear_escritores(cfg_result, out_path, cfg_concurrencia, verificador) as escritor:
+        if tam_lote:
+            logger.info(f"Homologación por lotes de {tam_lote} filas → {out_path}")
+            lotes = procesador.iter_lotes_vtas(path_vtas=path_vtas, tam_lote=tam_lote)
+            if cfg_concurrencia and cfg_concurrencia.get("lectura_anticipada"):
+                lotes = iterar_anticipado(lotes, cfg_concurrencia.get("max_lotes_pendientes", 2))
+            while True:
+                with reporte.etapa("carga_vtas") as etapa:
+                    lote = next(lotes, None)
+                    etapa.filas = 0 if lote is None else len(lote)
+                if lote is None:
+                    break
+                with reporte.etapa("homologacion") as etapa:
+                    _registrar_cruces(verificador, lote, reporte)
+                    lote = particionado.aplicar(lote) if particionado else verificador.para_lote(lote).aplicar()
+                    etapa.filas = len(lote)
+                _acumular_derivados(resumen, historial, lote, reporte)
+                with reporte.etapa("exportacion") as etapa:
+                    escritor.escribir_lote(lote)
+                    etapa.filas = len(lote)
+                logger.info(f"Lote procesado: {escritor.filas} filas acumuladas")
+            with reporte.etapa("exportacion"):
+                escritor.esperar()
+        else:
+            desde = checkpoints.ultima_valida() if checkpoints and reanudar else None
+            if desde:
+                logger.info(f"Reanudando desde el checkpoint '{desde}'")
+                reporte.datos["reanudado_desde"] = desde
+            with reporte.etapa("carga_vtas") as etapa:
+                if desde:
+                    df_vtas = checkpoints.cargar(desde)
+                else:
+                    df_vtas = procesador.carga_vtas(path_vtas=path_vtas)
+                    if checkpoints:
+                        checkpoints.guardar("carga_vtas", df_vtas)
+                etapa.filas = len(df_vtas)
+            if desde != "homologacion":
+                with reporte.etapa("homologacion") as etapa:
+                    _registrar_cruces(verificador, df_vtas, reporte)
+                    df_vtas = particionado.aplicar(df_vtas) if particionado else verificador.para_lote(df_vtas).aplicar()
+                    if checkpoints:
+                        checkpoints.guardar("homologacion", df_vtas)
+                    etapa.filas = len(df_vtas)
+            _acumular_derivados(resumen, historial, df_vtas, reporte)
+            logger.info(f"Exportando resultado → {[str(p) for p in escritor.paths]}")
+            with reporte.etapa("exportacion") as etapa:
+                escritor.escribir_df(df_vtas)
+                escritor.esperar()
+                etapa.filas = len(df_vtas)
+        _informar_cruces(reporte)
+    _cerrar_derivados(resumen, historial, cfg_result, out_path, verificador, path_vtas, reporte)
+    if checkpoints:
+        checkpoints.limpiar()
+    return escritor.filas
+
+
+def homologar_incremental(
+    procesador: ProcesarInsumos,
+    verificador: VerificadorCodigos,
+    path_vtas: str,
+    cfg_result: Dict[str, Any],
+    out_path: str,
+    cfg_incremental: Dict[str, Any],
+    reporte: Optional[ReporteEjecucion] = None,
+    cfg_concurrencia: Optional[Dict[str, Any]] = None,
+) -> int:
+    """
+    Homologación incremental por periodo (Año/Mes).
+
+    La base se parte por periodo; cada periodo cuya huella de entrada y de drivers/reglas
+    coincide con la almacenada se reutiliza tal cual, y solo los periodos nuevos o
+    modificados pasan por el verificador. El resultado final se arma desde las particiones
+    almacenadas, en el mismo orden de filas de la base de ventas.
+
+    Si ningún periodo cambió y los archivos de la última exportación (detalle y resumen)
+    siguen intactos, no se vuelve a exportar ni se registra una corrida en el historial. La
+    base de ventas sí se carga y se resume por periodo en cada ejecución, y cuando algún
+    periodo cambia se leen todas las particiones y se reescribe el resultado completo.
+
+    Args:
+        procesador (ProcesarInsumos): Controlador de carga de insumos.
+        verificador (VerificadorCodigos): Verificador base (ver `crear_verificador`).
+        path_vtas (str): Ruta del insumo de ventas.
+        cfg_result (Dict[str, Any]): Sección `Resultados` de la configuración.
+        out_path (str): Ruta del resultado sin extensión.
+        cfg_incremental (Dict[str, Any]): Sección `ejecucion.incremental` (path_store, col_periodo).
+        reporte (ReporteEjecucion | None): Reporte donde se miden las etapas.
+        cfg_concurrencia (Dict[str, Any] | None): Sección `ejecucion.concurrencia`.
+
+    Returns:
+        int: Número de filas del resultado.
+    """
+    reporte = reporte or ReporteEjecucion()
+    col_periodo = verificador.cols_vtas[cfg_incremental.get("col_periodo", "anio_mes")]
+    almacen = AlmacenPeriodos(cfg_incremental.get("path_store", "Incremental/"), Path(path_vtas).stem)
+    huella_drv = huella_drivers(verificador.df_drivers, _config_busqueda(verificador))
+
+    with reporte.etapa("carga_vtas") as etapa:
+        df_vtas = procesador.carga_vtas(path_vtas=path_vtas)
+        etapa.filas = len(df_vtas)
+    _registrar_cruces(verificador, df_vtas, reporte)
+    _informar_cruces(reporte)
+    particiones = particionar_por_periodo(df_vtas, col_periodo)
+
+    recalculados = []
+    for periodo, posiciones in particiones.items():
+        df_periodo = df_vtas.iloc[posiciones]
+        huella_entrada = huella_df(df_periodo)
+        if almacen.vigente(periodo, huella_entrada, huella_drv):
+            continue
+        with reporte.etapa("homologacion") as etapa:
+            df_homologado = verificador.para_lote(df_periodo.copy()).aplicar()
+            almacen.guardar(periodo, df_homologado, huella_entrada, huella_drv)
+            etapa.filas = len(df_homologado)
+        recalculados.append(periodo)
+    reporte.datos["incremental"] = {"periodos": len(particiones), "recalculados": recalculados}
+    almacen.purgar(set(particiones))
+    almacen.guardar_manifiesto()
+    del df_vtas
+
+    logger.info(
+        f"Incremental: {len(recalculados)} de {len(particiones)} periodos recalculados {recalculados}; "
+        f"el resto se toma del almacén {almacen.path}"
+    )
+
+    huella_salida = almacen.huella_salida(particiones, cfg_result, out_path)
+    if not recalculados and almacen.salida_vigente(huella_salida):
+        reporte.datos["incremental"]["exportacion"] = "omitida"
+        logger.info(f"Incremental: sin cambios desde la última exportación; se conservan {[a['path'] for a in almacen.salida['archivos']]}")
+        return almacen.salida["filas"]
+
+    with reporte.etapa("exportacion") as etapa:
+        # Armar el resultado desde las particiones, en el orden original de las filas
+        df_resultado = pd.concat([almacen.leer(periodo) for periodo in particiones], ignore_index=True)
+        orden_original = np.argsort(np.concatenate(list(particiones.values())), kind="stable")
+        df_resultado = df_resultado.take(orden_original).reset_index(drop=True)
+
+        with _crear_escritores(cfg_result, out_path, cfg_concurrencia, verificador) as escritor:
+            escritor.escribir_df(df_resultado)
+            escritor.esperar()
+        etapa.filas = escritor.filas
+
+    paths_resumen = _derivar_resultado(df_resultado, cfg_result, out_path, verificador, path_vtas, reporte)
+    almacen.registrar_salida(huella_salida, [*escritor.paths, *paths_resumen], escritor.filas)
+    return escritor.filas
+
+
+def homologar_delta(
+    procesador: ProcesarInsumos,
+    verificador: VerificadorCodigos,
+    path_vtas: str,
+    cfg_result: Dict[str, Any],
+    out_path: str,
+    cfg_delta: Dict[str, Any],
+    reporte: Optional[ReporteEjecucion] = None,
+    cfg_concurrencia: Optional[Dict[str, Any]] = None,
+) -> int:
+    """
+    Homologación por delta de drivers.
+
+    Si la base de ventas y las reglas son las mismas de la ejecución anterior, los drivers
+    actuales se comparan con los almacenados y solo se recalculan las filas de ventas cuya
+    clave (Cliente - Clave → Cod Actual, Agente Comercial - Clave → Cod SAP) cambió; esas
+    filas se parchan sobre el resultado anterior. En cualquier otro caso se homologa la base
+    completa. Al final el resultado y los drivers quedan almacenados para la siguiente ejecución.
+
+    Args:
+        procesador (ProcesarInsumos): Controlador de carga de insumos.
+        verificador (VerificadorCodigos): Verificador base (ver `crear_verificador`).
+        path_vtas (str): Ruta del insumo de ventas.
+        cfg_result (Dict[str, Any]): Sección `Resultados` de la configuración.
+        out_path (str): Ruta del resultado sin extensión.
+        cfg_delta (Dict[str, Any]): Sección `ejecucion.delta_drivers` (path_store).
+        reporte (ReporteEjecucion | None): Reporte donde se miden las etapas.
+        cfg_concurrencia (Dict[str, Any] | None): Sección `ejecucion.concurrencia`.
+
+    Returns:
+        int: Número de filas del resultado.
+    """
+    reporte = reporte or ReporteEjecucion()
+    almacen = AlmacenDelta(cfg_delta.get("path_store", "Delta/"), Path(path_vtas).stem)
+
+    with reporte.etapa("carga_vtas") as etapa:
+        df_vtas = procesador.carga_vtas(path_vtas=path_vtas)
+        etapa.filas = len(df_vtas)
+    huellas = {
+        "huella_vtas": huella_df(df_vtas),
+        "huella_reglas": huella_reglas(_config_busqueda(verificador)),
+        "huella_drivers": huella_df(verificador.df_drivers),
+    }
+    _registrar_cruces(verificador, df_vtas, reporte)
+    _informar_cruces(reporte)
+
+    motivo = almacen.motivo_invalido(huellas["huella_vtas"], huellas["huella_reglas"])
+    if motivo is not None:
+        logger.info(f"Delta de drivers: {motivo}; se homologa la base completa.")
+        with reporte.etapa("homologacion") as etapa:
+            df_resultado = verificador.para_lote(df_vtas).aplicar()
+            etapa.filas = len(df_resultado)
+        info_delta = {"modo": "completo", "motivo": motivo, "filas_recalculadas": len(df_resultado)}
+    elif almacen.manifiesto.get("huella_drivers") == huellas["huella_drivers"]:
+        logger.info("Delta de drivers: sin cambios en ventas, drivers ni reglas; se reutiliza el resultado anterior.")
+        df_resultado = almacen.leer_resultado()
+        info_delta = {"modo": "sin_cambios", "filas_recalculadas": 0}
+    else:
+        with reporte.etapa("delta_drivers") as etapa:
+            posiciones, claves = filas_afectadas(
+                df_vtas,
+                almacen.leer_drivers(),
+                verificador.df_drivers,
+                verificador.busquedas(),
+                verificador.cols_vtas,
+                verificador.cols_drivers,
+                verificador.indice,
+            )
+            etapa.filas = len(posiciones)
+        logger.info(f"Delta de drivers: claves modificadas {claves}; {len(posiciones)} filas de ventas afectadas.")
+
+        with reporte.etapa("homologacion") as etapa:
+            df_resultado = almacen.leer_resultado()
+            if len(posiciones):
+                df_parche = verificador.para_lote(df_vtas.iloc[posiciones].copy()).aplicar()
+                for col in verificador.columnas_salida():
+                    valores = df_resultado[col].to_numpy(dtype=object, copy=True)
+                    valores[posiciones] = df_parche[col].to_numpy(dtype=object)
+                    df_resultado[col] = valores
+            etapa.filas = len(posiciones)
+        info_delta = {"modo": "delta", "claves_modificadas": claves, "filas_recalculadas": len(posiciones)}
+    reporte.datos["delta_drivers"] = info_delta
+    del df_vtas
+
+    with reporte.etapa("exportacion") as etapa:
+        almacen.guardar(df_resultado, verificador.df_drivers, huellas)
+        with _crear_escritores(cfg_result, out_path, cfg_concurrencia, verificador) as escritor:
+            escritor.escribir_df(df_resultado)
+            escritor.esperar()
+        etapa.filas = escritor.filas
+
+    _derivar_resultado(df_resultado, cfg_result, out_path, verificador, path_vtas, reporte)
+    return escritor.filas
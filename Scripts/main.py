@@ -1,10 +1,19 @@
+import time
+_INICIO_IMPORTACIONES = time.perf_counter()
+
+# Solo dependencias livianas al arrancar: pandas, numpy y los lectores de Excel se importan
+# después del preflight, para que un insumo mal nombrado falle sin pagar su importación.
 import os
+import sys
+from importlib.util import find_spec
 import config_path_routes
 from Controllers.config_loader import ConfigClaves, ConfigLoader
-from Utils.DataQuality_Functions import ensure_dir, resolve_existing_file, verificar_columnas
-from Utils.exclusive_functions import VerificadorCodigos
+from Utils.DataQuality_Functions import ensure_dir, resolve_existing_file, resolve_matching_files
 from Utils.logger_functions import setup_logging
-from Scripts.procesar_insumos import ProcesarInsumos
+from Utils.perfilado_functions import ReporteEjecucion, perfilar, segundos_desde_inicio_proceso
+from Utils.preflight_functions import preflight
+
+_SEGUNDOS_IMPORTACIONES = time.perf_counter() - _INICIO_IMPORTACIONES
 
 
 class Aplicacion:
@@ -15,76 +24,238 @@ class Aplicacion:
         self.get_config = self.config_loader.get_config
         self.claves = ConfigClaves(self.config_loader)
     
-    def main(self):
-        """Orquesta el flujo de trabajo de la automatización 'homologación vtas semáforo'."""
+    def main(self, reanudar: bool = False):
+        """
+        Orquesta el flujo de trabajo de la automatización 'homologación vtas semáforo'.
+
+        Args:
+            reanudar (bool): Continuar desde el último checkpoint válido de la base de ventas
+                (ver `ejecucion.checkpoints`) en lugar de cargar y homologar desde cero.
+        """
         logger = setup_logging()
+        reporte = ReporteEjecucion()
+        hasta_main = segundos_desde_inicio_proceso()
         
         # Cargar configuración
         config_insumos = self.get_config("config_insumos")
         dict_cols = self.get_config("dict_cols")
         cfg_result = self.get_config("Resultados")
         
+        reglas = self.get_config("reglas_homologacion")
+        cfg_ejecucion = self.get_config("ejecucion", por_defecto={})
+        cfg_streaming = cfg_ejecucion.get("streaming", {})
+        cfg_multicanal = cfg_ejecucion.get("multicanal", {})
+        cfg_incremental = cfg_ejecucion.get("incremental", {})
+        cfg_delta = cfg_ejecucion.get("delta_drivers", {})
+        motor_reglas = cfg_ejecucion.get("motor_reglas")
+        cfg_perfilado = cfg_ejecucion.get("perfilado", {})
+        cfg_servicio = cfg_ejecucion.get("servicio", {})
+        cfg_concurrencia = cfg_ejecucion.get("concurrencia", {})
+        cfg_particionado = cfg_ejecucion.get("particionado", {})
+        cfg_checkpoints = cfg_ejecucion.get("checkpoints", {})
+        cfg_memoria = cfg_ejecucion.get("memoria", {})
+        cfg_concurrencia = cfg_concurrencia if cfg_concurrencia.get("activo") else None
+        tam_lote = cfg_streaming["tam_lote"] if cfg_streaming.get("activo") else None
+        
+        # Preflight: configuración, carpetas, insumos y encabezados, sin importar pandas
+        with reporte.etapa("preflight"):
+            errores = preflight(self.config_loader.config)
+        if errores:
+            for error in errores:
+                logger.critical(error)
+            logger.critical(f"Preflight fallido ({len(errores)} errores); no se inicia la homologación.")
+            sys.exit(1)
+
         # Paths base
         path_insumos = ensure_dir(base_dir=config_insumos["path_insumos"])
-    
-        # Archivos independientes
-        path_vtas = resolve_existing_file(
-            base_dir=path_insumos,
-            filename=config_insumos["base_vtas"]["nom_base"]       
-        )
-        path_drivers = resolve_existing_file(
-            base_dir=path_insumos,
-            filename=config_insumos["drivers"]["nom_base"])
-
-        # Verificar insumos (carga mínima)
-        procesador_insumos = ProcesarInsumos(config_insumos=config_insumos, dict_cols=dict_cols)
-        
-        base_vtas_min, drivers_min = procesador_insumos.carga_minima(
-            path_vtas=path_vtas, 
-            path_drivers=path_drivers
-        )
-        
-        # Validación de columnas esperadas
-        verificar_columnas(
-            df=base_vtas_min,
-            columnas_esperadas=dict_cols["cols_ventas"],
-            nombre=config_insumos["base_vtas"]["nom_hoja"]
-        )
-        verificar_columnas(
-            df=drivers_min,
-            columnas_esperadas=dict_cols["cols_drivers"],
-            nombre=config_insumos["drivers"]["nom_hoja"]
-        )
-        
-        # Carga completa (misma lógica/resultado que antes)
-        df_vtas, df_drivers = procesador_insumos.carga_completa(
-            path_vtas=path_vtas, 
-            path_drivers=path_drivers
-        )
-        
-        # Extraer del dict de columnas cols de vtas
-        cols_vtas = dict_cols["cols_ventas"]
-        # Transformaciones
-        verificador = VerificadorCodigos(
-            df_vtas=df_vtas,
-            df_drivers=df_drivers,
-            cols_vtas=cols_vtas,
-            cols_drivers=dict_cols["cols_drivers"]
-        )
-        
-        df_vtas["status"] = verificador.create_col_status()
-        df_vtas[cols_vtas["codigo_ecom"]] = verificador.create_col_cod_cliente_alt()
-        df_vtas[cols_vtas["agente_comercial_clave"]] = verificador.create_col_agente_resuelta(driver_val="cod", fallback="clave")
-        df_vtas[cols_vtas["agente_comercial"]] = verificador.create_col_agente_resuelta(driver_val="nombre", fallback="nombre")
-        df_vtas["status"]  = verificador.corregir_status_sin_cod_ac() 
-        
-        # Exportar resultado
         out_dir = ensure_dir(base_dir=cfg_result["path_resultado"])
-        out_path = os.path.join(out_dir, "homologación_vtas.xlsx")
-        logger.info(f"Exportando resultado → {out_path}")
-        df_vtas.to_excel(out_path, index=False)
+        out_path = os.path.join(out_dir, cfg_result.get("nom_resultado", "homologación_vtas"))
+
+        # Importaciones pesadas (pandas, numpy, lectores), una vez superado el preflight
+        with reporte.etapa("importaciones"):
+            from Scripts.homologacion import crear_verificador, homologar_base
+            from Scripts.multicanal import homologar_multicanal
+            from Scripts.procesar_insumos import ProcesarInsumos
+            from Scripts.servicio import ServicioCarpeta
+        reporte.datos["arranque"] = {
+            "segundos_hasta_main": round(hasta_main, 4),
+            "segundos_importaciones_livianas": round(_SEGUNDOS_IMPORTACIONES, 4),
+            "segundos_preflight": round(reporte.etapas["preflight"]["segundos"], 4),
+            "segundos_importaciones_pesadas": round(reporte.etapas["importaciones"]["segundos"], 4),
+            "segundos_hasta_carga": round(segundos_desde_inicio_proceso(), 4),
+        }
+        logger.info(f"Arranque: {reporte.datos['arranque']}")
+        procesador_insumos = ProcesarInsumos(config_insumos=config_insumos, dict_cols=dict_cols)
+
+        if cfg_servicio.get("activo"):
+            # Proceso de larga duración: drivers en memoria y homologación de cada base que llegue
+            ServicioCarpeta(
+                procesador=procesador_insumos,
+                config_insumos=config_insumos,
+                dict_cols=dict_cols,
+                reglas=reglas,
+                cfg_result=cfg_result,
+                out_dir=out_dir,
+                cfg_servicio=cfg_servicio,
+                tam_lote=tam_lote,
+                cfg_incremental=cfg_incremental,
+                guardar_reporte=cfg_perfilado.get("reporte", True),
+                cfg_delta=cfg_delta,
+                motor_reglas=motor_reglas
+            ).ejecutar()
+            return
+
+        with perfilar(cfg_perfilado.get("perfilador"), out_path):
+            if cfg_multicanal.get("activo"):
+                # Varias bases de ventas (una por canal) contra una sola carga de drivers
+                archivos_vtas = resolve_matching_files(base_dir=path_insumos, patrones=cfg_multicanal["archivos"])
+                path_drivers = resolve_existing_file(
+                    base_dir=path_insumos,
+                    filename=config_insumos["drivers"]["nom_base"])
+                with reporte.etapa("carga_drivers") as etapa:
+                    df_drivers = procesador_insumos.carga_drivers(path_drivers=path_drivers)
+                    etapa.filas = len(df_drivers)
+                with reporte.etapa("multicanal") as etapa:
+                    df_resumen = homologar_multicanal(
+                        archivos_vtas=archivos_vtas,
+                        df_drivers=df_drivers,
+                        config_insumos=config_insumos,
+                        dict_cols=dict_cols,
+                        reglas=reglas,
+                        cfg_result=cfg_result,
+                        out_dir=out_dir,
+                        workers=cfg_multicanal.get("workers", 2),
+                        tam_lote=tam_lote,
+                        cfg_incremental=cfg_incremental,
+                        reporte_por_canal=cfg_perfilado.get("reporte", True),
+                        cfg_delta=cfg_delta,
+                        motor_reglas=motor_reglas
+                    )
+                    etapa.filas = int(df_resumen["filas"].sum())
+                reporte.datos["canales"] = df_resumen.to_dict(orient="records")
+            else:
+                # Archivos independientes
+                path_vtas = resolve_existing_file(
+                    base_dir=path_insumos,
+                    filename=config_insumos["base_vtas"]["nom_base"]       
+                )
+                path_drivers = resolve_existing_file(
+                    base_dir=path_insumos,
+                    filename=config_insumos["drivers"]["nom_base"])
+
+                # Plan de memoria: base completa, por lotes o lotes sin colas en memoria, según
+                # el tamaño estimado de ventas frente a la memoria disponible y el presupuesto
+                planificador = None
+                por_periodos = cfg_incremental.get("activo") or cfg_delta.get("activo")
+                if cfg_memoria.get("activo"):
+                    from Utils.memoria_functions import PlanificadorMemoria
+                    planificador = PlanificadorMemoria(cfg_memoria, config_insumos)
+                    with reporte.etapa("plan_memoria"):
+                        plan = planificador.planificar(
+                            path_vtas,
+                            tam_lote_max=cfg_streaming.get("tam_lote"),
+                            cfg_concurrencia=cfg_concurrencia
+                        )
+                    if por_periodos and plan["modo"] != "memoria":
+                        logger.warning(
+                            f"Plan de memoria '{plan['modo']}': los modos incremental y delta de drivers "
+                            "cargan la base completa; el plan no se aplica."
+                        )
+                    else:
+                        tam_lote = plan["tam_lote"]
+                        cfg_concurrencia = PlanificadorMemoria.ajustar_concurrencia(plan, cfg_concurrencia)
+                    reporte.datos["plan_memoria"] = plan
+
+                # Checkpoints por etapa de la base completa (--resume los activa)
+                checkpoints = None
+                if (cfg_checkpoints.get("activo") or reanudar) and not tam_lote and not por_periodos:
+                    if find_spec("pyarrow") is None:
+                        logger.warning("Los checkpoints requieren pyarrow. Se ejecutará sin checkpoints.")
+                    else:
+                        from Utils.checkpoint_functions import AlmacenCheckpoints, huella_ejecucion
+                        with reporte.etapa("huella_checkpoints"):
+                            huella = huella_ejecucion(
+                                paths=[path_vtas, path_drivers],
+                                config={
+                                    "config_insumos": config_insumos,
+                                    "dict_cols": dict_cols,
+                                    "reglas_homologacion": reglas,
+                                },
+                            )
+                        checkpoints = AlmacenCheckpoints(
+                            path_store=cfg_checkpoints.get("path_store", "Checkpoints/"),
+                            nombre_base=os.path.splitext(os.path.basename(path_vtas))[0],
+                            huella=huella
+                        )
+                elif reanudar:
+                    logger.warning("--resume no aplica a los modos streaming, incremental ni delta de drivers; se procesará la base desde el inicio.")
+                reanudar = bool(checkpoints and reanudar and checkpoints.ultima_valida())
+
+                # Ventas en segundo plano mientras se cargan los drivers y se arma su índice
+                if cfg_concurrencia and not tam_lote and not reanudar:
+                    procesador_insumos.precargar_vtas(path_vtas, pool=cfg_concurrencia.get("pool", "procesos"))
+
+                # Carga única de drivers e índice construido una sola vez
+                with reporte.etapa("carga_drivers") as etapa:
+                    df_drivers = procesador_insumos.carga_drivers(path_drivers=path_drivers)
+                    etapa.filas = len(df_drivers)
+                with reporte.etapa("indice_drivers") as etapa:
+                    verificador = crear_verificador(
+                        df_drivers, dict_cols, reglas, motor_reglas, procesador_insumos.cfg_canon
+                    )
+                    etapa.filas = len(df_drivers)
+
+                # Homologación repartida por filas entre procesos (drivers compartidos vía Arrow)
+                particionado = None
+                if cfg_particionado.get("activo"):
+                    if find_spec("pyarrow") is None:
+                        logger.warning("La homologación particionada requiere pyarrow. Se homologará en un solo proceso.")
+                    else:
+                        from Scripts.particionado import HomologadorParticionado
+                        particionado = HomologadorParticionado(
+                            verificador=verificador,
+                            dict_cols=dict_cols,
+                            motor_reglas=motor_reglas,
+                            workers=cfg_particionado.get("workers"),
+                            min_filas=cfg_particionado.get("min_filas", 200000)
+                        )
+                        reporte.datos["particionado"] = {"workers": particionado.workers, "min_filas": particionado.min_filas}
+
+                # Carga (completa o por lotes), homologación y exportación
+                try:
+                    filas = homologar_base(
+                        procesador=procesador_insumos,
+                        verificador=verificador,
+                        path_vtas=path_vtas,
+                        cfg_result=cfg_result,
+                        out_path=out_path,
+                        tam_lote=tam_lote,
+                        cfg_incremental=cfg_incremental,
+                        reporte=reporte,
+                        cfg_concurrencia=cfg_concurrencia,
+                        cfg_delta=cfg_delta,
+                        particionado=particionado,
+                        checkpoints=checkpoints,
+                        reanudar=reanudar
+                    )
+                    if planificador is not None:
+                        reporte.datos["plan_memoria"]["observado"] = planificador.registrar(filas)
+                finally:
+                    if particionado is not None:
+                        particionado.cerrar()
+
+        if cfg_perfilado.get("reporte", True):
+            reporte.guardar(out_path)
         
 
 if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Homologación de ventas semáforo.")
+    parser.add_argument(
+        "--resume", action="store_true",
+        help="Continuar desde el último checkpoint válido (mismos insumos y configuración)."
+    )
+    args = parser.parse_args()
     app = Aplicacion()
-    app.main()
+    app.main(reanudar=args.resume)
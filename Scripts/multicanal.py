@@ -0,0 +1,133 @@
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+from typing import Dict, Any, List, Optional
+from loguru import logger
+import os
+import time
+import pandas as pd
+from Utils.perfilado_functions import ReporteEjecucion
+from Scripts.homologacion import crear_verificador, homologar_base
+from Scripts.procesar_insumos import ProcesarInsumos
+
+
+# Estado de cada proceso trabajador: se inicializa una sola vez por proceso
+_ESTADO: Dict[str, Any] = {}
+
+
+def _inicializar_trabajador(
+    config_insumos, dict_cols, reglas, cfg_result, df_drivers, tam_lote, cfg_incremental, reporte_por_canal,
+    cfg_delta=None, motor_reglas=None
+) -> None:
+    """Construye en el proceso trabajador el procesador y el índice de drivers (una vez por proceso)."""
+    _ESTADO["procesador"] = ProcesarInsumos(config_insumos=config_insumos, dict_cols=dict_cols)
+    _ESTADO["verificador"] = crear_verificador(
+        df_drivers, dict_cols, reglas, motor_reglas, _ESTADO["procesador"].cfg_canon
+    )
+    _ESTADO["cfg_result"] = cfg_result
+    _ESTADO["tam_lote"] = tam_lote
+    _ESTADO["cfg_incremental"] = cfg_incremental
+    _ESTADO["reporte_por_canal"] = reporte_por_canal
+    _ESTADO["cfg_delta"] = cfg_delta
+
+
+def _homologar_canal(path_vtas: str, out_path: str) -> Dict[str, Any]:
+    """Homologa una base de ventas en el proceso actual y devuelve su resumen."""
+    inicio = time.perf_counter()
+    reporte = ReporteEjecucion()
+    filas = homologar_base(
+        procesador=_ESTADO["procesador"],
+        verificador=_ESTADO["verificador"],
+        path_vtas=path_vtas,
+        cfg_result=_ESTADO["cfg_result"],
+        out_path=out_path,
+        tam_lote=_ESTADO["tam_lote"],
+        cfg_incremental=_ESTADO["cfg_incremental"],
+        reporte=reporte,
+        cfg_delta=_ESTADO["cfg_delta"]
+    )
+    if _ESTADO["reporte_por_canal"]:
+        reporte.guardar(out_path)
+    return {"archivo": Path(path_vtas).name, "filas": filas, "segundos": time.perf_counter() - inicio, "estado": "OK"}
+
+
+def homologar_multicanal(
+    archivos_vtas: List[Path],
+    df_drivers: pd.DataFrame,
+    config_insumos: Dict[str, Any],
+    dict_cols: Dict[str, Any],
+    reglas: Optional[Dict[str, Any]],
+    cfg_result: Dict[str, Any],
+    out_dir: Path,
+    workers: int = 2,
+    tam_lote: Optional[int] = None,
+    cfg_incremental: Optional[Dict[str, Any]] = None,
+    reporte_por_canal: bool = True,
+    cfg_delta: Optional[Dict[str, Any]] = None,
+    motor_reglas: Optional[str] = None,
+) -> pd.DataFrame:
+    """
+    Homologa varias bases de ventas (una por canal) contra una única carga de drivers.
+
+    Los drivers se envían una sola vez a cada proceso trabajador, que arma su índice al
+    iniciar; cada base se homologa en un proceso del pool y produce su propio resultado
+    "<nom_resultado> - <nombre del archivo>". Un error en un canal no detiene a los demás.
+
+    Args:
+        archivos_vtas (List[Path]): Bases de ventas a homologar.
+        df_drivers (pd.DataFrame): Base de drivers ya cargada.
+        config_insumos (Dict[str, Any]): Sección `config_insumos`.
+        dict_cols (Dict[str, Any]): Diccionario global de columnas.
+        reglas (Dict[str, Any] | None): Sección `reglas_homologacion`.
+        cfg_result (Dict[str, Any]): Sección `Resultados`.
+        out_dir (Path): Carpeta de resultados.
+        workers (int): Número de procesos. Con 1 se procesa todo en el proceso actual.
+        tam_lote (int | None): Tamaño de lote si además se usa el modo streaming.
+        cfg_incremental (Dict[str, Any] | None): Sección `ejecucion.incremental`.
+        reporte_por_canal (bool): Si True, cada canal escribe su reporte de ejecución
+            junto a su resultado.
+        cfg_delta (Dict[str, Any] | None): Sección `ejecucion.delta_drivers`.
+        motor_reglas (str | None): `ejecucion.motor_reglas` ("pandas" o "polars").
+
+    Returns:
+        pd.DataFrame: Resumen por archivo (archivo, filas, segundos, filas_seg, estado).
+    """
+    nom_resultado = cfg_result.get("nom_resultado", "homologación_vtas")
+    tareas = {
+        str(path): os.path.join(out_dir, f"{nom_resultado} - {path.stem}") for path in archivos_vtas
+    }
+    args_init = (
+        config_insumos, dict_cols, reglas, cfg_result, df_drivers, tam_lote, cfg_incremental, reporte_por_canal,
+        cfg_delta, motor_reglas
+    )
+    workers = max(1, min(workers, len(tareas)))
+    logger.info(f"Homologación multicanal: {len(tareas)} archivos con {workers} procesos")
+
+    resumen = []
+    inicio = time.perf_counter()
+    if workers == 1:
+        _inicializar_trabajador(*args_init)
+        for path_vtas, out_path in tareas.items():
+            try:
+                resumen.append(_homologar_canal(path_vtas, out_path))
+            except Exception as e:
+                logger.opt(exception=True).error(f"Falló la homologación de {Path(path_vtas).name}: {e}")
+                resumen.append({"archivo": Path(path_vtas).name, "filas": 0, "segundos": 0.0, "estado": f"ERROR: {e}"})
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_inicializar_trabajador, initargs=args_init) as pool:
+            futuros = {pool.submit(_homologar_canal, p, o): p for p, o in tareas.items()}
+            for futuro in as_completed(futuros):
+                nombre = Path(futuros[futuro]).name
+                try:
+                    resumen.append(futuro.result())
+                    logger.success(f"Canal homologado: {nombre}")
+                except Exception as e:
+                    logger.error(f"Falló la homologación de {nombre}: {e}")
+                    resumen.append({"archivo": nombre, "filas": 0, "segundos": 0.0, "estado": f"ERROR: {e}"})
+
+    df_resumen = pd.DataFrame(resumen, columns=["archivo", "filas", "segundos", "estado"])
+    df_resumen["filas_seg"] = (df_resumen["filas"] / df_resumen["segundos"].where(df_resumen["segundos"] > 0)).round(0)
+    logger.info(
+        f"Resumen multicanal ({time.perf_counter() - inicio:.1f} s en total):\n"
+        f"{df_resumen.to_string(index=False)}"
+    )
+    return df_resumen
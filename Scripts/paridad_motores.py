@@ -0,0 +1,141 @@
+import argparse
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+import config_path_routes
+import numpy as np
+import pandas as pd
+from loguru import logger
+from Controllers.config_loader import ConfigLoader
+from Utils.DataQuality_Functions import resolve_existing_file
+from Utils.reglas_functions import MOTORES_REGLAS
+from Utils.sinteticos_functions import GeneradorSintetico
+from Utils.transformation_functions import aplicar_esquema
+from Scripts.homologacion import crear_verificador
+from Scripts.procesar_insumos import ProcesarInsumos
+
+
+def diferencias(df_ref: pd.DataFrame, df_otro: pd.DataFrame) -> Dict[str, int]:
+    """
+    Filas distintas por columna entre dos resultados con las mismas filas (NaN = NaN).
+
+    Args:
+        df_ref (pd.DataFrame): Resultado de referencia (pandas).
+        df_otro (pd.DataFrame): Resultado a comparar.
+
+    Returns:
+        Dict[str, int]: {columna: filas distintas}; las columnas ausentes en uno de los dos
+        cuentan todas sus filas.
+    """
+    resultado = {}
+    for col in dict.fromkeys([*df_ref.columns, *df_otro.columns]):
+        if col not in df_ref.columns or col not in df_otro.columns:
+            resultado[col] = len(df_ref)
+            continue
+        resultado[col] = int((~_iguales(df_ref[col], df_otro[col])).sum())
+    return resultado
+
+
+def _iguales(serie_a: pd.Series, serie_b: pd.Series) -> np.ndarray:
+    """Igualdad fila a fila con vacíos (NaN, None, pd.NA) iguales entre sí."""
+    a, b = serie_a.to_numpy(dtype=object), serie_b.to_numpy(dtype=object)
+    vacio_a, vacio_b = pd.isna(a), pd.isna(b)
+    iguales = vacio_a & vacio_b
+    ambos = ~vacio_a & ~vacio_b
+    iguales[ambos] = a[ambos] == b[ambos]
+    return iguales
+
+
+def _insumos(args: argparse.Namespace, config_insumos: Dict[str, Any], dict_cols: Dict[str, Any]):
+    """Ventas y drivers: sintéticos si se pidió `--filas`, si no los insumos configurados."""
+    if args.filas:
+        generador = GeneradorSintetico(dict_cols["cols_ventas"], dict_cols["cols_drivers"], semilla=args.semilla)
+        cols_vtas = config_insumos["base_vtas"]["cols_vtas"]
+        df_vtas = aplicar_esquema(
+            pd.concat(list(generador.iter_ventas(args.filas)), ignore_index=True),
+            config_insumos["base_vtas"].get("esquema"),
+            cols_vtas,
+        )
+        return df_vtas, generador.drivers(args.filas)
+
+    procesador = ProcesarInsumos(config_insumos=config_insumos, dict_cols=dict_cols)
+    path_insumos = Path(config_insumos["path_insumos"])
+    path_vtas = resolve_existing_file(base_dir=path_insumos, filename=config_insumos["base_vtas"]["nom_base"])
+    path_drivers = resolve_existing_file(base_dir=path_insumos, filename=config_insumos["drivers"]["nom_base"])
+    return procesador.carga_vtas(path_vtas=path_vtas), procesador.carga_drivers(path_drivers=path_drivers)
+
+
+def ejecutar_paridad(args: argparse.Namespace) -> bool:
+    """
+    Homologa los mismos insumos con cada motor de reglas y compara cada resultado con el
+    de pandas, columna por columna.
+
+    Args:
+        args (argparse.Namespace): Argumentos de línea de comandos (ver `_argumentos`).
+
+    Returns:
+        bool: True si todos los motores producen exactamente el resultado de pandas.
+    """
+    config = ConfigLoader()
+    config_insumos = config.get_config("config_insumos")
+    dict_cols = config.get_config("dict_cols")
+    reglas = config.get_config("reglas_homologacion")
+    if not reglas:
+        logger.error("La paridad de motores requiere reglas_homologacion en la configuración.")
+        return False
+
+    df_vtas, df_drivers = _insumos(args, config_insumos, dict_cols)
+    logger.info(f"Paridad de motores sobre {len(df_vtas)} filas de ventas y {len(df_drivers)} de drivers")
+
+    resultados: Dict[str, pd.DataFrame] = {}
+    tiempos: Dict[str, List[float]] = {}
+    for motor in ["pandas", *[m for m in args.motores if m != "pandas"]]:
+        verificador = crear_verificador(df_drivers, dict_cols, reglas, motor, config_insumos.get("canonicalizacion"))
+        verificador.deduplicar = not args.fila_a_fila
+        tiempos[motor] = []
+        for _ in range(args.repeticiones):
+            inicio = time.perf_counter()
+            resultados[motor] = verificador.para_lote(df_vtas.copy()).aplicar()
+            tiempos[motor].append(time.perf_counter() - inicio)
+
+    identico = True
+    referencia = resultados["pandas"]
+    for motor, df_resultado in resultados.items():
+        mejor = min(tiempos[motor])
+        if motor == "pandas":
+            logger.info(f"pandas: {mejor:.3f} s (referencia)")
+            continue
+        distintas = {col: n for col, n in diferencias(referencia, df_resultado).items() if n}
+        tipos = {
+            col: (str(referencia[col].dtype), str(df_resultado[col].dtype))
+            for col in referencia.columns
+            if col in df_resultado.columns and referencia[col].dtype != df_resultado[col].dtype
+        }
+        aceleracion = min(tiempos["pandas"]) / mejor if mejor > 0 else np.nan
+        if distintas or tipos:
+            identico = False
+            logger.error(f"{motor}: {mejor:.3f} s (x{aceleracion:.2f}); DIFERENCIAS filas {distintas}, tipos {tipos}")
+            for col in list(distintas)[:3]:
+                a, b = referencia[col].to_numpy(dtype=object), df_resultado[col].to_numpy(dtype=object)
+                filas = np.flatnonzero(~_iguales(referencia[col], df_resultado[col]))[:5]
+                logger.error(f"  {col}: pandas {list(a[filas])} vs {motor} {list(b[filas])} (filas {list(filas)})")
+        else:
+            logger.success(f"{motor}: {mejor:.3f} s (x{aceleracion:.2f}); resultado idéntico a pandas")
+    return identico
+
+
+def _argumentos() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Paridad de resultados entre motores de reglas (pandas como referencia).")
+    parser.add_argument("--motores", nargs="+", choices=MOTORES_REGLAS, default=MOTORES_REGLAS)
+    parser.add_argument("--filas", type=int, default=None,
+                        help="Usar una base sintética de este tamaño en lugar de los insumos configurados.")
+    parser.add_argument("--semilla", type=int, default=0)
+    parser.add_argument("--fila-a-fila", action="store_true",
+                        help="Evaluar todas las filas, sin agrupar por combinaciones únicas.")
+    parser.add_argument("--repeticiones", type=int, default=1, help="Ejecuciones por motor (se informa la más rápida).")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    sys.exit(0 if ejecutar_paridad(_argumentos()) else 1)
@@ -0,0 +1,165 @@
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Tuple
+from loguru import logger
+import multiprocessing
+import os
+import shutil
+import tempfile
+import numpy as np
+import pandas as pd
+from Utils.arrow_functions import escribir_arrow, leer_arrow
+from Utils.exclusive_functions import VerificadorCodigos
+from Scripts.homologacion import crear_verificador
+
+
+# Estado de cada proceso trabajador: se inicializa una sola vez por proceso
+_ESTADO: Dict[str, Any] = {}
+
+
+def _inicializar_particion(path_drivers, tipos_drivers, dict_cols, reglas, motor_reglas, deduplicar, cfg_canon) -> None:
+    """Construye en el proceso trabajador el verificador sobre los drivers compartidos (una vez por proceso)."""
+    df_drivers = leer_arrow(path_drivers, tipos_drivers)
+    _ESTADO["verificador"] = crear_verificador(df_drivers, dict_cols, reglas, motor_reglas, cfg_canon)
+    _ESTADO["verificador"].deduplicar = deduplicar
+
+
+def _compactar(valores: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Codifica una columna de salida como (códigos, valores únicos, vacíos): se envía entre
+    procesos mucho más rápido que un arreglo object fila a fila. Los vacíos se conservan tal
+    cual (NaN, None o pd.NA) para reconstruir exactamente los mismos valores.
+    """
+    codigos, unicos = pd.factorize(valores)
+    return codigos, np.asarray(unicos, dtype=object), valores[codigos < 0]
+
+
+def _expandir(codigos: np.ndarray, unicos: np.ndarray, vacios: np.ndarray) -> np.ndarray:
+    """Inverso de `_compactar`."""
+    valores = np.empty(len(codigos), dtype=object)
+    llenos = codigos >= 0
+    valores[llenos] = unicos[codigos[llenos]]
+    valores[~llenos] = vacios
+    return valores
+
+
+def _homologar_particion(
+    path_vtas: str, tipos: Dict[str, str], inicio: int, fin: int, status_col: str
+) -> Dict[str, Tuple[np.ndarray, np.ndarray, np.ndarray]]:
+    """Homologa las filas [inicio, fin) y devuelve solo las columnas de salida, compactadas."""
+    verificador = _ESTADO["verificador"].para_lote(leer_arrow(path_vtas, tipos, inicio, fin))
+    df = verificador.aplicar(status_col)
+    return {col: _compactar(df[col].to_numpy(dtype=object)) for col in verificador.columnas_salida(status_col)}
+
+
+class HomologadorParticionado:
+    """
+    Homologa una base de ventas repartiendo sus filas en particiones contiguas entre los
+    procesos de un pool que se crea en el primer uso y vive hasta `cerrar`.
+
+    - Los drivers se escriben una sola vez como archivo Arrow IPC; cada trabajador lo mapea
+      en memoria al iniciar y arma su propio índice (los drivers no se serializan por tarea).
+    - Por cada base, solo las columnas de entrada de las reglas (`columnas_entrada`) se
+      escriben en otro archivo Arrow; cada tarea lee su rango de filas del mapa y devuelve
+      únicamente las columnas de salida, codificadas como códigos + valores únicos.
+    - Las particiones se reensamblan en el orden original; cada fila se homologa con las
+      mismas reglas e índice que en la ruta serial, por lo que el resultado es idéntico.
+
+    Las bases con menos de `min_filas` filas se homologan en el proceso actual.
+    """
+
+    def __init__(
+        self,
+        verificador: VerificadorCodigos,
+        dict_cols: Dict[str, Any],
+        motor_reglas: Optional[str] = None,
+        workers: Optional[int] = None,
+        min_filas: int = 200_000,
+    ):
+        """
+        Args:
+            verificador (VerificadorCodigos): Verificador base (ver `crear_verificador`); se
+                usa para la ruta serial y para conocer las columnas de entrada y salida.
+            dict_cols (Dict[str, Any]): Diccionario global de columnas.
+            motor_reglas (str | None): `ejecucion.motor_reglas` ("pandas" o "polars").
+            workers (int | None): Número de procesos. Si es None, uno por núcleo.
+            min_filas (int): Filas mínimas para repartir una base entre procesos.
+        """
+        self.verificador = verificador
+        self.dict_cols = dict_cols
+        self.motor_reglas = motor_reglas
+        self.workers = max(1, workers or os.cpu_count() or 1)
+        self.min_filas = min_filas
+        self._dir: Optional[Path] = None
+        self._bases = 0
+        self._pool: Optional[ProcessPoolExecutor] = None
+
+    def _iniciar_pool(self) -> ProcessPoolExecutor:
+        """Crea el pool en el primer uso, con los drivers compartidos en un archivo Arrow."""
+        if self._pool is None:
+            self._dir = Path(tempfile.mkdtemp(prefix="particionado_"))
+            path_drivers = self._dir / "drivers.arrow"
+            tipos_drivers = escribir_arrow(self.verificador.df_drivers, path_drivers)
+            # spawn: un fork después de usar los hilos de pyarrow puede bloquear a los trabajadores
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_inicializar_particion,
+                initargs=(
+                    str(path_drivers), tipos_drivers, self.dict_cols, self.verificador.reglas,
+                    self.motor_reglas, self.verificador.deduplicar, self.verificador.indice.cfg_canon
+                ),
+            )
+        return self._pool
+
+    def cerrar(self) -> None:
+        """Detiene el pool y elimina los archivos Arrow temporales."""
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+        if self._dir is not None:
+            shutil.rmtree(self._dir, ignore_errors=True)
+            self._dir = None
+
+    def limites(self, filas: int) -> List[int]:
+        """Límites de las particiones: una por proceso, de tamaños que difieren en a lo sumo una fila."""
+        return np.linspace(0, filas, min(self.workers, filas) + 1).round().astype(int).tolist()
+
+    def aplicar(self, df_vtas: pd.DataFrame, status_col: str = "status") -> pd.DataFrame:
+        """
+        Homologa `df_vtas` por particiones en paralelo (o en el proceso actual si es pequeña).
+
+        Args:
+            df_vtas (pd.DataFrame): Base (o lote) de ventas; se modifica en el lugar.
+            status_col (str): Nombre de la columna de estado.
+
+        Returns:
+            pd.DataFrame: `df_vtas` con las columnas homologadas.
+        """
+        verificador = self.verificador.para_lote(df_vtas)
+        if self.workers == 1 or len(df_vtas) < self.min_filas:
+            return verificador.aplicar(status_col)
+
+        pool = self._iniciar_pool()
+        self._bases += 1
+        path_vtas = self._dir / f"ventas_{self._bases}.arrow"
+        tipos = escribir_arrow(df_vtas[verificador.columnas_entrada()], path_vtas)
+        limites = self.limites(len(df_vtas))
+        logger.info(f"Homologación particionada: {len(df_vtas)} filas en {len(limites) - 1} particiones")
+        try:
+            futuros = [
+                pool.submit(_homologar_particion, str(path_vtas), tipos, inicio, fin, status_col)
+                for inicio, fin in zip(limites[:-1], limites[1:])
+            ]
+            # Orden de envío = orden de filas
+            partes = [futuro.result() for futuro in futuros]
+        finally:
+            try:
+                path_vtas.unlink(missing_ok=True)
+            except OSError:
+                # Aún mapeado por un trabajador (Windows): se elimina al cerrar el pool
+                pass
+
+        for col in verificador.columnas_salida(status_col):
+            df_vtas[col] = np.concatenate([_expandir(*parte[col]) for parte in partes])
+        return df_vtas
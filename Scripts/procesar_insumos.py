@@ -1,5 +1,11 @@
-from typing import Dict, Any
-import Utils.general_functions as gf
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Dict, Any, Iterator
+from loguru import logger
+import pandas as pd
+from Utils.transformation_functions import aplicar_esquema, canonizar_claves
+from Utils.DataQuality_Functions import verificar_columnas
+from Utils.cache_functions import CacheInsumos
+from Utils.lectores_functions import crear_lector
 
 class ProcesarInsumos:
     def __init__(self, config_insumos: Dict[str, Any], dict_cols: Dict[str, Any], config_msg: Dict[str, Any] | None = None):
@@ -19,57 +25,156 @@ class ProcesarInsumos:
         self.hoja_vtas = self.config_insumos["base_vtas"]["nom_hoja"]
         self.hoja_drv = self.config_insumos["drivers"]["nom_hoja"]
 
-    def _carga(self, *, path: str, hoja: str, modo_pruebas: bool, cols: list | dict | None):
+        # Columnas configuradas por insumo (proyección de la carga única)
+        self.cols_vtas = self.config_insumos["base_vtas"]["cols_vtas"]
+        self.cols_drv = self.config_insumos["drivers"]["cols_drivers"]
+
+        # Esquema tipado de ventas (alias -> tipo); columnas no declaradas se descartan
+        self.esquema_vtas = self.config_insumos["base_vtas"].get("esquema")
+
+        # Normalización de columnas clave de drivers (config_insumos.canonicalizacion); las de
+        # ventas se normalizan solo al buscarlas en drivers (IndiceDrivers.claves_consulta)
+        self.cfg_canon = self.config_insumos.get("canonicalizacion") or {}
+        self.claves_drv = [self.cols_drv[a] for a in self.cfg_canon.get("claves_drivers", [])]
+
+        # Motor de lectura y formatos alternos (config_insumos.lectura)
+        self.cfg_lectura = self.config_insumos.get("lectura", {})
+
+        # Caché columnar de insumos ya leídos (config_insumos.cache)
+        self.cache = CacheInsumos.desde_config(self.config_insumos.get("cache"))
+
+        # Cargas de ventas lanzadas en segundo plano (ver `precargar_vtas`)
+        self._precargas: Dict[str, tuple[Executor, Future]] = {}
+
+    def _carga_unica(self, *, path: str, hoja: str, cols: Dict[str, str]):
         """
-        Carga genérica de un archivo Excel.
+        Abre el insumo una sola vez: lee el encabezado, verifica las columnas esperadas
+        y luego lee el cuerpo proyectado a las columnas configuradas.
+
+        El lector se elige por extensión (.xlsx/.xlsm con el motor de `lectura.motor_excel`,
+        .csv o .parquet), con respaldo automático a openpyxl si el motor no está instalado.
+
+        Si el mismo (archivo, hoja, columnas) ya fue leído y el archivo no ha cambiado,
+        el resultado se toma de la caché sin abrir el libro.
 
         Args:
-            path (str): Ruta del archivo Excel.
-            hoja (str): Nombre de la hoja a leer.
-            modo_pruebas (bool): Si True, realiza una carga mínima para verificación.
-            cols (list | dict | None): Columnas a verificar o seleccionar. Si None, carga todas.
+            path (str): Ruta del insumo (Excel, CSV o Parquet).
+            hoja (str): Nombre de la hoja a leer (solo aplica a Excel).
+            cols (Dict[str, str]): Alias -> nombre real de las columnas esperadas.
 
         Returns:
-            DataFrame: DataFrame con los datos cargados desde el archivo.
+            DataFrame: DataFrame con todas las filas y solo las columnas configuradas.
+
+        Raises:
+            ValueError: Si faltan columnas esperadas en el encabezado.
+        """
+        columnas = list(cols.values())
+        clave = self.cache.clave(path, hoja, columnas) if self.cache.activo else None
+        if clave is not None:
+            df_cache = self.cache.obtener(clave)
+            if df_cache is not None:
+                return df_cache
+
+        with crear_lector(path, hoja, self.cfg_lectura) as lector:
+            encabezado = lector.encabezado()
+            verificar_columnas(df=encabezado, columnas_esperadas=cols, nombre=hoja)
+            df = lector.leer(encabezado=encabezado.columns, columnas=columnas)
+
+        if clave is not None:
+            self.cache.guardar(clave, df)
+        return df
+
+    def precargar_vtas(self, path_vtas: str, pool: str = "procesos") -> None:
         """
-        return gf.Lectura_insumos_excel(
-            path_insumo=path,
-            nom_hoja=hoja,
-            modo_pruebas=modo_pruebas,
-            cols_verificados=cols
-        )
-
-    def carga_minima(self, path_vtas: str, path_drivers: str):
+        Lanza la carga de la base de ventas en segundo plano; la siguiente llamada a
+        `carga_vtas` con la misma ruta espera y devuelve ese resultado. Mientras tanto el
+        proceso principal puede cargar los drivers y construir su índice.
+
+        Con `pool="procesos"` la lectura y la conversión al esquema corren en otro proceso
+        (paralelismo real; el lector Excel no libera el GIL) y solo viaja la base ya tipada.
+        Con `pool="hilos"` se usa un hilo del mismo proceso.
+
+        Args:
+            path_vtas (str): Ruta del insumo de ventas.
+            pool (str): "procesos" o "hilos".
         """
-        Carga mínima de las bases de ventas y drivers (modo de prueba).
+        if pool not in ("procesos", "hilos"):
+            raise ValueError(f"Pool de precarga no soportado: {pool}. Opciones: ['procesos', 'hilos']")
+        if pool == "procesos":
+            ejecutor: Executor = ProcessPoolExecutor(max_workers=1)
+            futuro = ejecutor.submit(_carga_vtas_aislada, self.config_insumos, self.cnf_cols, str(path_vtas))
+        else:
+            ejecutor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="precarga_vtas")
+            futuro = ejecutor.submit(self._carga_vtas, str(path_vtas))
+        self._precargas[str(path_vtas)] = (ejecutor, futuro)
+        logger.info(f"Carga de ventas en segundo plano ({pool}): {path_vtas}")
+
+    def carga_vtas(self, path_vtas: str) -> pd.DataFrame:
+        """
+        Carga de un solo paso de la base de ventas, proyectada a las columnas configuradas
+        y convertida al esquema tipado de `base_vtas.esquema`, si existe. Si la carga se lanzó
+        antes con `precargar_vtas`, espera su resultado.
 
         Args:
-            path_vtas (str): Ruta del archivo Excel de ventas.
-            path_drivers (str): Ruta del archivo Excel de drivers.
+            path_vtas (str): Ruta del insumo de ventas.
 
         Returns:
-            tuple: (DataFrame de ventas, DataFrame de drivers) con un subconjunto reducido de datos.
+            DataFrame: Base de ventas.
         """
-        df_vtas = self._carga(path=path_vtas, hoja=self.hoja_vtas, modo_pruebas=True, cols=None)
-        df_drivers = self._carga(path=path_drivers, hoja=self.hoja_drv, modo_pruebas=True, cols=None)
-        return df_vtas, df_drivers
+        precarga = self._precargas.pop(str(path_vtas), None)
+        if precarga is not None:
+            ejecutor, futuro = precarga
+            try:
+                return futuro.result()
+            finally:
+                ejecutor.shutdown(wait=False)
+        return self._carga_vtas(str(path_vtas))
+
+    def _carga_vtas(self, path_vtas: str) -> pd.DataFrame:
+        df_vtas = self._carga_unica(path=path_vtas, hoja=self.hoja_vtas, cols=self.cols_vtas)
+        return aplicar_esquema(df_vtas, self.esquema_vtas, self.cols_vtas)
 
-    def carga_completa(self, path_vtas: str, path_drivers: str):
+    def carga_drivers(self, path_drivers: str) -> pd.DataFrame:
         """
-        Carga completa de las bases de ventas y drivers.
+        Carga de un solo paso de la base de drivers, proyectada a las columnas configuradas
+        y con sus columnas clave normalizadas (`config_insumos.canonicalizacion`).
 
         Args:
-            path_vtas (str): Ruta del archivo Excel de ventas.
-            path_drivers (str): Ruta del archivo Excel de drivers.
+            path_drivers (str): Ruta del archivo de drivers.
 
         Returns:
-            tuple: (DataFrame de ventas, DataFrame de drivers).  
-            - Ventas se carga con las columnas definidas en la configuración.  
-            - Drivers se carga completo sin filtro de columnas.
+            DataFrame: Drivers con las columnas definidas en la configuración.
+        """
+        df_drivers = self._carga_unica(path=path_drivers, hoja=self.hoja_drv, cols=self.cols_drv)
+        return canonizar_claves(df_drivers, self.claves_drv, self.cfg_canon)
+
+    def iter_lotes_vtas(self, path_vtas: str, tam_lote: int) -> Iterator[pd.DataFrame]:
+        """
+        Recorre la base de ventas en lotes de `tam_lote` filas, proyectados a las columnas
+        configuradas. El encabezado se verifica antes de entregar el primer lote.
+
+        Los libros Excel se recorren siempre con openpyxl en modo read_only, el único motor
+        que permite leer por partes con memoria acotada.
+
+        Args:
+            path_vtas (str): Ruta del insumo de ventas.
+            tam_lote (int): Número máximo de filas por lote.
+
+        Yields:
+            DataFrame: Lote de ventas, convertido al esquema tipado si existe.
         """
-        cols_vtas = self.config_insumos["base_vtas"]["cols_vtas"]
+        cfg_lectura = {**self.cfg_lectura, "motor_excel": "openpyxl"}
+        with crear_lector(path_vtas, self.hoja_vtas, cfg_lectura) as lector:
+            encabezado = lector.encabezado()
+            verificar_columnas(df=encabezado, columnas_esperadas=self.cols_vtas, nombre=self.hoja_vtas)
+            for lote in lector.iter_lotes(
+                encabezado=encabezado.columns,
+                columnas=list(self.cols_vtas.values()),
+                tam_lote=tam_lote
+            ):
+                yield aplicar_esquema(lote, self.esquema_vtas, self.cols_vtas)
 
-        df_vtas = self._carga(path=path_vtas, hoja=self.hoja_vtas, modo_pruebas=False, cols=cols_vtas)
-        df_drivers = self._carga(path=path_drivers, hoja=self.hoja_drv, modo_pruebas=False, cols=None)
 
-        return df_vtas, df_drivers
+def _carga_vtas_aislada(config_insumos: Dict[str, Any], dict_cols: Dict[str, Any], path_vtas: str) -> pd.DataFrame:
+    """Carga de ventas en un proceso aparte (ver `ProcesarInsumos.precargar_vtas`)."""
+    return ProcesarInsumos(config_insumos=config_insumos, dict_cols=dict_cols).carga_vtas(path_vtas=path_vtas)
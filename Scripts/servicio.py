@@ -0,0 +1,237 @@
+from fnmatch import fnmatch
+from pathlib import Path
+from typing import Dict, Any, Optional, Tuple
+from loguru import logger
+import os
+import queue
+import threading
+from Utils.perfilado_functions import ReporteEjecucion
+from Utils.preflight_functions import verificar_insumo
+from Scripts.homologacion import crear_verificador, homologar_base
+from Scripts.procesar_insumos import ProcesarInsumos
+
+
+# Firma de un archivo: (tamaño, mtime en ns)
+Firma = Tuple[int, int]
+
+
+class ServicioCarpeta:
+    """
+    Modo servicio: vigila `config_insumos.path_insumos` y homologa cada base de ventas nueva
+    o actualizada que coincida con `ejecucion.servicio.archivos`.
+
+    - Los drivers y su índice se mantienen en memoria entre homologaciones y solo se recargan
+      cuando cambia el archivo de drivers.
+    - Un hilo explora la carpeta cada `intervalo_seg` segundos y encola los archivos cuya
+      firma (tamaño, mtime) se mantuvo igual entre dos exploraciones (escritura terminada).
+    - Las homologaciones se ejecutan una a la vez, en orden de llegada, en el hilo principal.
+    """
+
+    def __init__(
+        self,
+        procesador: ProcesarInsumos,
+        config_insumos: Dict[str, Any],
+        dict_cols: Dict[str, Any],
+        reglas: Optional[Dict[str, Any]],
+        cfg_result: Dict[str, Any],
+        out_dir: Path,
+        cfg_servicio: Dict[str, Any],
+        tam_lote: Optional[int] = None,
+        cfg_incremental: Optional[Dict[str, Any]] = None,
+        guardar_reporte: bool = True,
+        cfg_delta: Optional[Dict[str, Any]] = None,
+        motor_reglas: Optional[str] = None,
+    ):
+        """
+        Args:
+            procesador (ProcesarInsumos): Controlador de carga de insumos.
+            config_insumos (Dict[str, Any]): Sección `config_insumos`.
+            dict_cols (Dict[str, Any]): Diccionario global de columnas.
+            reglas (Dict[str, Any] | None): Sección `reglas_homologacion`.
+            cfg_result (Dict[str, Any]): Sección `Resultados`.
+            out_dir (Path): Carpeta de resultados.
+            cfg_servicio (Dict[str, Any]): Sección `ejecucion.servicio`
+                (archivos, intervalo_seg, max_cola, procesar_existentes).
+            tam_lote (int | None): Tamaño de lote si además se usa el modo streaming.
+            cfg_incremental (Dict[str, Any] | None): Sección `ejecucion.incremental`.
+            guardar_reporte (bool): Si True, cada homologación escribe su reporte de ejecución.
+            cfg_delta (Dict[str, Any] | None): Sección `ejecucion.delta_drivers`: al recargar
+                drivers, cada base solo recalcula las filas afectadas por el cambio.
+            motor_reglas (str | None): `ejecucion.motor_reglas` ("pandas" o "polars").
+        """
+        self.procesador = procesador
+        self.config_insumos = config_insumos
+        self.dict_cols = dict_cols
+        self.reglas = reglas
+        self.cfg_result = cfg_result
+        self.out_dir = Path(out_dir)
+        self.tam_lote = tam_lote
+        self.cfg_incremental = cfg_incremental
+        self.guardar_reporte = guardar_reporte
+        self.cfg_delta = cfg_delta
+        self.motor_reglas = motor_reglas
+
+        self.path_insumos = Path(config_insumos["path_insumos"])
+        self.path_drivers = self.path_insumos / config_insumos["drivers"]["nom_base"]
+        patrones = cfg_servicio.get("archivos", [config_insumos["base_vtas"]["nom_base"]])
+        self.patrones = [patrones] if isinstance(patrones, str) else list(patrones)
+        self.intervalo = float(cfg_servicio.get("intervalo_seg", 5))
+        self.procesar_existentes = bool(cfg_servicio.get("procesar_existentes", False))
+
+        self.cola: "queue.Queue[Path]" = queue.Queue(maxsize=int(cfg_servicio.get("max_cola", 20)))
+        self._detenido = threading.Event()
+        self._pendientes: set[Path] = set()
+        self._procesados: Dict[Path, Firma] = {}
+        self._observados: Dict[Path, Firma] = {}
+        self._lock = threading.Lock()
+
+        self._firma_drivers: Optional[Firma] = None
+        self._firma_drivers_fallida: Optional[Firma] = None
+        self.verificador = None
+
+    @staticmethod
+    def _firma(path: Path) -> Optional[Firma]:
+        try:
+            stat = path.stat()
+        except OSError:
+            return None
+        return stat.st_size, stat.st_mtime_ns
+
+    def _es_ventas(self, path: Path) -> bool:
+        nombre = path.name
+        return (
+            not nombre.startswith(("~$", "."))
+            and path != self.path_drivers
+            and any(fnmatch(nombre, patron) for patron in self.patrones)
+        )
+
+    def _actualizar_drivers(self) -> None:
+        """Carga los drivers y arma el índice si es la primera vez o si el archivo cambió."""
+        firma = self._firma(self.path_drivers)
+        if firma is None:
+            if self.verificador is None:
+                raise FileNotFoundError(f"{self.path_drivers.name} en {self.path_insumos}")
+            logger.warning(f"{self.path_drivers.name} no está disponible; se conservan los drivers en memoria.")
+            return
+        if firma in (self._firma_drivers, self._firma_drivers_fallida):
+            return
+        try:
+            df_drivers = self.procesador.carga_drivers(path_drivers=str(self.path_drivers))
+            verificador = crear_verificador(
+                df_drivers, self.dict_cols, self.reglas, self.motor_reglas, self.procesador.cfg_canon
+            )
+        except Exception as e:
+            if self.verificador is None:
+                raise
+            self._firma_drivers_fallida = firma
+            logger.opt(exception=True).error(
+                f"No se pudo recargar {self.path_drivers.name} ({e}); se conservan los drivers en memoria."
+            )
+            return
+        accion = "cargados" if self.verificador is None else "recargados"
+        self.verificador, self._firma_drivers = verificador, firma
+        logger.success(f"Drivers {accion}: {len(df_drivers)} filas ({self.path_drivers.name})")
+
+    def _explorar(self) -> None:
+        """Encola las bases de ventas nuevas o modificadas cuya escritura ya terminó."""
+        for entrada in os.scandir(self.path_insumos):
+            path = Path(entrada.path)
+            if not entrada.is_file() or not self._es_ventas(path):
+                continue
+            firma = self._firma(path)
+            estable = firma is not None and self._observados.get(path) == firma
+            self._observados[path] = firma
+            with self._lock:
+                if not estable or path in self._pendientes or self._procesados.get(path) == firma:
+                    continue
+                try:
+                    self.cola.put_nowait(path)
+                except queue.Full:
+                    logger.warning(f"Cola llena; {path.name} se encolará en la siguiente exploración.")
+                    continue
+                self._pendientes.add(path)
+            logger.info(f"En cola: {path.name} ({self.cola.qsize()} pendientes)")
+
+    def _vigilar(self) -> None:
+        while not self._detenido.is_set():
+            try:
+                self._explorar()
+            except OSError as e:
+                logger.error(f"No se pudo explorar {self.path_insumos}: {e}")
+            self._detenido.wait(self.intervalo)
+
+    def _homologar(self, path_vtas: Path) -> None:
+        # Firma tomada antes de leer: si el archivo cambia durante la homologación se repite;
+        # si falla, no se reintenta hasta que el archivo vuelva a cambiar.
+        with self._lock:
+            self._procesados[path_vtas] = self._firma(path_vtas)
+        errores = verificar_insumo(
+            path_vtas,
+            self.config_insumos["base_vtas"]["nom_hoja"],
+            self.config_insumos["base_vtas"]["cols_vtas"],
+            self.config_insumos.get("lectura", {}),
+        )
+        if errores:
+            for error in errores:
+                logger.error(error)
+            return
+
+        self._actualizar_drivers()
+        nom_resultado = self.cfg_result.get("nom_resultado", "homologación_vtas")
+        out_path = os.path.join(self.out_dir, f"{nom_resultado} - {path_vtas.stem}")
+        reporte = ReporteEjecucion()
+        homologar_base(
+            procesador=self.procesador,
+            verificador=self.verificador,
+            path_vtas=str(path_vtas),
+            cfg_result=self.cfg_result,
+            out_path=out_path,
+            tam_lote=self.tam_lote,
+            cfg_incremental=self.cfg_incremental,
+            reporte=reporte,
+            cfg_delta=self.cfg_delta
+        )
+        if self.guardar_reporte:
+            reporte.guardar(out_path)
+
+    def detener(self) -> None:
+        """Pide al servicio que termine después de la homologación en curso."""
+        self._detenido.set()
+
+    def ejecutar(self) -> None:
+        """Arranca la vigilancia y procesa la cola hasta `detener()` o Ctrl+C."""
+        self._actualizar_drivers()
+        if not self.procesar_existentes:
+            for path in self.path_insumos.iterdir():
+                if path.is_file() and self._es_ventas(path):
+                    self._procesados[path] = self._observados[path] = self._firma(path)
+
+        vigilante = threading.Thread(target=self._vigilar, name="vigilante_insumos", daemon=True)
+        vigilante.start()
+        logger.info(
+            f"Servicio activo: vigilando {self.path_insumos.resolve()} {self.patrones} "
+            f"cada {self.intervalo:g} s (Ctrl+C para terminar)"
+        )
+        try:
+            while not self._detenido.is_set():
+                try:
+                    path_vtas = self.cola.get(timeout=0.5)
+                except queue.Empty:
+                    # Sin trabajo pendiente: mantener los drivers al día
+                    self._actualizar_drivers()
+                    continue
+                try:
+                    logger.info(f"Homologando {path_vtas.name}")
+                    self._homologar(path_vtas)
+                except Exception as e:
+                    logger.opt(exception=True).error(f"Falló la homologación de {path_vtas.name}: {e}")
+                finally:
+                    with self._lock:
+                        self._pendientes.discard(path_vtas)
+                    self.cola.task_done()
+        except KeyboardInterrupt:
+            logger.info("Servicio interrumpido por el usuario.")
+        finally:
+            self._detenido.set()
+            vigilante.join(timeout=self.intervalo + 1)
+            logger.info("Servicio detenido.")
@@ -4,7 +4,6 @@ import logging
 import sys
 from functools import wraps
 from pathlib import Path
-import pandas as pd
 
 
 
@@ -80,6 +79,33 @@ def resolve_existing_file(base_dir: str | Path, filename: str) -> Path:
     return file_path.resolve()
 
 
+@manejar_excepciones
+def resolve_matching_files(base_dir: str | Path, patrones: list[str] | str) -> list[Path]:
+    """
+    Resuelve nombres o patrones glob (p. ej. "Consulta Diaria Ventas - *.xlsx") dentro de
+    `base_dir`; devuelve las rutas absolutas únicas en orden de aparición.
+
+    Args:
+        base_dir: Directorio base donde se buscarán los archivos.
+        patrones: Nombre(s) de archivo o patrón(es) glob.
+
+    Returns:
+        list[Path]: Rutas absolutas de los archivos encontrados.
+    """
+    if isinstance(patrones, str):
+        patrones = [patrones]
+    archivos: list[Path] = []
+    for patron in patrones:
+        coincidencias = sorted(p.resolve() for p in Path(base_dir).glob(patron) if p.is_file())
+        if not coincidencias:
+            logger.warning(f"Ningún archivo coincide con '{patron}' en {base_dir}")
+        archivos.extend(p for p in coincidencias if p not in archivos)
+    if not archivos:
+        raise FileNotFoundError(f"{patrones} en {base_dir}")
+    logger.info(f"Archivos encontrados: {[p.name for p in archivos]}")
+    return archivos
+
+
 def verificar_columnas(df, columnas_esperadas: dict, nombre: str = "DataFrame"):
     """
     Verifica que el DataFrame contenga todas las columnas esperadas.
@@ -0,0 +1,57 @@
+# Archivos Arrow IPC (Feather v2 sin comprimir) mapeables en memoria
+from pathlib import Path
+from typing import Dict, Optional
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.feather as feather
+
+
+def nombre_tipo(tipo) -> str:
+    """Nombre de un tipo pandas que `astype` reconstruye igual (incluido el almacenamiento del texto)."""
+    if isinstance(tipo, pd.StringDtype):
+        return f"string[{tipo.storage}]"
+    return str(tipo)
+
+
+def escribir_arrow(df: pd.DataFrame, path: str | Path) -> Dict[str, str]:
+    """
+    Escribe `df` como archivo Arrow IPC sin comprimir, para leerlo después mapeado en memoria.
+
+    Args:
+        df (pd.DataFrame): DataFrame a escribir (el índice se descarta).
+        path (str | Path): Ruta del archivo.
+
+    Returns:
+        Dict[str, str]: Tipo pandas de cada columna, para `leer_arrow`.
+    """
+    feather.write_feather(df.reset_index(drop=True), path, compression="uncompressed")
+    return {col: nombre_tipo(tipo) for col, tipo in df.dtypes.items()}
+
+
+def leer_arrow(path: str | Path, tipos: Dict[str, str], inicio: int = 0, fin: Optional[int] = None) -> pd.DataFrame:
+    """
+    Lee las filas [inicio, fin) de un archivo de `escribir_arrow` mapeado en memoria (sin
+    copiar el archivo a memoria ni parsearlo) y restituye los tipos pandas originales. El
+    texto se lee como `string[pyarrow]`; las columnas que eran object vuelven a object con
+    vacíos NaN, para que los valores sean idénticos a los escritos.
+
+    Args:
+        path (str | Path): Ruta del archivo.
+        tipos (Dict[str, str]): Tipos devueltos por `escribir_arrow`.
+        inicio (int): Primera fila.
+        fin (int | None): Fila final (exclusiva). Si es None, hasta el final.
+
+    Returns:
+        pd.DataFrame: Filas leídas, con índice desde 0.
+    """
+    tabla = pa.ipc.open_file(pa.memory_map(str(path))).read_all()
+    fin = tabla.num_rows if fin is None else fin
+    texto = pd.StringDtype("pyarrow")
+    df = tabla.slice(inicio, fin - inicio).to_pandas(types_mapper={pa.string(): texto, pa.large_string(): texto}.get)
+    for col, tipo in tipos.items():
+        if tipo == "object":
+            df[col] = df[col].astype(object).where(df[col].notna(), np.nan)
+        elif df[col].dtype != tipo:
+            df[col] = df[col].astype(tipo)
+    return df
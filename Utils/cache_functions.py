@@ -0,0 +1,179 @@
+# Caché columnar de insumos leídos desde Excel
+from __future__ import annotations
+from loguru import logger
+from pathlib import Path
+from typing import Optional
+import hashlib
+import json
+import os
+import pandas as pd
+
+
+class CacheInsumos:
+    """
+    Caché en disco de DataFrames leídos desde Excel, direccionada por contenido.
+
+    Cada entrada corresponde a un (archivo, hoja, conjunto de columnas) y se guarda como
+    Feather o Parquet. La clave combina tamaño, mtime y hash del contenido del archivo,
+    por lo que cualquier cambio en el insumo invalida la entrada automáticamente.
+    Cuando el tamaño total supera `max_mb`, se eliminan las entradas menos usadas.
+    """
+    FORMATOS = {"feather": ".feather", "parquet": ".parquet"}
+    TAM_BLOQUE_HASH = 1024 * 1024
+
+    def __init__(
+        self,
+        path_cache: str | Path = "Cache/",
+        formato: str = "feather",
+        max_mb: float = 2048,
+        activo: bool = True,
+    ):
+        """
+        Inicializa la caché.
+
+        Args:
+            path_cache (str | Path): Carpeta donde se guardan las entradas. Se crea si no existe.
+            formato (str): "feather" o "parquet".
+            max_mb (float): Tamaño máximo de la caché en MB antes de expulsar entradas.
+            activo (bool): Si es False, la caché no lee ni escribe nada.
+        """
+        if formato not in self.FORMATOS:
+            raise ValueError(f"Formato de caché no soportado: {formato}. Opciones: {list(self.FORMATOS)}")
+
+        self.path_cache = Path(path_cache)
+        self.formato = formato
+        self.max_bytes = int(max_mb * 1024 * 1024)
+        self.activo = activo and self._pyarrow_disponible()
+
+        if self.activo:
+            self.path_cache.mkdir(parents=True, exist_ok=True)
+
+    @classmethod
+    def desde_config(cls, cfg_cache: Optional[dict]) -> "CacheInsumos":
+        """
+        Construye la caché a partir de la sección `config_insumos.cache` de config.yml.
+
+        Args:
+            cfg_cache (dict | None): Configuración de la caché. Si es None, la caché queda inactiva.
+
+        Returns:
+            CacheInsumos: Instancia configurada.
+        """
+        cfg_cache = cfg_cache or {}
+        return cls(
+            path_cache=cfg_cache.get("path_cache", "Cache/"),
+            formato=cfg_cache.get("formato", "feather"),
+            max_mb=cfg_cache.get("max_mb", 2048),
+            activo=cfg_cache.get("activo", False),
+        )
+
+    @staticmethod
+    def _pyarrow_disponible() -> bool:
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError:
+            logger.warning("pyarrow no está instalado: la caché de insumos queda desactivada.")
+            return False
+        return True
+
+    def _hash_contenido(self, path: Path) -> str:
+        """Hash BLAKE2 del contenido del archivo, leído por bloques."""
+        h = hashlib.blake2b(digest_size=16)
+        with open(path, "rb") as f:
+            for bloque in iter(lambda: f.read(self.TAM_BLOQUE_HASH), b""):
+                h.update(bloque)
+        return h.hexdigest()
+
+    def clave(self, path: str | Path, hoja: str, columnas: list[str]) -> str:
+        """
+        Calcula la clave de caché de un (archivo, hoja, columnas).
+
+        Args:
+            path (str | Path): Ruta del archivo de insumo.
+            hoja (str): Nombre de la hoja.
+            columnas (list[str]): Columnas proyectadas.
+
+        Returns:
+            str: Clave hexadecimal estable.
+        """
+        path = Path(path)
+        stat = path.stat()
+        descriptor = {
+            "archivo": path.name,
+            "tamano": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+            "contenido": self._hash_contenido(path),
+            "hoja": hoja,
+            "columnas": list(columnas),
+        }
+        serial = json.dumps(descriptor, ensure_ascii=False, sort_keys=True)
+        return hashlib.blake2b(serial.encode("utf-8"), digest_size=16).hexdigest()
+
+    def _ruta(self, clave: str) -> Path:
+        return self.path_cache / f"{clave}{self.FORMATOS[self.formato]}"
+
+    def obtener(self, clave: str) -> Optional[pd.DataFrame]:
+        """
+        Devuelve el DataFrame asociado a `clave` o None si no existe.
+
+        Args:
+            clave (str): Clave calculada con `clave`.
+
+        Returns:
+            pd.DataFrame | None: DataFrame en caché.
+        """
+        if not self.activo:
+            return None
+        ruta = self._ruta(clave)
+        if not ruta.is_file():
+            return None
+        try:
+            df = pd.read_feather(ruta) if self.formato == "feather" else pd.read_parquet(ruta)
+        except Exception as e:
+            logger.warning(f"Entrada de caché ilegible {ruta.name}, se descarta: {e}")
+            ruta.unlink(missing_ok=True)
+            return None
+        # Marcar como usada recientemente para la política de expulsión
+        os.utime(ruta)
+        logger.info(f"Caché: acierto {ruta.name} ({len(df)} filas)")
+        return df
+
+    def guardar(self, clave: str, df: pd.DataFrame) -> None:
+        """
+        Guarda `df` bajo `clave` y aplica la política de expulsión por tamaño.
+
+        Args:
+            clave (str): Clave calculada con `clave`.
+            df (pd.DataFrame): DataFrame a guardar.
+        """
+        if not self.activo:
+            return
+        ruta = self._ruta(clave)
+        tmp = ruta.with_suffix(ruta.suffix + ".tmp")
+        try:
+            df = df.reset_index(drop=True)
+            if self.formato == "feather":
+                df.to_feather(tmp)
+            else:
+                df.to_parquet(tmp, index=False)
+            os.replace(tmp, ruta)
+            logger.info(f"Caché: guardado {ruta.name}")
+        except Exception as e:
+            tmp.unlink(missing_ok=True)
+            logger.warning(f"No fue posible guardar en caché {ruta.name}: {e}")
+            return
+        self._expulsar()
+
+    def _expulsar(self) -> None:
+        """Elimina las entradas menos usadas hasta quedar por debajo de `max_bytes`."""
+        entradas = [
+            (p.stat().st_mtime, p.stat().st_size, p)
+            for p in self.path_cache.glob(f"*{self.FORMATOS[self.formato]}")
+        ]
+        total = sum(tam for _, tam, _ in entradas)
+        for _, tam, ruta in sorted(entradas):
+            if total <= self.max_bytes:
+                break
+            ruta.unlink(missing_ok=True)
+            total -= tam
+            logger.info(f"Caché: expulsado {ruta.name}")
@@ -0,0 +1,140 @@
+# Checkpoints por etapa para reanudar ejecuciones largas (--resume)
+from __future__ import annotations
+from loguru import logger
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+import hashlib
+import json
+import os
+import time
+import pandas as pd
+from Utils.arrow_functions import escribir_arrow, leer_arrow
+
+
+def huella_ejecucion(paths: List[str | Path], config: Dict[str, Any], tam_bloque: int = 1024 * 1024) -> str:
+    """
+    Huella de los insumos (contenido de cada archivo) y de la configuración que determina el
+    resultado: si cualquiera cambia, los checkpoints dejan de ser válidos.
+
+    Args:
+        paths (List[str | Path]): Insumos de la ejecución (ventas, drivers).
+        config (Dict[str, Any]): Secciones de configuración que afectan el resultado.
+        tam_bloque (int): Bytes leídos por bloque al calcular el hash.
+
+    Returns:
+        str: Hash hexadecimal.
+    """
+    h = hashlib.blake2b(digest_size=16)
+    for path in paths:
+        h.update(Path(path).name.encode("utf-8"))
+        with open(path, "rb") as archivo:
+            for bloque in iter(lambda: archivo.read(tam_bloque), b""):
+                h.update(bloque)
+    h.update(json.dumps(config, sort_keys=True, ensure_ascii=False, default=str).encode("utf-8"))
+    return h.hexdigest()
+
+
+class AlmacenCheckpoints:
+    """
+    Salida de cada etapa de la homologación de una base ("carga_vtas", "homologacion")
+    guardada como archivo Arrow IPC sin comprimir, junto con la huella de insumos y
+    configuración con que se calculó.
+
+    `--resume` continúa desde la última etapa con checkpoint válido: el archivo se lee
+    mapeado en memoria, sin volver a parsear el Excel ni a homologar. Cada checkpoint se
+    escribe en un temporal y se registra en el manifiesto solo después de renombrarlo; al
+    terminar la exportación se eliminan.
+    """
+    MANIFIESTO = "manifiesto.json"
+    ETAPAS = ["carga_vtas", "homologacion"]
+
+    def __init__(self, path_store: str | Path, nombre_base: str, huella: str):
+        """
+        Args:
+            path_store (str | Path): Carpeta raíz de los checkpoints. Se crea si no existe.
+            nombre_base (str): Nombre de la base de ventas (una subcarpeta por base).
+            huella (str): Huella de la ejecución actual (ver `huella_ejecucion`).
+        """
+        self.path = Path(path_store) / nombre_base
+        self.path.mkdir(parents=True, exist_ok=True)
+        self.huella = huella
+        self.manifiesto: Dict[str, Any] = self._cargar_manifiesto()
+
+    def _cargar_manifiesto(self) -> Dict[str, Any]:
+        path = self.path / self.MANIFIESTO
+        if not path.is_file():
+            return {}
+        try:
+            return json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError) as e:
+            logger.warning(f"Manifiesto de checkpoints ilegible, se ignora: {e}")
+            return {}
+
+    def _guardar_manifiesto(self) -> None:
+        path = self.path / self.MANIFIESTO
+        tmp = path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(self.manifiesto, indent=2, ensure_ascii=False), encoding="utf-8")
+        os.replace(tmp, path)
+
+    def ultima_valida(self) -> Optional[str]:
+        """
+        Última etapa (en orden de `ETAPAS`) con checkpoint de la misma huella y archivo presente.
+
+        Returns:
+            str | None: Nombre de la etapa, o None si no hay checkpoints válidos.
+        """
+        if self.manifiesto.get("huella") != self.huella:
+            if self.manifiesto:
+                logger.info("Checkpoints de otra ejecución (cambiaron los insumos o la configuración); se ignoran.")
+            return None
+        etapas = self.manifiesto.get("etapas", {})
+        for etapa in reversed(self.ETAPAS):
+            if etapa in etapas and (self.path / etapas[etapa]["archivo"]).is_file():
+                return etapa
+        return None
+
+    def cargar(self, etapa: str) -> pd.DataFrame:
+        """
+        Lee el checkpoint de `etapa` mapeado en memoria, con los tipos con que se guardó.
+
+        Args:
+            etapa (str): Etapa de `ETAPAS` con checkpoint válido.
+
+        Returns:
+            pd.DataFrame: Salida de la etapa.
+        """
+        registro = self.manifiesto["etapas"][etapa]
+        df = leer_arrow(self.path / registro["archivo"], registro["tipos"])
+        logger.info(f"Checkpoint '{etapa}' cargado: {len(df)} filas ({registro['creado']})")
+        return df
+
+    def guardar(self, etapa: str, df: pd.DataFrame) -> None:
+        """
+        Guarda la salida de `etapa`. Si los checkpoints existentes son de otra huella, se
+        descartan.
+
+        Args:
+            etapa (str): Etapa de `ETAPAS`.
+            df (pd.DataFrame): Salida de la etapa.
+        """
+        if self.manifiesto.get("huella") != self.huella:
+            self.limpiar()
+            self.manifiesto = {"huella": self.huella, "etapas": {}}
+        archivo = f"{etapa}.arrow"
+        tmp = self.path / f".{archivo}.tmp"
+        tipos = escribir_arrow(df, tmp)
+        os.replace(tmp, self.path / archivo)
+        self.manifiesto["etapas"][etapa] = {
+            "archivo": archivo,
+            "filas": len(df),
+            "tipos": tipos,
+            "creado": time.strftime("%Y-%m-%d %H:%M:%S"),
+        }
+        self._guardar_manifiesto()
+
+    def limpiar(self) -> None:
+        """Elimina todos los checkpoints de la base (tras una exportación exitosa)."""
+        for etapa in self.manifiesto.get("etapas", {}).values():
+            (self.path / etapa["archivo"]).unlink(missing_ok=True)
+        (self.path / self.MANIFIESTO).unlink(missing_ok=True)
+        self.manifiesto = {}
@@ -0,0 +1,680 @@
+# Escritores de resultados del proyecto
+from __future__ import annotations
+from abc import ABC, abstractmethod
+from concurrent.futures import ProcessPoolExecutor
+from importlib.util import find_spec
+from loguru import logger
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+import hashlib
+import multiprocessing
+import os
+import pickle
+import queue
+import re
+import shutil
+import tempfile
+import threading
+import numpy as np
+import pandas as pd
+
+
+# Filas de datos por hoja .xlsx (límite de Excel menos el encabezado)
+MAX_FILAS_XLSX = 1_048_575
+
+
+def _sin_nulos(lote: pd.DataFrame) -> pd.DataFrame:
+    """Celdas vacías (None) en lugar de NaN/NA, igual que DataFrame.to_excel."""
+    return lote.astype(object).where(lote.notna(), None)
+
+
+# Mayor entero que un float64 representa sin pérdida
+MAX_ENTERO_EXACTO = 2**53
+
+
+def _enteros_exactos(serie: pd.Series) -> pd.Series:
+    """
+    Máscara de los valores de una columna numérica que son enteros representables sin
+    pérdida (los vacíos no cuentan). Una columna decimal puede venir de una base o lote con
+    vacíos; sus valores enteros se escriben igual que en una columna entera.
+    """
+    if pd.api.types.is_bool_dtype(serie) or pd.api.types.is_integer_dtype(serie):
+        return serie.notna()
+    return serie.notna() & (serie % 1 == 0) & (serie.abs() < MAX_ENTERO_EXACTO)
+
+
+def _valores_csv(lote: pd.DataFrame) -> pd.DataFrame:
+    """
+    Escribe cada número entero sin decimales ("49", no "49.0") aunque su columna sea
+    decimal, para que el CSV no dependa de si la base se procesó completa o por lotes.
+    """
+    decimales = [
+        col for col in lote.columns
+        if pd.api.types.is_float_dtype(lote[col]) and _enteros_exactos(lote[col]).any()
+    ]
+    if not decimales:
+        return lote
+    lote = lote.copy()
+    for col in decimales:
+        enteros = _enteros_exactos(lote[col])
+        if enteros.sum() == lote[col].notna().sum():
+            lote[col] = lote[col].astype("Int64")
+        else:
+            valores = lote[col].to_numpy(dtype=object)
+            valores[enteros.to_numpy()] = lote[col][enteros].astype("int64").to_numpy(dtype=object)
+            lote[col] = valores
+    return lote
+
+
+class EscritorResultado(ABC):
+    """
+    Escritor base de resultados por lotes. Se usa como context manager:
+
+        with EscritorXlsxwriter(path) as escritor:
+            for lote in lotes:
+                escritor.escribir_lote(lote)
+
+    Se escribe sobre un archivo temporal en la misma carpeta y, solo si el bloque termina sin
+    errores, se renombra de forma atómica al destino. Una ejecución interrumpida nunca deja
+    un resultado a medio escribir con el nombre final.
+    """
+    extension = ""
+
+    def __init__(self, path: str | Path):
+        path = Path(path)
+        self.path = path.with_name(path.name + self.extension)
+        self.path_tmp = self.path.with_name(f".{self.path.stem}.tmp{self.extension}")
+        self.filas = 0
+        self._columnas: Optional[list] = None
+
+    def __enter__(self) -> "EscritorResultado":
+        self.path_tmp.unlink(missing_ok=True)
+        self._abrir()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        try:
+            self._cerrar()
+        except Exception:
+            self.path_tmp.unlink(missing_ok=True)
+            raise
+        if exc_type is not None:
+            self.path_tmp.unlink(missing_ok=True)
+            logger.warning(f"Escritura de {self.path.name} interrumpida; no se modificó el resultado previo.")
+            return
+        try:
+            os.replace(self.path_tmp, self.path)
+        except OSError:
+            self.path_tmp.unlink(missing_ok=True)
+            raise
+        logger.success(f"Resultado escrito: {self.filas} filas → {self.path}")
+
+    def escribir_lote(self, lote: pd.DataFrame) -> None:
+        """
+        Agrega las filas de `lote` al final del resultado. El primer lote fija el encabezado.
+
+        Args:
+            lote (pd.DataFrame): Lote a escribir; debe tener siempre las mismas columnas.
+        """
+        if self._columnas is None:
+            self._columnas = list(lote.columns)
+        elif list(lote.columns) != self._columnas:
+            raise ValueError(f"Columnas del lote distintas al encabezado: {list(lote.columns)}")
+        self._escribir(lote)
+        self.filas += len(lote)
+
+    def escribir_df(self, df: pd.DataFrame, tam_bloque: int = 100_000) -> None:
+        """
+        Escribe un DataFrame completo por bloques, sin materializar una segunda copia entera.
+
+        Args:
+            df (pd.DataFrame): DataFrame a escribir.
+            tam_bloque (int): Filas por bloque.
+        """
+        for inicio in range(0, max(len(df), 1), tam_bloque):
+            self.escribir_lote(df.iloc[inicio:inicio + tam_bloque])
+
+    def esperar(self) -> None:
+        """Escritura inmediata: no hay lotes pendientes (ver `EscritorSegundoPlano.esperar`)."""
+
+    @abstractmethod
+    def _abrir(self) -> None:
+        """Crea el archivo temporal `path_tmp`."""
+
+    @abstractmethod
+    def _escribir(self, lote: pd.DataFrame) -> None:
+        """Agrega las filas de `lote` al archivo temporal."""
+
+    @abstractmethod
+    def _cerrar(self) -> None:
+        """Termina de escribir y cierra el archivo temporal."""
+
+
+class _EscritorXlsx(EscritorResultado):
+    """Base de los escritores .xlsx: reparte las filas en hojas de a lo sumo MAX_FILAS_XLSX."""
+    extension = ".xlsx"
+
+    def __init__(self, path: str | Path, hoja: str = "Sheet1"):
+        super().__init__(path)
+        self.hoja = hoja
+        self._n_hoja = 0
+        self._filas_hoja = MAX_FILAS_XLSX
+
+    @abstractmethod
+    def _nueva_hoja(self) -> None:
+        """Agrega una hoja llamada `_nombre_hoja()` y la deja como hoja actual."""
+
+    @abstractmethod
+    def _agregar_fila(self, fila: tuple) -> None:
+        """Escribe `fila` al final de la hoja actual."""
+
+    def _siguiente_hoja(self) -> None:
+        self._n_hoja += 1
+        self._filas_hoja = 0
+        self._nueva_hoja()
+        self._agregar_fila(tuple(self._columnas or ()))
+
+    def _escribir(self, lote: pd.DataFrame) -> None:
+        for fila in _sin_nulos(lote).itertuples(index=False, name=None):
+            if self._filas_hoja == MAX_FILAS_XLSX:
+                self._siguiente_hoja()
+            self._agregar_fila(fila)
+            self._filas_hoja += 1
+
+    def _nombre_hoja(self) -> str:
+        return self.hoja if self._n_hoja == 1 else f"{self.hoja}_{self._n_hoja}"
+
+
+class EscritorXlsxwriter(_EscritorXlsx):
+    """Escritor .xlsx con xlsxwriter en modo `constant_memory` (una fila en memoria a la vez)."""
+
+    def _abrir(self) -> None:
+        import xlsxwriter
+
+        self._libro = xlsxwriter.Workbook(str(self.path_tmp), {"constant_memory": True})
+        self._hoja = None
+
+    def _nueva_hoja(self) -> None:
+        self._hoja = self._libro.add_worksheet(self._nombre_hoja())
+        self._fila = 0
+
+    def _agregar_fila(self, fila: tuple) -> None:
+        self._hoja.write_row(self._fila, 0, fila)
+        self._fila += 1
+
+    def _cerrar(self) -> None:
+        if self._hoja is None:
+            self._siguiente_hoja()
+        self._libro.close()
+
+
+class EscritorExcelStreaming(_EscritorXlsx):
+    """Escritor .xlsx con openpyxl en modo `write_only` (respaldo si xlsxwriter no está instalado)."""
+
+    def _abrir(self) -> None:
+        from openpyxl import Workbook
+
+        self._libro = Workbook(write_only=True)
+        self._hoja = None
+
+    def _nueva_hoja(self) -> None:
+        self._hoja = self._libro.create_sheet(self._nombre_hoja())
+
+    def _agregar_fila(self, fila: tuple) -> None:
+        self._hoja.append(fila)
+
+    def _cerrar(self) -> None:
+        if self._hoja is None:
+            self._siguiente_hoja()
+        self._libro.save(self.path_tmp)
+
+
+class EscritorCSV(EscritorResultado):
+    """Escritor CSV por lotes. Los números enteros se escriben sin decimales (ver `_valores_csv`)."""
+    extension = ".csv"
+
+    def __init__(self, path: str | Path, sep: str = ";", encoding: str = "utf-8-sig"):
+        super().__init__(path)
+        self.sep = sep
+        self.encoding = encoding
+
+    def _abrir(self) -> None:
+        self._archivo = open(self.path_tmp, "w", encoding=self.encoding, newline="")
+
+    def _escribir(self, lote: pd.DataFrame) -> None:
+        _valores_csv(lote).to_csv(self._archivo, sep=self.sep, index=False, header=self.filas == 0)
+
+    def _cerrar(self) -> None:
+        self._archivo.close()
+
+
+class EscritorParquet(EscritorResultado):
+    """
+    Escritor Parquet por lotes (requiere pyarrow). Todos los lotes comparten un esquema:
+    columnas numéricas cuyos valores son enteros como int64 (con vacíos), el resto de
+    numéricas como float64 y las demás como texto.
+
+    El esquema lo fija el primer lote. Si un lote posterior trae decimales en una columna
+    int64, esa columna pasa a float64 y las filas ya escritas se reescriben por grupos de
+    filas (memoria acotada). Así el archivo es el mismo con la base completa o por lotes.
+    """
+    extension = ".parquet"
+
+    def _abrir(self) -> None:
+        self._escritor = None
+
+    @staticmethod
+    def _tipo(serie: pd.Series):
+        import pyarrow as pa
+
+        if not pd.api.types.is_numeric_dtype(serie):
+            return pa.string()
+        return pa.int64() if _enteros_exactos(serie).sum() == serie.notna().sum() else pa.float64()
+
+    def _normalizar(self, lote: pd.DataFrame) -> pd.DataFrame:
+        import pyarrow as pa
+
+        columnas = {}
+        for campo in self._esquema:
+            serie = lote[campo.name]
+            if campo.type == pa.int64():
+                columnas[campo.name] = serie.astype("Int64")
+            elif campo.type == pa.float64():
+                columnas[campo.name] = serie.astype("float64")
+            else:
+                columnas[campo.name] = serie.astype(object).where(serie.notna(), None)
+        return pd.DataFrame(columnas)
+
+    def _promover(self, columnas: list[str]) -> None:
+        """Pasa `columnas` de int64 a float64 y reescribe con el nuevo esquema las filas ya escritas."""
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        self._escritor.close()
+        self._esquema = pa.schema([
+            pa.field(campo.name, pa.float64()) if campo.name in columnas else campo for campo in self._esquema
+        ])
+        path_previo = self.path_tmp.with_name(f"{self.path_tmp.name}.previo")
+        os.replace(self.path_tmp, path_previo)
+        try:
+            self._escritor = pq.ParquetWriter(self.path_tmp, self._esquema)
+            previo = pq.ParquetFile(path_previo)
+            for i in range(previo.num_row_groups):
+                self._escritor.write_table(previo.read_row_group(i).cast(self._esquema))
+        finally:
+            path_previo.unlink(missing_ok=True)
+        logger.info(f"Parquet {self.path.name}: {columnas} pasan de entero a decimal; {self.filas} filas reescritas")
+
+    def _escribir(self, lote: pd.DataFrame) -> None:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        tipos = {col: self._tipo(lote[col]) for col in lote.columns}
+        if self._escritor is None:
+            self._esquema = pa.schema(list(tipos.items()))
+            self._escritor = pq.ParquetWriter(self.path_tmp, self._esquema)
+        else:
+            promover = [
+                col for col, tipo in tipos.items()
+                if tipo == pa.float64() and self._esquema.field(col).type == pa.int64()
+            ]
+            if promover:
+                self._promover(promover)
+        tabla = pa.Table.from_pandas(self._normalizar(lote), schema=self._esquema, preserve_index=False)
+        self._escritor.write_table(tabla)
+
+    def _cerrar(self) -> None:
+        if self._escritor is not None:
+            self._escritor.close()
+
+
+class EscritorSegundoPlano:
+    """
+    Escritura diferida: los lotes se encolan (hasta `max_pendientes`) y un hilo propio los
+    escribe, de modo que el cálculo del siguiente lote continúa mientras se escribe el actual.
+    Con varios formatos, cada uno escribe en su propio hilo. Un error del hilo escritor se
+    propaga en la siguiente llamada o al cerrar, y el resultado previo no se modifica.
+    """
+
+    def __init__(self, escritor: EscritorResultado, max_pendientes: int = 2):
+        self.escritor = escritor
+        self.filas = 0
+        self._cola: queue.Queue = queue.Queue(maxsize=max(1, max_pendientes))
+        self._error: Optional[BaseException] = None
+        self._hilo: Optional[threading.Thread] = None
+
+    @property
+    def path(self) -> Path:
+        return self.escritor.path
+
+    def __enter__(self) -> "EscritorSegundoPlano":
+        self.escritor.__enter__()
+        self._hilo = threading.Thread(
+            target=self._trabajar, name=f"escritor_{self.escritor.extension.lstrip('.')}", daemon=True
+        )
+        self._hilo.start()
+        return self
+
+    def _trabajar(self) -> None:
+        while True:
+            lote = self._cola.get()
+            try:
+                if lote is None:
+                    return
+                if self._error is None:
+                    self.escritor.escribir_lote(lote)
+            except BaseException as e:
+                self._error = e
+            finally:
+                self._cola.task_done()
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self._cola.put(None)
+        self._hilo.join()
+        if exc_type is None and self._error is not None:
+            self.escritor.__exit__(type(self._error), self._error, self._error.__traceback__)
+            raise self._error
+        self.escritor.__exit__(exc_type, exc, tb)
+
+    def escribir_lote(self, lote: pd.DataFrame) -> None:
+        """Encola `lote` para escritura; bloquea solo si hay `max_pendientes` lotes en espera."""
+        if self._error is not None:
+            raise self._error
+        self._cola.put(lote)
+        self.filas += len(lote)
+
+    def esperar(self) -> None:
+        """Bloquea hasta que el hilo escritor haya escrito todos los lotes encolados."""
+        self._cola.join()
+        if self._error is not None:
+            raise self._error
+
+
+class EscritorMultiple:
+    """Reparte cada lote entre varios escritores (uno por formato configurado)."""
+
+    def __init__(self, escritores: list[EscritorResultado | EscritorSegundoPlano]):
+        self.escritores = escritores
+
+    def __enter__(self) -> "EscritorMultiple":
+        for escritor in self.escritores:
+            escritor.__enter__()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        # Cerrar todos aunque alguno falle; se propaga el primer error
+        error = None
+        for escritor in self.escritores:
+            try:
+                escritor.__exit__(exc_type, exc, tb)
+            except Exception as e:
+                error = error or e
+        if error is not None:
+            raise error
+
+    @property
+    def filas(self) -> int:
+        return self.escritores[0].filas if self.escritores else 0
+
+    @property
+    def paths(self) -> list[Path]:
+        return [escritor.path for escritor in self.escritores]
+
+    def escribir_lote(self, lote: pd.DataFrame) -> None:
+        for escritor in self.escritores:
+            escritor.escribir_lote(lote)
+
+    def escribir_df(self, df: pd.DataFrame, tam_bloque: int = 100_000) -> None:
+        for inicio in range(0, max(len(df), 1), tam_bloque):
+            self.escribir_lote(df.iloc[inicio:inicio + tam_bloque])
+
+    def esperar(self) -> None:
+        for escritor in self.escritores:
+            escritor.esperar()
+
+
+def crear_escritores(
+    cfg_result: dict, path_base: str | Path, segundo_plano: bool = False, max_pendientes: int = 2
+) -> EscritorMultiple:
+    """
+    Crea los escritores de resultado según la sección `Resultados` de la configuración.
+
+    Args:
+        cfg_result (dict): Sección `Resultados` (formatos, motor_xlsx, csv).
+        path_base (str | Path): Ruta del resultado sin extensión (se agrega por formato).
+        segundo_plano (bool): Si True, cada formato escribe en su propio hilo
+            (ver `EscritorSegundoPlano`).
+        max_pendientes (int): Lotes en espera por formato en modo segundo plano.
+
+    Returns:
+        EscritorMultiple: Escritor que reparte los lotes entre todos los formatos.
+
+    Raises:
+        ValueError: Si se configura un formato no soportado.
+    """
+    formatos = cfg_result.get("formatos", ["xlsx"])
+    if isinstance(formatos, str):
+        formatos = [formatos]
+
+    escritores = []
+    for formato in formatos:
+        if formato == "xlsx":
+            motor = cfg_result.get("motor_xlsx", "xlsxwriter")
+            if motor == "xlsxwriter" and find_spec("xlsxwriter") is None:
+                logger.warning("xlsxwriter no está instalado. Se usará openpyxl (write_only).")
+                motor = "openpyxl"
+            clase = EscritorXlsxwriter if motor == "xlsxwriter" else EscritorExcelStreaming
+            escritores.append(clase(path_base))
+        elif formato == "csv":
+            cfg_csv = cfg_result.get("csv", {})
+            escritores.append(EscritorCSV(
+                path_base, sep=cfg_csv.get("sep", ";"), encoding=cfg_csv.get("encoding", "utf-8-sig")
+            ))
+        elif formato == "parquet":
+            escritores.append(EscritorParquet(path_base))
+        else:
+            raise ValueError(f"Formato de resultado no soportado: {formato}. Opciones: ['xlsx', 'csv', 'parquet']")
+    if segundo_plano:
+        escritores = [EscritorSegundoPlano(escritor, max_pendientes) for escritor in escritores]
+    return EscritorMultiple(escritores)
+
+
+def _sha256(path: Path, tam_bloque: int = 1 << 20) -> str:
+    """Checksum SHA-256 de un archivo, leído por bloques."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as archivo:
+        for bloque in iter(lambda: archivo.read(tam_bloque), b""):
+            digest.update(bloque)
+    return digest.hexdigest()
+
+
+def _escribir_particion(
+    cfg_result: dict, path_base: str, path_lotes: str, max_filas_archivo: Optional[int]
+) -> List[Dict]:
+    """
+    Escribe los lotes acumulados de una partición en los formatos de `cfg_result`, en uno o
+    varios archivos ("<path_base>", "<path_base> - parte 2", ...) de a lo sumo
+    `max_filas_archivo` filas, y devuelve una entrada del índice por archivo escrito.
+    """
+    registros: List[Dict] = []
+    partes = 0
+
+    def abrir() -> EscritorMultiple:
+        nonlocal partes
+        partes += 1
+        escritor = crear_escritores(cfg_result, path_base if partes == 1 else f"{path_base} - parte {partes}")
+        escritor.__enter__()
+        return escritor
+
+    def cerrar(escritor: EscritorMultiple) -> None:
+        escritor.__exit__(None, None, None)
+        registros.extend(
+            {"archivo": path.name, "formato": path.suffix.lstrip("."), "filas": escritor.filas,
+             "bytes": path.stat().st_size, "sha256": _sha256(path)}
+            for path in escritor.paths
+        )
+
+    escritor: Optional[EscritorMultiple] = None
+    try:
+        with open(path_lotes, "rb") as archivo:
+            while True:
+                try:
+                    lote = pickle.load(archivo)
+                except EOFError:
+                    break
+                inicio = 0
+                while inicio < len(lote):
+                    escritor = escritor or abrir()
+                    fin = len(lote) if not max_filas_archivo else min(len(lote), inicio + max_filas_archivo - escritor.filas)
+                    escritor.escribir_lote(lote.iloc[inicio:fin])
+                    inicio = fin
+                    if max_filas_archivo and escritor.filas >= max_filas_archivo:
+                        completo, escritor = escritor, None
+                        cerrar(completo)
+        if escritor is not None:
+            completo, escritor = escritor, None
+            cerrar(completo)
+    except BaseException as e:
+        if escritor is not None:
+            escritor.__exit__(type(e), e, e.__traceback__)
+        raise
+    return registros
+
+
+class EscritorParticionado:
+    """
+    Exportación particionada: un resultado por valor de una columna (p. ej. Oficina de
+    ventas o Regional), con el mismo contrato que `EscritorMultiple`.
+
+    Cada lote se reparte por valor y se acumula en un archivo temporal por partición (la
+    memoria sigue acotada por el lote, también en modo streaming). En `esperar` las
+    particiones se escriben en paralelo, cada una en un proceso, en todos los formatos de
+    `Resultados` ("<nom_resultado> - <valor>", con escritura atómica) y se genera el índice
+    "<nom_resultado> - indice.csv" con partición, archivo, formato, filas, bytes y SHA-256.
+    El índice describe el conjunto vigente: archivos de particiones que ya no existen en la
+    base no se borran, pero dejan de figurar en él.
+    """
+    SIN_VALOR = "Sin dato"
+
+    def __init__(
+        self,
+        cfg_result: dict,
+        path_base: str | Path,
+        particion: Callable[[pd.DataFrame], pd.Series],
+        workers: Optional[int] = None,
+        max_filas_archivo: Optional[int] = None,
+    ):
+        """
+        Args:
+            cfg_result (dict): Sección `Resultados` (formatos, motor_xlsx, csv).
+            path_base (str | Path): Ruta del resultado sin extensión; cada partición agrega
+                " - <valor>".
+            particion (Callable[[pd.DataFrame], pd.Series]): Valor de partición de cada fila
+                de un lote (columna de ventas o valor cruzado de drivers).
+            workers (int | None): Procesos de escritura. Si es None, uno por núcleo.
+            max_filas_archivo (int | None): Filas máximas por archivo; una partición mayor se
+                divide en "... - parte 2", "... - parte 3", etc.
+        """
+        self.cfg_result = cfg_result
+        self.path_base = Path(path_base)
+        self.particion = particion
+        self.workers = max(1, workers or os.cpu_count() or 1)
+        self.max_filas_archivo = max_filas_archivo
+        self.filas = 0
+        self.indice: Optional[pd.DataFrame] = None
+        self._dir: Optional[Path] = None
+        self._nombres: Dict[str, str] = {}
+        self._pendientes: Dict[str, Path] = {}
+
+    @property
+    def path_indice(self) -> Path:
+        return self.path_base.with_name(f"{self.path_base.name} - indice.csv")
+
+    @property
+    def paths(self) -> list[Path]:
+        if self.indice is None:
+            return [self.path_indice]
+        return [self.path_base.with_name(nombre) for nombre in self.indice["archivo"]] + [self.path_indice]
+
+    def __enter__(self) -> "EscritorParticionado":
+        self.path_base.parent.mkdir(parents=True, exist_ok=True)
+        self._dir = Path(tempfile.mkdtemp(prefix=f".{self.path_base.name}.particiones_", dir=self.path_base.parent))
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        try:
+            if exc_type is None:
+                self.esperar()
+            else:
+                logger.warning("Exportación particionada interrumpida; no se modificaron los resultados previos.")
+        finally:
+            shutil.rmtree(self._dir, ignore_errors=True)
+
+    def _nombre(self, valor) -> str:
+        """Nombre de archivo de la partición de `valor`, válido en Windows y único."""
+        texto = self.SIN_VALOR if pd.isna(valor) else str(valor)
+        if texto not in self._nombres:
+            nombre = re.sub(r'[<>:"/\\|?*\x00-\x1f]', "_", texto).strip().rstrip(".") or self.SIN_VALOR
+            # Windows no distingue mayúsculas en nombres de archivo
+            usados = {usado.casefold() for usado in self._nombres.values()}
+            base, n = nombre, 1
+            while nombre.casefold() in usados:
+                n += 1
+                nombre = f"{base} ({n})"
+            self._nombres[texto] = nombre
+        return self._nombres[texto]
+
+    def escribir_lote(self, lote: pd.DataFrame) -> None:
+        """
+        Reparte `lote` por valor de partición y agrega cada grupo a su archivo temporal,
+        conservando el orden de las filas.
+
+        Args:
+            lote (pd.DataFrame): Lote a escribir; debe tener siempre las mismas columnas.
+        """
+        codigos, valores = pd.factorize(pd.Series(self.particion(lote)).to_numpy(dtype=object), use_na_sentinel=True)
+        grupos = [(i, valor) for i, valor in enumerate(valores)] + ([(-1, np.nan)] if (codigos < 0).any() else [])
+        for i, valor in grupos:
+            nombre = self._nombre(valor)
+            path_lotes = self._pendientes.setdefault(nombre, self._dir / f"{len(self._pendientes)}.pkl")
+            with open(path_lotes, "ab") as archivo:
+                pickle.dump(lote.iloc[np.flatnonzero(codigos == i)], archivo, protocol=pickle.HIGHEST_PROTOCOL)
+        self.filas += len(lote)
+
+    def escribir_df(self, df: pd.DataFrame, tam_bloque: int = 100_000) -> None:
+        for inicio in range(0, max(len(df), 1), tam_bloque):
+            self.escribir_lote(df.iloc[inicio:inicio + tam_bloque])
+
+    def esperar(self) -> None:
+        """Escribe en paralelo las particiones acumuladas y el índice."""
+        if not self._pendientes:
+            return
+        tareas = {
+            nombre: (self.cfg_result, f"{self.path_base} - {nombre}", str(path_lotes), self.max_filas_archivo)
+            for nombre, path_lotes in self._pendientes.items()
+        }
+        workers = min(self.workers, len(tareas))
+        logger.info(f"Exportación particionada: {len(tareas)} particiones, {self.filas} filas, {workers} procesos")
+
+        registros: Dict[str, List[Dict]] = {}
+        if workers == 1:
+            for nombre, args in tareas.items():
+                registros[nombre] = _escribir_particion(*args)
+        else:
+            # spawn: un fork después de usar los hilos de pyarrow puede bloquear a los trabajadores
+            with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+                futuros = {nombre: pool.submit(_escribir_particion, *args) for nombre, args in tareas.items()}
+                registros = {nombre: futuro.result() for nombre, futuro in futuros.items()}
+        self._pendientes.clear()
+
+        valores = {nombre: texto for texto, nombre in self._nombres.items()}
+        indice = pd.DataFrame(
+            [{"particion": valores[nombre], **registro} for nombre in sorted(registros) for registro in registros[nombre]],
+            columns=["particion", "archivo", "formato", "filas", "bytes", "sha256"],
+        )
+        cfg_csv = self.cfg_result.get("csv", {})
+        path_tmp = self.path_indice.with_name(f".{self.path_indice.name}.tmp")
+        indice.to_csv(path_tmp, sep=cfg_csv.get("sep", ";"), encoding=cfg_csv.get("encoding", "utf-8-sig"), index=False)
+        os.replace(path_tmp, self.path_indice)
+        self.indice = indice
+        logger.success(f"Índice de particiones: {len(indice)} archivos → {self.path_indice}")
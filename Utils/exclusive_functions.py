@@ -1,13 +1,216 @@
+import copy
+import numpy as np
 import pandas as pd
-from typing import Dict, Literal
+from typing import Dict, List, Literal, Optional, Tuple
 from types import SimpleNamespace
 from loguru import logger
+from Utils.transformation_functions import canonizar_serie
+
+
+class IndiceDrivers:
+    """
+    Índice de la base de drivers construido una sola vez por ejecución.
+
+    Para cada columna clave (Cod SAP, Cod Actual) guarda un `pd.Index` de claves únicas y la
+    fila de drivers asociada a cada una. Las búsquedas se resuelven con `Index.get_indexer`
+    y acceso posicional a arreglos NumPy, sin construir diccionarios de Python.
+
+    Ante claves duplicadas se conserva la última ocurrencia (igual que `dict(zip(...))`).
+    Los duplicados quedan registrados en `duplicados`; solo se advierten en el log los que
+    tienen valores distintos en las columnas que se leen por esa clave (Cod SAP se repite por
+    diseño: un agente atiende muchos clientes).
+
+    Si las claves de drivers se normalizaron en la carga (`config_insumos.canonicalizacion`),
+    las claves de ventas se normalizan igual al buscarlas; los valores de ventas no cambian.
+    """
+
+    def __init__(
+        self,
+        df_drivers: pd.DataFrame,
+        cols_drivers: Dict[str, str],
+        busquedas: Optional[List[Tuple[str, str, str]]] = None,
+        cfg_canon: Optional[Dict] = None,
+    ):
+        """
+        Construye el índice sobre las columnas clave de drivers.
+
+        Args:
+            df_drivers (pd.DataFrame): DataFrame de drivers.
+            cols_drivers (Dict[str, str]): Alias -> nombre real de columnas de drivers.
+            busquedas (List[Tuple[str, str, str]] | None): Búsquedas de la homologación como
+                alias (clave de ventas, clave de drivers, valor; ver
+                `VerificadorCodigos.busquedas_de`). Una clave duplicada es conflictiva si sus
+                filas difieren en los valores que se buscan por ella. Si es None, en cualquier columna.
+            cfg_canon (Dict | None): Sección `config_insumos.canonicalizacion`. Las búsquedas
+                por sus `claves_drivers` normalizan las claves consultadas.
+        """
+        self.df_drivers = df_drivers
+        self.D = SimpleNamespace(**cols_drivers)
+        self._cols_valor: Optional[Dict[str, List[str]]] = None
+        if busquedas is not None:
+            self._cols_valor = {}
+            for _, clave_drivers, valor in busquedas:
+                self._cols_valor.setdefault(cols_drivers[clave_drivers], []).append(cols_drivers[valor])
+
+        self.cfg_canon = cfg_canon if cfg_canon and cfg_canon.get("activo") else None
+        self._claves_canon = {cols_drivers[a] for a in (self.cfg_canon or {}).get("claves_drivers", [])}
+
+        self._indices: Dict[str, pd.Index] = {}
+        self._filas: Dict[str, np.ndarray] = {}
+        self._valores: Dict[str, np.ndarray] = {}
+        self.duplicados: Dict[str, pd.DataFrame] = {}
+
+        for col_clave in (self.D.cod_sap, self.D.cod_actual):
+            self._indexar(col_clave)
+
+    def _indexar(self, col_clave: str) -> None:
+        """Indexa `col_clave` conservando la última fila de cada clave y reporta duplicados."""
+        claves = self.df_drivers[col_clave]
+        ultima = ~claves.duplicated(keep="last").to_numpy()
+
+        self._indices[col_clave] = pd.Index(claves.to_numpy(dtype=object, na_value=np.nan)[ultima])
+        self._filas[col_clave] = np.flatnonzero(ultima)
+
+        mask_dup = claves.duplicated(keep=False) & claves.notna()
+        if mask_dup.any():
+            df_dup = self.df_drivers.loc[mask_dup]
+            self.duplicados[col_clave] = df_dup
+            if self._cols_valor is None:
+                cols_valor = [col for col in df_dup.columns if col != col_clave]
+            else:
+                cols_valor = list(dict.fromkeys(c for c in self._cols_valor.get(col_clave, []) if c != col_clave))
+            # Claves duplicadas con valores buscados distintos: el resultado depende del orden
+            conflictivas = []
+            if cols_valor:
+                distintas = df_dup.groupby(col_clave)[cols_valor].nunique(dropna=False).gt(1).any(axis=1)
+                conflictivas = list(distintas[distintas].index)
+            resumen = (
+                f"Drivers: {df_dup[col_clave].nunique()} claves duplicadas en '{col_clave}' "
+                f"({len(df_dup)} filas, {len(conflictivas)} con valores distintos en {cols_valor})."
+            )
+            if conflictivas:
+                logger.warning(f"{resumen} Se conserva la última ocurrencia. Ejemplos: {conflictivas[:5]}")
+            else:
+                logger.debug(resumen)
+
+    def claves_consulta(self, claves: pd.Series, col_clave: str) -> pd.Series:
+        """
+        Claves de ventas tal como se buscan en `col_clave`: normalizadas igual que esa
+        columna de drivers si está en `canonicalizacion.claves_drivers`; si no, sin cambios.
+
+        Args:
+            claves (pd.Series): Claves de ventas (no se modifican).
+            col_clave (str): Columna clave de drivers (Cod SAP o Cod Actual).
+
+        Returns:
+            pd.Series: Claves a consultar, alineadas con `claves`.
+        """
+        if col_clave in self._claves_canon:
+            return canonizar_serie(claves, self.cfg_canon)
+        return claves
+
+    def posiciones(self, claves: pd.Series, col_clave: str) -> np.ndarray:
+        """
+        Devuelve, para cada clave, la fila de drivers que le corresponde (-1 si no existe).
+
+        Args:
+            claves (pd.Series): Claves a buscar (p. ej. Cliente - Clave de ventas), sin
+                normalizar (ver `claves_consulta`). Si es categórica, la búsqueda se hace
+                sobre las categorías.
+            col_clave (str): Columna clave de drivers indexada (Cod SAP o Cod Actual).
+
+        Returns:
+            np.ndarray: Posiciones de fila en drivers.
+        """
+        return self._posiciones(self.claves_consulta(claves, col_clave), col_clave)
+
+    def _posiciones(self, claves: pd.Series, col_clave: str) -> np.ndarray:
+        if isinstance(claves.dtype, pd.CategoricalDtype):
+            # Se busca cada categoría una sola vez y se difunde por los códigos
+            # (el vacío, código -1, se busca como NaN igual que en la ruta object).
+            pos_cat = self._posiciones(pd.Series([*claves.cat.categories, np.nan], dtype=object), col_clave)
+            return pos_cat[claves.cat.codes.to_numpy()]
+        # NA homogéneo (pd.NA de string[pyarrow] → NaN) para el mismo resultado que con object
+        pos = self._indices[col_clave].get_indexer(np.asarray(claves.to_numpy(dtype=object, na_value=np.nan)))
+        return np.where(pos >= 0, self._filas[col_clave][pos], -1)
+
+    def valores(self, posiciones: np.ndarray, col_valor: str) -> np.ndarray:
+        """
+        Toma `col_valor` de drivers en las `posiciones` dadas; NaN donde la posición es -1.
+
+        Args:
+            posiciones (np.ndarray): Posiciones devueltas por `posiciones`.
+            col_valor (str): Columna de drivers a devolver.
+
+        Returns:
+            np.ndarray: Arreglo de objetos alineado con `posiciones`.
+        """
+        if col_valor not in self._valores:
+            self._valores[col_valor] = self.df_drivers[col_valor].to_numpy(dtype=object)
+        encontrado = posiciones >= 0
+        res = np.full(len(posiciones), np.nan, dtype=object)
+        res[encontrado] = self._valores[col_valor][posiciones[encontrado]]
+        return res
+
+    def resolver(self, claves: pd.Series, col_clave: str, col_valor: str) -> pd.Series:
+        """
+        Equivalente vectorizado de `claves.map(dict(zip(drivers[col_clave], drivers[col_valor])))`.
+
+        Args:
+            claves (pd.Series): Claves a buscar.
+            col_clave (str): Columna clave de drivers.
+            col_valor (str): Columna de drivers a devolver.
+
+        Returns:
+            pd.Series: Valores encontrados (NaN si no hay match), con el índice de `claves`.
+        """
+        return pd.Series(
+            self.valores(self.posiciones(claves, col_clave), col_valor),
+            index=claves.index,
+            dtype=object
+        )
+
+
+def factorizar_filas(df: pd.DataFrame, columnas: List[str]) -> Tuple[np.ndarray, int]:
+    """
+    Código de combinación por fila: filas con los mismos valores en `columnas` reciben el
+    mismo código (los nulos cuentan como un valor más). Los códigos se numeran en orden de
+    primera aparición.
+
+    Args:
+        df (pd.DataFrame): DataFrame a factorizar.
+        columnas (List[str]): Columnas que forman la combinación.
+
+    Returns:
+        Tuple[np.ndarray, int]: Código por fila y número de combinaciones distintas.
+    """
+    combinado = np.zeros(len(df), dtype=np.int64)
+    cardinalidad = 1
+    for col in columnas:
+        serie = df[col]
+        if isinstance(serie.dtype, pd.CategoricalDtype):
+            codigos, k = serie.cat.codes.to_numpy(dtype=np.int64) + 1, len(serie.cat.categories) + 1
+        else:
+            codigos, unicos = pd.factorize(serie)
+            codigos, k = codigos.astype(np.int64) + 1, len(unicos) + 1
+        if cardinalidad * k >= 2**62:
+            # Se renumera lo acumulado para que el código mixto no desborde int64
+            combinado, unicos = pd.factorize(combinado)
+            cardinalidad = len(unicos)
+        combinado = combinado * k + codigos
+        cardinalidad *= k
+    codigos, unicos = pd.factorize(combinado)
+    return codigos, len(unicos)
 
 
 class VerificadorCodigos:
     """
     Valida y aplica la lógica de asignación de códigos entre las bases de ventas y drivers.
     Replica la lógica de la fórmula Excel de manera vectorizada.
+
+    Las salidas dependen solo de unas pocas columnas de ventas (`columnas_entrada`), cuyas
+    combinaciones se repiten en millones de filas: `aplicar` evalúa las reglas una vez por
+    combinación única y difunde el resultado a las filas.
     """
     TIPO_ATENCION = "I"
     COD_HASH = "#"
@@ -15,6 +218,17 @@ class VerificadorCodigos:
     RESULTADO_SIN_COD_CORREGIDO = "SIN COD AC CORREGIDO"
     RESULTADO_SIN_COD_AC = "SIN COD AC"
     SIN_ASIGNAR = "Sin asignar"
+    # Búsquedas en drivers de la fórmula Excel: (clave de ventas, clave de drivers, valor)
+    BUSQUEDAS = [
+        ("agente_comercial_clave", "cod_sap", "cambio_cod_ecom_crm"),
+        ("cliente_clave", "cod_actual", "cod_cliente_alt"),
+        ("cliente_clave", "cod_actual", "cod_jefe_ventas"),
+        ("cliente_clave", "cod_actual", "jefe_ventas"),
+    ]
+    # Columnas de ventas de las que dependen las salidas de la fórmula Excel
+    COLUMNAS_ENTRADA = ["tipo_venta", "agente_comercial_clave", "agente_comercial", "cliente_clave", "codigo_ecom"]
+    # Por encima de esta proporción de combinaciones únicas por fila, se evalúa fila a fila
+    MAX_PROPORCION_UNICOS = 0.5
     
     def __init__(
         self,
@@ -22,6 +236,10 @@ class VerificadorCodigos:
         df_drivers: pd.DataFrame,
         cols_vtas: Dict[str, str],
         cols_drivers: Dict[str, str],
+        indice: Optional[IndiceDrivers] = None,
+        reglas: Optional[Dict] = None,
+        deduplicar: bool = True,
+        motor_reglas: Optional[str] = None,
     ):
         """
         Inicializa el verificador con los DataFrames y sus mapeos de columnas.
@@ -31,25 +249,190 @@ class VerificadorCodigos:
             df_drivers (pd.DataFrame): DataFrame de drivers.
             cols_vtas (Dict[str, str]): Alias -> nombre real de columnas de ventas.
             cols_drivers (Dict[str, str]): Alias -> nombre real de columnas de drivers.
+            indice (IndiceDrivers | None): Índice de drivers ya construido. Si es None,
+                se construye a partir de `df_drivers`.
+            reglas (Dict | None): Sección `reglas_homologacion` de la configuración. Si se
+                indica, `aplicar` usa el motor de reglas en una sola pasada.
+            deduplicar (bool): Si True, `aplicar` evalúa las reglas sobre las combinaciones
+                únicas de `columnas_entrada` y difunde el resultado.
+            motor_reglas (str | None): Motor con que se evalúan las reglas declarativas:
+                "pandas" (por defecto) o "polars". Sin `reglas` se usa la fórmula en pandas.
         """
         self.df_vtas = df_vtas
         self.df_drivers = df_drivers
         self.cols_vtas = cols_vtas
         self.cols_drivers = cols_drivers
+        self.deduplicar = deduplicar
 
         # Accesores por punto (azúcar sintáctico). No cambia la lógica de los diccionarios.
         self.V = SimpleNamespace(**cols_vtas)
         self.D = SimpleNamespace(**cols_drivers)
 
-        # Mapa usado por create_col_status (Cod SAP -> Cambio Cod ECOM a CRM)
-        self.mapa_drivers = self._crear_mapa()
+        # Índice de drivers compartido entre llamadas y lotes
+        self.indice = indice if indice is not None else IndiceDrivers(df_drivers, cols_drivers, self.busquedas_de(reglas))
+
+        # Motor de reglas declarativas (opcional; se importa solo si hay reglas)
+        self.reglas = reglas
+        self.motor = None
+        if reglas:
+            from Utils.reglas_functions import crear_motor_reglas
+
+            self.motor = crear_motor_reglas(motor_reglas, reglas, cols_vtas, cols_drivers, self.indice)
+        elif motor_reglas not in (None, "pandas"):
+            logger.warning(f"El motor de reglas '{motor_reglas}' requiere reglas_homologacion. Se usará pandas.")
+
+        # Posiciones en drivers de Cliente - Clave (Cod Actual); se reutilizan en 3 reglas
+        self._pos_cliente: Optional[np.ndarray] = None
+
+    def _lookup_cliente(self, mask: pd.Series, col_valor: str) -> pd.Series:
+        """Busca `col_valor` de drivers por Cliente - Clave (→ Cod Actual) en las filas de `mask`."""
+        if self._pos_cliente is None:
+            self._pos_cliente = self.indice.posiciones(self.df_vtas[self.V.cliente_clave], self.D.cod_actual)
+        return pd.Series(
+            self.indice.valores(self._pos_cliente[mask.to_numpy()], col_valor),
+            index=self.df_vtas.index[mask.to_numpy()],
+            dtype=object
+        )
+
+    def para_lote(self, df_lote: pd.DataFrame) -> "VerificadorCodigos":
+        """
+        Devuelve un verificador sobre `df_lote` que comparte el índice de drivers ya construido.
+
+        Args:
+            df_lote (pd.DataFrame): Lote de ventas con las mismas columnas que la base completa.
+
+        Returns:
+            VerificadorCodigos: Verificador enlazado al lote.
+        """
+        verificador = copy.copy(self)
+        verificador.df_vtas = df_lote
+        verificador._pos_cliente = None
+        return verificador
+
+    @classmethod
+    def busquedas_de(cls, reglas: Optional[Dict] = None) -> List[Tuple[str, str, str]]:
+        """
+        Búsquedas en drivers que usa la homologación con `reglas`, como alias
+        (clave de ventas, clave de drivers, valor de drivers).
+
+        Args:
+            reglas (Dict | None): Sección `reglas_homologacion` de la configuración.
+
+        Returns:
+            List[Tuple[str, str, str]]: Las de `reglas.busquedas` si hay reglas; si no,
+            las de la fórmula Excel (`BUSQUEDAS`).
+        """
+        if reglas:
+            return [(b["clave_vtas"], b["clave_drivers"], b["valor"]) for b in reglas.get("busquedas", {}).values()]
+        return list(cls.BUSQUEDAS)
+
+    def busquedas(self) -> List[Tuple[str, str, str]]:
+        """Búsquedas en drivers de este verificador (ver `busquedas_de`)."""
+        return self.busquedas_de(self.reglas)
+
+    def tasas_cruce(self) -> Dict[str, Dict[str, int]]:
+        """
+        Cobertura de cada cruce con drivers sobre `df_vtas` (una entrada por par clave de
+        ventas → clave de drivers). Cada valor distinto se busca una sola vez.
+
+        Returns:
+            Dict[str, Dict[str, int]]: {"<clave ventas> → <clave drivers>": {filas, con_clave,
+            encontradas}}; `encontradas` cuenta las filas con clave presente en drivers.
+        """
+        tasas: Dict[str, Dict[str, int]] = {}
+        for clave_vtas, clave_drivers, _ in self.busquedas():
+            col_vtas, col_drivers = self.cols_vtas[clave_vtas], self.cols_drivers[clave_drivers]
+            nombre = f"{col_vtas} → {col_drivers}"
+            if nombre in tasas:
+                continue
+            codigos, unicos = pd.factorize(self.df_vtas[col_vtas])
+            encontrado = self.indice.posiciones(pd.Series(unicos, dtype=object), col_drivers) >= 0
+            con_clave = codigos >= 0
+            tasas[nombre] = {
+                "filas": len(codigos),
+                "con_clave": int(con_clave.sum()),
+                "encontradas": int(encontrado[codigos[con_clave]].sum()),
+            }
+        return tasas
+
+    def columnas_salida(self, status_col: str = "status") -> List[str]:
+        """
+        Columnas de ventas que escribe `aplicar` (nombres reales).
+
+        Args:
+            status_col (str): Nombre de la columna de estado (sin motor de reglas).
+
+        Returns:
+            List[str]: Columnas de salida.
+        """
+        if self.motor is not None:
+            return self.motor.columnas_salida()
+        V = self.V
+        return [status_col, V.codigo_ecom, V.agente_comercial_clave, V.agente_comercial]
+
+    def columnas_entrada(self) -> List[str]:
+        """
+        Columnas de ventas de las que dependen las salidas de `aplicar` (nombres reales).
+
+        Returns:
+            List[str]: Las referenciadas por el motor de reglas si está configurado; si no,
+            las de la fórmula Excel (`COLUMNAS_ENTRADA`).
+        """
+        if self.motor is not None:
+            return [col for col in self.motor.columnas_entrada() if col in self.df_vtas.columns]
+        return [self.cols_vtas[alias] for alias in self.COLUMNAS_ENTRADA]
+
+    def aplicar(self, status_col: str = "status") -> pd.DataFrame:
+        """
+        Aplica la homologación completa sobre `df_vtas`, en el orden de la fórmula Excel:
+        status → código ECOM → agente (clave y nombre) → corrección de status.
+
+        Con `deduplicar`, las filas se agrupan por combinación de `columnas_entrada`, las
+        reglas se evalúan una vez por combinación y el resultado se difunde con los códigos de
+        combinación; si casi todas las combinaciones son distintas (más de
+        `MAX_PROPORCION_UNICOS`), se evalúa fila a fila.
+
+        Args:
+            status_col (str): Nombre de la columna de estado.
+
+        Returns:
+            pd.DataFrame: `df_vtas` con las columnas homologadas.
+        """
+        if self.deduplicar and len(self.df_vtas):
+            columnas = self.columnas_entrada()
+            codigos, n_unicos = factorizar_filas(self.df_vtas, columnas)
+            logger.debug(f"Homologación: {n_unicos} combinaciones únicas en {len(self.df_vtas)} filas")
+            if n_unicos <= self.MAX_PROPORCION_UNICOS * len(self.df_vtas):
+                return self._aplicar_difundido(codigos, columnas, status_col)
+        return self._aplicar_filas(status_col)
+
+    def _aplicar_difundido(self, codigos: np.ndarray, columnas: List[str], status_col: str) -> pd.DataFrame:
+        """Evalúa las reglas sobre la primera fila de cada combinación y difunde las salidas."""
+        # Los códigos aparecen en orden creciente: cada máximo nuevo es una primera aparición
+        maximo = np.maximum.accumulate(codigos)
+        primeras = np.flatnonzero(np.r_[True, maximo[1:] > maximo[:-1]])
+        df_unicos = self.df_vtas[columnas].iloc[primeras].reset_index(drop=True)
+        df_unicos = self.para_lote(df_unicos)._aplicar_filas(status_col)
+        for col in self.columnas_salida(status_col):
+            self.df_vtas[col] = df_unicos[col].to_numpy(dtype=object)[codigos]
+        return self.df_vtas
+
+    def _aplicar_filas(self, status_col: str = "status") -> pd.DataFrame:
+        """
+        Evalúa las reglas fila a fila sobre `df_vtas`. Con motor de reglas configurado, todas
+        las salidas se calculan en una sola pasada (`status_col` lo define la configuración);
+        si no, se encadenan los métodos `create_col_*`.
+        """
+        if self.motor is not None:
+            return self.motor.aplicar(self.df_vtas)
 
-    def _crear_mapa(self) -> Dict[str, str]:
-        """Mapea Cod SAP -> Cambio Cod ECOM a CRM."""
-        return dict(zip(
-            self.df_drivers[self.D.cod_sap],
-            self.df_drivers[self.D.cambio_cod_ecom_crm]
-        ))
+        V = self.V
+        self.df_vtas[status_col] = self.create_col_status()
+        self.df_vtas[V.codigo_ecom] = self.create_col_cod_cliente_alt()
+        self.df_vtas[V.agente_comercial_clave] = self.create_col_agente_resuelta(driver_val="cod", fallback="clave")
+        self.df_vtas[V.agente_comercial] = self.create_col_agente_resuelta(driver_val="nombre", fallback="nombre")
+        self.df_vtas[status_col] = self.corregir_status_sin_cod_ac(status_col=status_col)
+        return self.df_vtas
 
     def create_col_status(self) -> pd.Series:
         """
@@ -68,8 +451,11 @@ class VerificadorCodigos:
 
         serie_status.loc[mask_tipo_I & mask_hash] = self.RESULTADO_SIN_COD_CORREGIDO
         serie_status.loc[mask_lookup] = (
-            self.df_vtas.loc[mask_lookup, self.V.agente_comercial_clave]
-            .map(self.mapa_drivers)
+            self.indice.resolver(
+                self.df_vtas.loc[mask_lookup, self.V.agente_comercial_clave],
+                self.D.cod_sap,
+                self.D.cambio_cod_ecom_crm
+            )
             .fillna(self.RESULTADO_OK)
         )
         return serie_status
@@ -88,17 +474,12 @@ class VerificadorCodigos:
             pd.Series: Serie con el código calculado.
         """
         res = (pd.Series(False, index=self.df_vtas.index)
-               if literal_if_false else self.df_vtas[self.V.codigo_ecom].copy())
+               if literal_if_false else self.df_vtas[self.V.codigo_ecom].astype(object))
 
-        mapa_hk = dict(zip(
-            self.df_drivers[self.D.cod_actual],
-            self.df_drivers[self.D.cod_cliente_alt]
-        ))
         mask_tipo_I = (self.df_vtas[self.V.tipo_venta] == self.TIPO_ATENCION)
 
         res.loc[mask_tipo_I] = (
-            self.df_vtas.loc[mask_tipo_I, self.V.cliente_clave]
-            .map(mapa_hk)
+            self._lookup_cliente(mask_tipo_I, self.D.cod_cliente_alt)
             .fillna(self.df_vtas.loc[mask_tipo_I, self.V.codigo_ecom])
         )
         return res
@@ -122,7 +503,8 @@ class VerificadorCodigos:
             pd.Series: Serie con el agente resuelto.
         """
         fb_col = self.V.agente_comercial_clave if fallback == "clave" else self.V.agente_comercial
-        res = self.df_vtas[fb_col].copy()
+        # astype(object) copia y admite valores fuera de las categorías del esquema
+        res = self.df_vtas[fb_col].astype(object)
 
         mask = (
             (self.df_vtas[self.V.tipo_venta] == self.TIPO_ATENCION) &
@@ -130,11 +512,9 @@ class VerificadorCodigos:
         )
 
         drv_val = self.D.cod_jefe_ventas if driver_val == "cod" else self.D.jefe_ventas
-        mapa = dict(zip(self.df_drivers[self.D.cod_actual], self.df_drivers[drv_val]))
 
         res.loc[mask] = (
-            self.df_vtas.loc[mask, self.V.cliente_clave]
-            .map(mapa)
+            self._lookup_cliente(mask, drv_val)
             .fillna(self.df_vtas.loc[mask, fb_col])
         )
         return res
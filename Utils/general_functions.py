@@ -1,23 +1,9 @@
 # Funciones generales del proyecto
+# pandas solo aparece en anotaciones: cargar la configuración no lo requiere.
+from __future__ import annotations
 from loguru import logger
-from typing import Optional
 from pathlib import Path
 import yaml
-import pandas as pd 
-import time
-
-def Registro_tiempo(original_func):
-    def wrapper(*args, **kwargs):
-        start_time = time.time()
-        result = original_func(*args, **kwargs)
-        end_time = time.time()
-        execution_time = end_time - start_time
-        logger.info(
-            f"Tiempo de ejecución de {original_func.__name__}: {execution_time} segundos"
-        )
-        return result
-
-    return wrapper
 
 def procesar_configuracion(nom_archivo_configuracion: str) -> dict:
     """Lee un archivo YAML de configuración para un proyecto.
@@ -41,98 +27,50 @@ def procesar_configuracion(nom_archivo_configuracion: str) -> dict:
 
 
 
-@Registro_tiempo
-def Lectura_insumos_excel(
-    path_insumo: str, nom_hoja: str , engine = "openpyxl", cols_verificados: Optional[list[str]] = None, modo_pruebas=False 
-) -> pd.DataFrame:
+def Lectura_encabezado_excel(libro: pd.ExcelFile, nom_hoja: str) -> pd.DataFrame:
     """
-    Lee datos desde un archivo Excel en una hoja específica, con soporte para modo de pruebas.
-
-    - En **modo normal** (`modo_pruebas=False`): carga todas las filas y todas las columnas.
-    - En **modo pruebas** (`modo_pruebas=True`): carga solo 2 filas y restringe la lectura
-      a las columnas indicadas en `cols_verificados`.
+    Lee únicamente la fila de encabezados de una hoja de un libro ya abierto.
 
     Args:
-        path_insumo (str): Ruta absoluta al archivo Excel (incluye extensión).
+        libro (pd.ExcelFile): Libro de Excel abierto previamente.
         nom_hoja (str): Nombre de la hoja a leer.
-        engine (str, opcional): Motor de lectura de pandas (`openpyxl` por defecto).
-        cols_verificados (list[str], opcional): Columnas esperadas a leer en modo pruebas.
-            Si `modo_pruebas=False`, este argumento se ignora.
-        modo_pruebas (bool, opcional): Si es `True`, carga mínima de datos
-            (2 filas + columnas verificadas). Por defecto es `False`.
 
     Returns:
-        pd.DataFrame: DataFrame con los datos leídos de la hoja seleccionada.
-
-    Raises:
-        Exception: Si ocurre un error durante la lectura del archivo.
+        pd.DataFrame: DataFrame vacío cuyas columnas son los encabezados de la hoja
+            (con la misma desambiguación de duplicados que aplica pandas: "Col", "Col.1").
     """
-    base_leida = None
-    archivo = Path(path_insumo).name
-    try:
-        
-        nrows = 2 if modo_pruebas else None
-        usecols = cols_verificados if modo_pruebas else None
-        
-        logger.info(f"Inicio lectura {archivo} Hoja: {nom_hoja}")
-        base_leida = pd.read_excel(
-            path_insumo,
-            sheet_name=nom_hoja,
-            dtype=str,
-            engine=engine,
-            nrows=nrows,
-            usecols=usecols
-            
-        )
-
-        logger.success(
-            f"Lectura de {archivo},  hoja: {nom_hoja} realizada con éxito"
-        )  # Se registrará correctamente con el método "success"
-    except Exception as e:
-        logger.error(f"Proceso de lectura fallido: {e}")
-        raise Exception
-
-    return base_leida
+    return libro.parse(sheet_name=nom_hoja, nrows=0, dtype=str)
 
 
-def Lectura_simple_excel(path: str, nom_insumo: str, nom_hoja=None) -> pd.DataFrame:
-    """Lee archivos de Excel con cualquier extensión y carga los datos de una hoja específica.
+def Lectura_columnas_excel(
+    libro: pd.ExcelFile, nom_hoja: str, encabezado: pd.Index, columnas: list[str]
+) -> pd.DataFrame:
+    """
+    Lee el cuerpo de una hoja de un libro ya abierto, proyectado a `columnas`.
 
-    Lee el archivo especificado por `nom_insumo` ubicado en la ruta `path` y carga los datos de la hoja
-    especificada por `nom_Hoja`. Selecciona solo las columnas indicadas por `cols`.
+    La selección se hace por posición a partir de `encabezado` (leído con
+    `Lectura_encabezado_excel`), de modo que columnas con nombre duplicado en el
+    archivo ("Cod Cliente" / "Cod Cliente.1") se resuelven igual que en la lectura completa.
 
     Args:
-        path (str): Ruta de la carpeta donde se encuentra el archivo.
-        nom_insumo (str): Nombre del archivo con extensión.
-        nom_Hoja (str): Nombre de la hoja del archivo que se quiere leer.
-        
+        libro (pd.ExcelFile): Libro de Excel abierto previamente.
+        nom_hoja (str): Nombre de la hoja a leer.
+        encabezado (pd.Index): Encabezados de la hoja.
+        columnas (list[str]): Columnas a conservar, en el orden de la hoja.
 
     Returns:
-        Si nom_hoja != None 
-            pd.DataFrame: Dataframe que contiene los datos leídos del archivo Excel.
-        Si nom_hoja == None
-            dict ({sheets : pd.Dataframe}) : Diccionario cuyas claves son los nombres de las hojas del archivo .xlsx , y los valores son de tipo pd.Dataframe. 
-    Raises:
-        Exception: Si ocurre un error durante el proceso de lectura del archivo.
+        pd.DataFrame: DataFrame con todas las filas y solo las columnas solicitadas.
     """
-    base_leida = None
-
+    archivo = Path(str(libro.io)).name
+    seleccion = set(columnas)
+    posiciones = [i for i, col in enumerate(encabezado) if col in seleccion]
     try:
-        logger.info(f"Inicio lectura {nom_insumo}")
-        if nom_hoja == None:
-            base_leida = pd.read_excel(
-                path + nom_insumo, dtype=str, sheet_name=nom_hoja
-            )
-        else:
-            base_leida = pd.read_excel(
-                path + nom_insumo, dtype=str, 
-            )
-
-        logger.success(
-            f"Lectura de {nom_insumo} realizada con éxito"
-        )  # Se registrará correctamente con el método "success"
+        logger.info(f"Inicio lectura {archivo} Hoja: {nom_hoja} ({len(posiciones)} columnas)")
+        base_leida = libro.parse(sheet_name=nom_hoja, dtype=str, usecols=posiciones)
+        base_leida.columns = encabezado[posiciones]
+        logger.success(f"Lectura de {archivo},  hoja: {nom_hoja} realizada con éxito")
     except Exception as e:
         logger.error(f"Proceso de lectura fallido: {e}")
         raise Exception
 
-    return base_leida
\ No newline at end of file
+    return base_leida
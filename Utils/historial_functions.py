@@ -0,0 +1,307 @@
+# Historial consultable de ventas homologadas (SQLite embebido, una corrida por ejecución)
+from __future__ import annotations
+from loguru import logger
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+import sqlite3
+import time
+import uuid
+import numpy as np
+import pandas as pd
+
+# Alias de cols_vtas con los que se particiona y consulta el historial
+COL_PERIODO = "anio_mes"
+COL_CLIENTE = "cliente_clave"
+COLS_AGENTE = ["agente_comercial_clave", "agente_comercial"]
+COL_STATUS = "status"
+# Filas por INSERT (executemany) al agregar una base o lote
+TAM_BLOQUE = 50_000
+# Segundos que una ejecución espera a que otra (p. ej. otro canal) libere la base
+ESPERA_BLOQUEO_SEG = 600
+
+
+class HistorialVentas:
+    """
+    Historial local de los resultados homologados de cada ejecución, en una base SQLite.
+
+    - `ventas`: filas homologadas con su `id_corrida`, una columna por alias de cols_vtas
+      (TEXT o REAL) más `status`; índices por cliente y por (periodo, corrida).
+    - `periodos`: catálogo de particiones por Año/Mes: qué corrida aportó cada periodo y
+      cuántas filas. Para cada archivo de ventas y periodo, la corrida vigente es la última
+      confirmada que lo incluye (vistas `periodos_vigentes` y `ventas_vigentes`): los canales
+      de una ejecución multicanal conviven en el mismo periodo.
+    - `totales_agente`: filas y totales de venta por corrida, periodo, agente y status,
+      calculados al confirmar la corrida para que las consultas por agente no recorran `ventas`.
+    - `corridas`: id, fecha, archivo de ventas, huella de drivers/reglas y filas.
+
+    Las filas se confirman por bloques (otras ejecuciones que escriben en la misma base, como
+    los canales en paralelo, solo esperan un bloque), pero no son visibles en las consultas
+    hasta que `confirmar` registra la corrida; si la ejecución falla antes, `cerrar` las borra.
+    """
+
+    def __init__(self, path_db: str | Path, cols_vtas: Dict[str, str]):
+        """
+        Args:
+            path_db (str | Path): Archivo SQLite. Se crea (con su carpeta) si no existe.
+            cols_vtas (Dict[str, str]): Alias -> nombre real de columnas de ventas.
+        """
+        self.path = Path(path_db)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.cols_vtas = cols_vtas
+        self.conexion = sqlite3.connect(self.path, timeout=ESPERA_BLOQUEO_SEG)
+        self.conexion.execute("PRAGMA journal_mode=WAL")
+        self.conexion.execute("PRAGMA synchronous=NORMAL")
+        self._crear_esquema()
+        self.id_corrida: Optional[str] = None
+        self.filas = 0
+        self.confirmada = False
+
+    def _crear_esquema(self) -> None:
+        self.conexion.executescript(
+            f"""
+            CREATE TABLE IF NOT EXISTS corridas (
+                id_corrida TEXT PRIMARY KEY, fecha TEXT, archivo_vtas TEXT, huella_drivers TEXT, filas INTEGER
+            );
+            CREATE TABLE IF NOT EXISTS ventas (id_corrida TEXT NOT NULL, {COL_PERIODO} TEXT, {COL_STATUS} TEXT);
+            CREATE TABLE IF NOT EXISTS periodos (
+                {COL_PERIODO} TEXT, id_corrida TEXT, filas INTEGER, PRIMARY KEY ({COL_PERIODO}, id_corrida)
+            );
+            CREATE INDEX IF NOT EXISTS ix_ventas_periodo ON ventas ({COL_PERIODO}, id_corrida);
+            """
+        )
+        # Vigente: la última corrida confirmada (rowid de `corridas`, en orden de confirmación)
+        # de cada archivo de ventas y periodo. Se recrean para actualizar bases anteriores.
+        self.conexion.executescript(
+            f"""
+            BEGIN;
+            DROP VIEW IF EXISTS ventas_vigentes;
+            DROP VIEW IF EXISTS periodos_vigentes;
+            CREATE VIEW periodos_vigentes AS
+                SELECT {COL_PERIODO}, archivo_vtas, id_corrida FROM (
+                    SELECT p.{COL_PERIODO}, c.archivo_vtas, p.id_corrida, ROW_NUMBER() OVER (
+                        PARTITION BY p.{COL_PERIODO}, c.archivo_vtas ORDER BY c.rowid DESC
+                    ) AS orden
+                    FROM periodos p JOIN corridas c USING (id_corrida)
+                ) WHERE orden = 1;
+            CREATE VIEW ventas_vigentes AS
+                SELECT v.* FROM ventas v JOIN periodos_vigentes p USING ({COL_PERIODO}, id_corrida);
+            COMMIT;
+            """
+        )
+        self.conexion.commit()
+
+    def _columnas(self, tabla: str) -> List[str]:
+        return [fila[1] for fila in self.conexion.execute(f"PRAGMA table_info({tabla})")]
+
+    def _asegurar_columnas(self, df: pd.DataFrame) -> Dict[str, str]:
+        """
+        Columnas de `df` que se guardan (alias -> nombre real); las que aún no existen en
+        `ventas` se agregan (REAL si son numéricas, TEXT si no).
+        """
+        columnas = {alias: col for alias, col in self.cols_vtas.items() if col in df.columns}
+        columnas[COL_STATUS] = COL_STATUS
+        if set(columnas) - set(self._columnas("ventas")):
+            # Otra ejecución (otro canal) puede estar agregando las mismas columnas: se vuelven
+            # a leer con la base bloqueada para escritura
+            self.conexion.execute("BEGIN IMMEDIATE")
+            existentes = set(self._columnas("ventas"))
+            for alias, col in columnas.items():
+                if alias not in existentes:
+                    tipo = "REAL" if pd.api.types.is_numeric_dtype(df[col]) else "TEXT"
+                    self.conexion.execute(f'ALTER TABLE ventas ADD COLUMN "{alias}" {tipo}')
+            if COL_CLIENTE in columnas:
+                self.conexion.execute(f"CREATE INDEX IF NOT EXISTS ix_ventas_cliente ON ventas ({COL_CLIENTE})")
+            self.conexion.commit()
+        return columnas
+
+    def agregar(self, df_vtas: pd.DataFrame) -> None:
+        """
+        Agrega una base (o lote) homologada a la corrida en curso, que se inicia con la
+        primera llamada. Cada bloque se confirma por separado para no bloquear la base; las
+        filas no son visibles en las consultas hasta `confirmar`.
+
+        Args:
+            df_vtas (pd.DataFrame): Ventas homologadas (con la columna de status).
+        """
+        if self.id_corrida is None:
+            self.id_corrida = f"{time.strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:6]}"
+        if not len(df_vtas):
+            return
+        columnas = self._asegurar_columnas(df_vtas)
+        # Filas en el orden de los índices (periodo, cliente): las inserciones en sus árboles B
+        # quedan contiguas en lugar de dispersas, bastante más rápidas en bases grandes
+        claves = [columnas[alias] for alias in [COL_CLIENTE, COL_PERIODO] if alias in columnas]
+        df = df_vtas[list(dict.fromkeys(columnas.values()))]
+        if claves:
+            df = df.take(np.lexsort([pd.factorize(df[col], sort=True)[0] for col in claves]))
+        tipos = {fila[1]: fila[2] for fila in self.conexion.execute("PRAGMA table_info(ventas)")}
+        valores = []
+        for alias, col in columnas.items():
+            serie = df[col]
+            if tipos[alias] == "REAL":
+                valores.append(pd.to_numeric(serie, errors="coerce").astype(object).where(serie.notna(), None).to_numpy())
+            else:
+                valores.append(serie.astype("string").to_numpy(dtype=object, na_value=None))
+
+        nombres = ", ".join(["id_corrida", *(f'"{alias}"' for alias in columnas)])
+        marcas = ", ".join(["?"] * (len(columnas) + 1))
+        sentencia = f"INSERT INTO ventas ({nombres}) VALUES ({marcas})"
+        id_corrida = np.full(len(df_vtas), self.id_corrida, dtype=object)
+        for inicio in range(0, len(df_vtas), TAM_BLOQUE):
+            bloque = slice(inicio, inicio + TAM_BLOQUE)
+            self.conexion.executemany(sentencia, zip(id_corrida[bloque], *(v[bloque] for v in valores)))
+            self.conexion.commit()
+        self.filas += len(df_vtas)
+
+    def confirmar(self, archivo_vtas: str, huella_drivers: str) -> Optional[str]:
+        """
+        Registra la corrida en curso (periodos y totales por agente) y la hace visible.
+
+        Args:
+            archivo_vtas (str): Nombre del insumo de ventas.
+            huella_drivers (str): Huella de drivers y reglas (ver `huella_drivers`).
+
+        Returns:
+            str | None: Id de la corrida, o None si no se agregó ninguna base.
+        """
+        if self.id_corrida is None:
+            return None
+        columnas = set(self._columnas("ventas"))
+        agentes = [alias for alias in COLS_AGENTE if alias in columnas]
+        valores = [fila[1] for fila in self.conexion.execute("PRAGMA table_info(ventas)") if fila[2] == "REAL"]
+        # Periodos y totales se calculan en tablas temporales, fuera de la transacción de
+        # escritura: la base solo queda bloqueada mientras se registran
+        grupo = ", ".join([COL_PERIODO, *agentes, COL_STATUS])
+        sumas = "".join(f', SUM("{col}") AS "{col}"' for col in valores)
+        self.conexion.execute("DROP TABLE IF EXISTS _periodos")
+        self.conexion.execute("DROP TABLE IF EXISTS _totales")
+        self.conexion.execute(
+            f"CREATE TEMP TABLE _periodos AS SELECT {COL_PERIODO}, id_corrida, COUNT(*) AS filas FROM ventas "
+            f"WHERE id_corrida = ? GROUP BY {COL_PERIODO}",
+            (self.id_corrida,),
+        )
+        self.conexion.execute(
+            f"CREATE TEMP TABLE _totales AS SELECT id_corrida, {grupo}, COUNT(*) AS filas{sumas} "
+            f"FROM ventas WHERE id_corrida = ? GROUP BY {grupo}",
+            (self.id_corrida,),
+        )
+        self.conexion.execute(
+            "INSERT INTO corridas VALUES (?, ?, ?, ?, ?)",
+            (self.id_corrida, time.strftime("%Y-%m-%d %H:%M:%S"), archivo_vtas, huella_drivers, self.filas),
+        )
+        self.conexion.execute(f"INSERT INTO periodos SELECT {COL_PERIODO}, id_corrida, filas FROM _periodos")
+        if "totales_agente" not in {fila[0] for fila in self.conexion.execute("SELECT name FROM sqlite_master")}:
+            self.conexion.execute("CREATE TABLE totales_agente AS SELECT * FROM _totales WHERE 0")
+            self.conexion.execute(f"CREATE INDEX ix_totales_periodo ON totales_agente ({COL_PERIODO}, id_corrida)")
+        existentes = set(self._columnas("totales_agente"))
+        nuevas = [col for col in self._columnas("_totales") if col not in existentes]
+        for col in nuevas:
+            self.conexion.execute(f'ALTER TABLE totales_agente ADD COLUMN "{col}"')
+        lista = ", ".join(f'"{col}"' for col in self._columnas("_totales"))
+        self.conexion.execute(f"INSERT INTO totales_agente ({lista}) SELECT {lista} FROM _totales")
+        self.conexion.commit()
+        self.conexion.execute("DROP TABLE _periodos")
+        self.conexion.execute("DROP TABLE _totales")
+        self.confirmada = True
+        logger.info(f"Historial: corrida {self.id_corrida} con {self.filas} filas registrada en {self.path}")
+        return self.id_corrida
+
+    def cerrar(self) -> None:
+        """Cierra la conexión; las filas de una corrida sin `confirmar` se borran."""
+        try:
+            if self.id_corrida is not None and not self.confirmada:
+                self.conexion.rollback()
+                self.conexion.execute("DELETE FROM ventas WHERE id_corrida = ?", (self.id_corrida,))
+                self.conexion.commit()
+                logger.warning(f"Historial: corrida {self.id_corrida} sin confirmar descartada")
+        finally:
+            self.conexion.close()
+
+    def consultar(self, sql: str, parametros: tuple = ()) -> pd.DataFrame:
+        """Ejecuta una consulta de solo lectura y devuelve el resultado como DataFrame."""
+        cursor = self.conexion.execute(sql, parametros)
+        return pd.DataFrame(cursor.fetchall(), columns=[d[0] for d in cursor.description])
+
+    def corridas(self) -> pd.DataFrame:
+        """Corridas registradas, de la más reciente a la más antigua."""
+        return self.consultar("SELECT * FROM corridas ORDER BY id_corrida DESC")
+
+    def historial_cliente(self, cliente_clave: str, todas_corridas: bool = False) -> pd.DataFrame:
+        """
+        Status y asignación de un Cliente - Clave por periodo.
+
+        Args:
+            cliente_clave (str): Clave del cliente, tal como aparece en el resultado.
+            todas_corridas (bool): Si es True, incluye cada corrida que tocó el periodo (para
+                ver cómo cambió el status entre ejecuciones); si no, solo la vigente.
+
+        Returns:
+            pd.DataFrame: Filas del cliente ordenadas por periodo y corrida.
+        """
+        # Todas las corridas confirmadas (las filas de una corrida en curso no se muestran)
+        tabla = "(SELECT v.* FROM ventas v JOIN corridas USING (id_corrida))" if todas_corridas else "ventas_vigentes"
+        return self.consultar(
+            f"SELECT * FROM {tabla} WHERE {COL_CLIENTE} = ? ORDER BY {COL_PERIODO}, id_corrida",
+            (cliente_clave,),
+        )
+
+    def totales_agente(
+        self,
+        agente: Optional[str] = None,
+        desde: Optional[str] = None,
+        hasta: Optional[str] = None,
+    ) -> pd.DataFrame:
+        """
+        Filas por status y totales de venta por agente y periodo (corrida vigente de cada
+        archivo de ventas y periodo).
+
+        Args:
+            agente (str | None): Clave o nombre del agente; si es None, todos.
+            desde (str | None): Primer periodo (inclusive), en el formato de Año/Mes.
+            hasta (str | None): Último periodo (inclusive).
+
+        Returns:
+            pd.DataFrame: Una fila por periodo y agente: filas por status, filas y totales.
+        """
+        if "totales_agente" not in set(self.consultar("SELECT name FROM sqlite_master")["name"]):
+            return pd.DataFrame()
+        agentes = [col for col in COLS_AGENTE if col in self._columnas("totales_agente")]
+        filtros, parametros = [], []
+        if agente is not None:
+            filtros.append("(" + " OR ".join(f"t.{col} = ?" for col in agentes) + ")")
+            parametros += [agente] * len(agentes)
+        if desde is not None:
+            filtros.append(f"t.{COL_PERIODO} >= ?")
+            parametros.append(desde)
+        if hasta is not None:
+            filtros.append(f"t.{COL_PERIODO} <= ?")
+            parametros.append(hasta)
+        donde = f"WHERE {' AND '.join(filtros)}" if filtros else ""
+        df = self.consultar(
+            f"SELECT t.* FROM totales_agente t JOIN periodos_vigentes p USING ({COL_PERIODO}, id_corrida) {donde}",
+            tuple(parametros),
+        )
+        if df.empty:
+            return df
+        grupo = ["id_corrida", COL_PERIODO, *agentes]
+        valores = [col for col in df.columns if col not in [*grupo, COL_STATUS]]
+        df[grupo] = df[grupo].fillna("")
+        conteos = df.pivot_table(index=grupo, columns=COL_STATUS, values="filas", aggfunc="sum", fill_value=0)
+        totales = df.groupby(grupo)[valores].sum()
+        return conteos.join(totales).reset_index().sort_values([COL_PERIODO, *agentes], kind="stable")
+
+
+def crear_historial(cfg_historial: Optional[Dict[str, Any]], cols_vtas: Dict[str, str]) -> Optional[HistorialVentas]:
+    """
+    Historial según `Resultados.historial`, o None si no está activo.
+
+    Args:
+        cfg_historial (Dict | None): Sección `Resultados.historial` (activo, path_db).
+        cols_vtas (Dict[str, str]): Alias -> nombre real de columnas de ventas.
+
+    Returns:
+        HistorialVentas | None: Historial listo para `agregar`.
+    """
+    if not cfg_historial or not cfg_historial.get("activo"):
+        return None
+    return HistorialVentas(cfg_historial.get("path_db", "Historial/historial.sqlite"), cols_vtas)
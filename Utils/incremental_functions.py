@@ -0,0 +1,379 @@
+# Almacén local de resultados por periodo para la ejecución incremental
+from __future__ import annotations
+from loguru import logger
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+import hashlib
+import json
+import os
+import numpy as np
+import pandas as pd
+
+
+def huella_df(df: pd.DataFrame) -> str:
+    """
+    Huella del contenido de un DataFrame (valores y orden de filas y columnas).
+
+    Args:
+        df (pd.DataFrame): DataFrame a resumir.
+
+    Returns:
+        str: Hash hexadecimal.
+    """
+    h = hashlib.blake2b(digest_size=16)
+    h.update("|".join(map(str, df.columns)).encode("utf-8"))
+    h.update(pd.util.hash_pandas_object(df, index=False).to_numpy().tobytes())
+    return h.hexdigest()
+
+
+def huella_reglas(reglas: Optional[Dict[str, Any]] = None) -> str:
+    """
+    Huella de la sección `reglas_homologacion` (independiente del orden de las claves).
+
+    Args:
+        reglas (Dict[str, Any] | None): Sección `reglas_homologacion`.
+
+    Returns:
+        str: Hash hexadecimal.
+    """
+    return hashlib.blake2b(
+        json.dumps(reglas or {}, sort_keys=True, ensure_ascii=False).encode("utf-8"), digest_size=16
+    ).hexdigest()
+
+
+def huella_drivers(df_drivers: pd.DataFrame, reglas: Optional[Dict[str, Any]] = None) -> str:
+    """
+    Huella de los drivers y de las reglas usadas: si cualquiera cambia, todo periodo
+    almacenado con otra huella deja de estar vigente.
+
+    Args:
+        df_drivers (pd.DataFrame): Base de drivers.
+        reglas (Dict[str, Any] | None): Sección `reglas_homologacion`.
+
+    Returns:
+        str: Hash hexadecimal.
+    """
+    h = hashlib.blake2b(digest_size=16)
+    h.update(huella_df(df_drivers).encode("utf-8"))
+    h.update(huella_reglas(reglas).encode("utf-8"))
+    return h.hexdigest()
+
+
+class AlmacenPeriodos:
+    """
+    Almacén en disco de resultados homologados, una partición Parquet por periodo (Año/Mes).
+
+    Cada partición guarda la huella de las filas de entrada del periodo y la de los drivers
+    con que se calculó (`manifiesto.json`). Un periodo se recalcula solo si es nuevo, si sus
+    filas cambiaron o si cambiaron los drivers/reglas.
+
+    `salida.json` registra la última exportación (huella del conjunto de periodos, orden de
+    filas y configuración de resultados, más tamaño y fecha de cada archivo escrito) para
+    omitirla cuando no cambió nada y los archivos siguen intactos.
+    """
+    MANIFIESTO = "manifiesto.json"
+    SALIDA = "salida.json"
+
+    def __init__(self, path_store: str | Path, nombre_base: str):
+        """
+        Args:
+            path_store (str | Path): Carpeta raíz del almacén. Se crea si no existe.
+            nombre_base (str): Nombre de la base de ventas (una subcarpeta por base/canal).
+        """
+        self.path = Path(path_store) / nombre_base
+        self.path.mkdir(parents=True, exist_ok=True)
+        self.manifiesto: Dict[str, Dict[str, Any]] = self._cargar_json(
+            self.MANIFIESTO, "Manifiesto incremental ilegible, se recalcularán todos los periodos"
+        )
+        self.salida: Dict[str, Any] = self._cargar_json(
+            self.SALIDA, "Registro de la última exportación ilegible, se exportará de nuevo"
+        )
+
+    def _cargar_json(self, nombre: str, aviso: str) -> Dict[str, Any]:
+        path = self.path / nombre
+        if not path.is_file():
+            return {}
+        try:
+            return json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError) as e:
+            logger.warning(f"{aviso}: {e}")
+            return {}
+
+    def _guardar_json(self, nombre: str, contenido: Dict[str, Any]) -> None:
+        path = self.path / nombre
+        tmp = path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(contenido, indent=2, ensure_ascii=False), encoding="utf-8")
+        os.replace(tmp, path)
+
+    def guardar_manifiesto(self) -> None:
+        """Escribe el manifiesto de forma atómica."""
+        self._guardar_json(self.MANIFIESTO, self.manifiesto)
+
+    def huella_salida(self, particiones: Dict[str, np.ndarray], cfg_result: Dict[str, Any], out_path: str) -> str:
+        """
+        Huella de la exportación que resultaría de los periodos almacenados: periodos y sus
+        huellas, orden original de las filas, configuración de resultados y ruta de salida.
+
+        Args:
+            particiones (Dict[str, np.ndarray]): {periodo: posiciones} (ver `particionar_por_periodo`).
+            cfg_result (Dict[str, Any]): Sección `Resultados` de la configuración.
+            out_path (str): Ruta del resultado sin extensión.
+
+        Returns:
+            str: Hash hexadecimal.
+        """
+        h = hashlib.blake2b(digest_size=16)
+        h.update(json.dumps(
+            [[periodo, self.manifiesto[periodo]["huella_entrada"], self.manifiesto[periodo]["huella_drivers"]]
+             for periodo in particiones],
+            ensure_ascii=False
+        ).encode("utf-8"))
+        for posiciones in particiones.values():
+            h.update(np.ascontiguousarray(posiciones, dtype=np.int64).tobytes())
+        h.update(json.dumps([cfg_result, str(out_path)], sort_keys=True, ensure_ascii=False, default=str).encode("utf-8"))
+        return h.hexdigest()
+
+    def salida_vigente(self, huella: str) -> bool:
+        """Indica si la última exportación corresponde a `huella` y sus archivos no se modificaron."""
+        if self.salida.get("huella") != huella:
+            return False
+        for archivo in self.salida.get("archivos", []):
+            path = Path(archivo["path"])
+            if not path.is_file():
+                return False
+            estado = path.stat()
+            if estado.st_size != archivo["bytes"] or estado.st_mtime_ns != archivo["mtime_ns"]:
+                return False
+        return True
+
+    def registrar_salida(self, huella: str, paths: List[Path], filas: int) -> None:
+        """
+        Registra la exportación recién escrita (ver `salida_vigente`).
+
+        Args:
+            huella (str): Huella de la exportación (ver `huella_salida`).
+            paths (List[Path]): Archivos escritos (detalle, resumen, índice).
+            filas (int): Filas del resultado.
+        """
+        archivos = []
+        for path in paths:
+            estado = Path(path).stat()
+            archivos.append({"path": str(path), "bytes": estado.st_size, "mtime_ns": estado.st_mtime_ns})
+        self.salida = {"huella": huella, "filas": filas, "archivos": archivos}
+        self._guardar_json(self.SALIDA, self.salida)
+
+    @staticmethod
+    def _archivo(periodo: str) -> str:
+        seguro = "".join(c if c.isalnum() else "_" for c in periodo)
+        return f"periodo={seguro}_{hashlib.blake2b(periodo.encode('utf-8'), digest_size=4).hexdigest()}.parquet"
+
+    def vigente(self, periodo: str, huella_entrada: str, huella_drv: str) -> bool:
+        """Indica si la partición almacenada de `periodo` sigue siendo válida."""
+        entrada = self.manifiesto.get(periodo)
+        return (
+            entrada is not None
+            and entrada["huella_entrada"] == huella_entrada
+            and entrada["huella_drivers"] == huella_drv
+            and (self.path / entrada["archivo"]).is_file()
+        )
+
+    def leer(self, periodo: str) -> pd.DataFrame:
+        """Lee la partición almacenada de `periodo`."""
+        return pd.read_parquet(self.path / self.manifiesto[periodo]["archivo"])
+
+    def guardar(self, periodo: str, df: pd.DataFrame, huella_entrada: str, huella_drv: str) -> None:
+        """Guarda (o reemplaza) la partición de `periodo` y actualiza el manifiesto en memoria."""
+        archivo = self._archivo(periodo)
+        tmp = self.path / f".{archivo}.tmp"
+        df.reset_index(drop=True).to_parquet(tmp, index=False)
+        os.replace(tmp, self.path / archivo)
+        self.manifiesto[periodo] = {
+            "archivo": archivo,
+            "huella_entrada": huella_entrada,
+            "huella_drivers": huella_drv,
+            "filas": len(df),
+        }
+
+    def purgar(self, periodos_actuales: set[str]) -> None:
+        """Elimina las particiones de periodos que ya no están en la base de ventas."""
+        for periodo in set(self.manifiesto) - periodos_actuales:
+            (self.path / self.manifiesto.pop(periodo)["archivo"]).unlink(missing_ok=True)
+            logger.info(f"Incremental: periodo {periodo} eliminado del almacén")
+
+
+def particionar_por_periodo(df_vtas: pd.DataFrame, col_periodo: str) -> Dict[str, np.ndarray]:
+    """
+    Posiciones de fila de cada periodo, en orden de primera aparición.
+
+    Args:
+        df_vtas (pd.DataFrame): Base de ventas.
+        col_periodo (str): Columna de periodo (Año/Mes).
+
+    Returns:
+        Dict[str, np.ndarray]: {periodo: posiciones}.
+    """
+    codigos, periodos = pd.factorize(df_vtas[col_periodo].astype(object).fillna("(vacío)"), sort=False)
+    orden = np.argsort(codigos, kind="stable")
+    limites = np.searchsorted(codigos[orden], np.arange(len(periodos) + 1))
+    return {
+        str(periodo): orden[limites[i]:limites[i + 1]]
+        for i, periodo in enumerate(periodos)
+    }
+
+
+class AlmacenDelta:
+    """
+    Última ejecución de una base de ventas: resultado homologado, drivers con que se calculó
+    y huellas de la base de ventas, de los drivers y de las reglas.
+
+    Si la base de ventas y las reglas no cambiaron, un cambio de drivers se resuelve
+    recalculando solo las filas que tocan claves modificadas (ver `filas_afectadas`) y
+    parchando el resultado almacenado.
+    """
+    MANIFIESTO = "manifiesto.json"
+    RESULTADO = "resultado.parquet"
+    DRIVERS = "drivers.parquet"
+
+    def __init__(self, path_store: str | Path, nombre_base: str):
+        """
+        Args:
+            path_store (str | Path): Carpeta raíz del almacén. Se crea si no existe.
+            nombre_base (str): Nombre de la base de ventas (una subcarpeta por base/canal).
+        """
+        self.path = Path(path_store) / nombre_base
+        self.path.mkdir(parents=True, exist_ok=True)
+        self.manifiesto: Dict[str, Any] = self._cargar_manifiesto()
+
+    def _cargar_manifiesto(self) -> Dict[str, Any]:
+        path = self.path / self.MANIFIESTO
+        if not path.is_file():
+            return {}
+        try:
+            return json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError) as e:
+            logger.warning(f"Manifiesto delta ilegible, se homologará la base completa: {e}")
+            return {}
+
+    def motivo_invalido(self, huella_vtas: str, huella_regl: str) -> Optional[str]:
+        """
+        Indica por qué el resultado almacenado no sirve como base del parche.
+
+        Args:
+            huella_vtas (str): Huella de la base de ventas actual.
+            huella_regl (str): Huella de las reglas actuales.
+
+        Returns:
+            str | None: Motivo, o None si el resultado almacenado es utilizable.
+        """
+        if not self.manifiesto:
+            return "no hay una ejecución anterior"
+        if not all((self.path / archivo).is_file() for archivo in (self.RESULTADO, self.DRIVERS)):
+            return "faltan archivos del almacén"
+        if self.manifiesto.get("huella_vtas") != huella_vtas:
+            return "la base de ventas cambió"
+        if self.manifiesto.get("huella_reglas") != huella_regl:
+            return "las reglas cambiaron"
+        return None
+
+    def leer_resultado(self) -> pd.DataFrame:
+        """Resultado homologado de la ejecución anterior."""
+        return pd.read_parquet(self.path / self.RESULTADO)
+
+    def leer_drivers(self) -> pd.DataFrame:
+        """Drivers con que se calculó el resultado almacenado."""
+        return pd.read_parquet(self.path / self.DRIVERS)
+
+    def guardar(self, df_resultado: pd.DataFrame, df_drivers: pd.DataFrame, huellas: Dict[str, str]) -> None:
+        """
+        Reemplaza la ejecución almacenada. Los archivos se escriben en temporales y el
+        manifiesto se escribe al final: una ejecución interrumpida deja el almacén anterior.
+
+        Args:
+            df_resultado (pd.DataFrame): Resultado homologado.
+            df_drivers (pd.DataFrame): Drivers usados.
+            huellas (Dict[str, str]): huella_vtas, huella_reglas y huella_drivers.
+        """
+        (self.path / self.MANIFIESTO).unlink(missing_ok=True)
+        for df, archivo in ((df_resultado, self.RESULTADO), (df_drivers, self.DRIVERS)):
+            tmp = self.path / f".{archivo}.tmp"
+            df.reset_index(drop=True).to_parquet(tmp, index=False)
+            os.replace(tmp, self.path / archivo)
+        self.manifiesto = {**huellas, "filas": len(df_resultado)}
+        path = self.path / self.MANIFIESTO
+        tmp = path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(self.manifiesto, indent=2, ensure_ascii=False), encoding="utf-8")
+        os.replace(tmp, path)
+
+
+def claves_modificadas(
+    df_previo: pd.DataFrame, df_nuevo: pd.DataFrame, col_clave: str, cols_valor: List[str]
+) -> np.ndarray:
+    """
+    Claves de `col_clave` cuya fila vigente en drivers (la última, igual que `IndiceDrivers`)
+    cambió en alguna de `cols_valor`, o que se agregaron o eliminaron.
+
+    Args:
+        df_previo (pd.DataFrame): Drivers de la ejecución anterior.
+        df_nuevo (pd.DataFrame): Drivers actuales.
+        col_clave (str): Columna clave de drivers (Cod SAP, Cod Actual).
+        cols_valor (List[str]): Columnas de drivers que se leen por esa clave.
+
+    Returns:
+        np.ndarray: Claves modificadas (arreglo de objetos; puede incluir NaN).
+    """
+    columnas = [col_clave, *dict.fromkeys(c for c in cols_valor if c != col_clave)]
+
+    def vigentes(df: pd.DataFrame) -> pd.DataFrame:
+        df = df[columnas].drop_duplicates(col_clave, keep="last")
+        # Nulos homogéneos (None de Parquet / NaN de Excel) para comparar entre ejecuciones
+        return pd.DataFrame({c: df[c].to_numpy(dtype=object, na_value=np.nan) for c in columnas})
+
+    # Una clave sin cambios aparece dos veces idéntica; el resto queda sin pareja
+    ambos = pd.concat([vigentes(df_previo), vigentes(df_nuevo)], ignore_index=True)
+    return pd.unique(ambos.loc[~ambos.duplicated(keep=False), col_clave].to_numpy(dtype=object))
+
+
+def filas_afectadas(
+    df_vtas: pd.DataFrame,
+    df_drivers_previo: pd.DataFrame,
+    df_drivers: pd.DataFrame,
+    busquedas: List[Tuple[str, str, str]],
+    cols_vtas: Dict[str, str],
+    cols_drivers: Dict[str, str],
+    indice=None,
+) -> Tuple[np.ndarray, Dict[str, int]]:
+    """
+    Filas de ventas cuyo resultado puede cambiar con los drivers nuevos: las que buscan en
+    drivers (por Cliente - Clave, Agente Comercial - Clave, ...) una clave modificada.
+
+    Args:
+        df_vtas (pd.DataFrame): Base de ventas (columnas de entrada, sin homologar).
+        df_drivers_previo (pd.DataFrame): Drivers de la ejecución anterior.
+        df_drivers (pd.DataFrame): Drivers actuales.
+        busquedas (List[Tuple[str, str, str]]): (clave de ventas, clave de drivers, valor)
+            como alias (ver `VerificadorCodigos.busquedas`).
+        cols_vtas (Dict[str, str]): Alias -> nombre real de columnas de ventas.
+        cols_drivers (Dict[str, str]): Alias -> nombre real de columnas de drivers.
+        indice (IndiceDrivers | None): Índice de las búsquedas. Si se indica, las claves de
+            ventas se comparan normalizadas como al buscarlas (ver `claves_consulta`).
+
+    Returns:
+        Tuple[np.ndarray, Dict[str, int]]: Posiciones de fila afectadas y número de claves
+        modificadas por columna clave de drivers.
+    """
+    valores_por_clave: Dict[Tuple[str, str], List[str]] = {}
+    for clave_vtas, clave_drivers, valor in busquedas:
+        valores_por_clave.setdefault((clave_vtas, clave_drivers), []).append(cols_drivers[valor])
+
+    afectadas = np.zeros(len(df_vtas), dtype=bool)
+    resumen: Dict[str, int] = {}
+    for (clave_vtas, clave_drivers), cols_valor in valores_por_clave.items():
+        col_drivers = cols_drivers[clave_drivers]
+        claves = claves_modificadas(df_drivers_previo, df_drivers, col_drivers, cols_valor)
+        resumen[col_drivers] = resumen.get(col_drivers, 0) + len(claves)
+        if len(claves):
+            consulta = df_vtas[cols_vtas[clave_vtas]]
+            if indice is not None:
+                consulta = indice.claves_consulta(consulta, col_drivers)
+            afectadas |= consulta.isin(claves).to_numpy(dtype=bool, na_value=False)
+    return np.flatnonzero(afectadas), resumen
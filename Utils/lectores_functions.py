@@ -0,0 +1,342 @@
+# Registro de lectores de insumos (Excel con motor configurable, CSV y Parquet)
+from __future__ import annotations
+from abc import ABC, abstractmethod
+from importlib.util import find_spec
+from loguru import logger
+from pathlib import Path
+from typing import Iterable, Iterator, Optional
+import datetime as dt
+import queue
+import threading
+import time
+import pandas as pd
+from pandas.io.parsers import TextParser
+import Utils.general_functions as gf
+from Utils.preflight_functions import leer_encabezado_xlsx
+
+
+# Motor de pandas -> módulo que debe estar instalado para usarlo.
+MOTORES_EXCEL = {
+    "calamine": "python_calamine",
+    "openpyxl": "openpyxl",
+}
+MOTOR_RESPALDO = "openpyxl"
+
+
+def resolver_motor_excel(preferido: Optional[str]) -> str:
+    """
+    Devuelve el motor de lectura Excel a usar, con respaldo automático a openpyxl.
+
+    Args:
+        preferido (str | None): Motor solicitado en la configuración.
+
+    Returns:
+        str: `preferido` si es conocido y está instalado; de lo contrario `MOTOR_RESPALDO`.
+    """
+    if preferido not in MOTORES_EXCEL:
+        if preferido is not None:
+            logger.warning(f"Motor de lectura desconocido '{preferido}'. Se usará {MOTOR_RESPALDO}.")
+        return MOTOR_RESPALDO
+    if find_spec(MOTORES_EXCEL[preferido]) is None:
+        logger.warning(
+            f"Motor '{preferido}' no instalado ({MOTORES_EXCEL[preferido]}). Se usará {MOTOR_RESPALDO}."
+        )
+        return MOTOR_RESPALDO
+    return preferido
+
+
+def _celda_a_texto(valor):
+    """Convierte una celda de openpyxl igual que `pd.read_excel(dtype=str)`."""
+    if isinstance(valor, float) and valor.is_integer():
+        return int(valor)
+    if isinstance(valor, dt.datetime):
+        return pd.Timestamp(valor)
+    return valor
+
+
+def registrar_rendimiento(archivo: str, motor: str, filas: int, segundos: float) -> None:
+    """Registra en el log el motor usado y su rendimiento en filas por segundo."""
+    filas_seg = filas / segundos if segundos > 0 else float("inf")
+    logger.info(f"Lectura {archivo} con motor {motor}: {filas} filas en {segundos:.2f} s ({filas_seg:,.0f} filas/s)")
+
+
+class LectorInsumo(ABC):
+    """
+    Lector base: abre la fuente una sola vez y expone su encabezado y su cuerpo
+    proyectado a un subconjunto de columnas. Se usa como context manager.
+    """
+    motor = ""
+
+    def __init__(self, path: str | Path, hoja: str):
+        self.path = Path(path)
+        self.hoja = hoja
+
+    def __enter__(self) -> "LectorInsumo":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        return None
+
+    @abstractmethod
+    def encabezado(self) -> pd.DataFrame:
+        """Devuelve un DataFrame vacío con los encabezados de la fuente."""
+
+    @abstractmethod
+    def _leer(self, encabezado: pd.Index, columnas: list[str]) -> pd.DataFrame:
+        """Lee el cuerpo completo de la fuente proyectado a `columnas` (ver `leer`)."""
+
+    def leer(self, encabezado: pd.Index, columnas: list[str]) -> pd.DataFrame:
+        """
+        Lee el cuerpo de la fuente proyectado a `columnas` y registra el rendimiento.
+
+        Args:
+            encabezado (pd.Index): Encabezados devueltos por `encabezado()`.
+            columnas (list[str]): Columnas a conservar.
+
+        Returns:
+            pd.DataFrame: Datos leídos, todas las columnas como texto.
+        """
+        inicio = time.perf_counter()
+        df = self._leer(encabezado, columnas)
+        registrar_rendimiento(self.path.name, self.motor, len(df), time.perf_counter() - inicio)
+        return df
+
+    @abstractmethod
+    def iter_lotes(self, encabezado: pd.Index, columnas: list[str], tam_lote: int) -> Iterator[pd.DataFrame]:
+        """
+        Recorre el cuerpo de la fuente en lotes de a lo sumo `tam_lote` filas, proyectados a
+        `columnas`, sin materializar la fuente completa en memoria.
+
+        Args:
+            encabezado (pd.Index): Encabezados devueltos por `encabezado()`.
+            columnas (list[str]): Columnas a conservar.
+            tam_lote (int): Número máximo de filas por lote.
+
+        Yields:
+            pd.DataFrame: Lote con todas las columnas como texto e índice continuo entre lotes.
+        """
+
+
+class LectorExcel(LectorInsumo):
+    """Lector de libros Excel vía `pd.ExcelFile` con el motor configurado."""
+
+    def __init__(self, path: str | Path, hoja: str, motor: Optional[str] = None):
+        super().__init__(path, hoja)
+        self.motor = resolver_motor_excel(motor)
+        self.libro: Optional[pd.ExcelFile] = None
+
+    def __enter__(self) -> "LectorExcel":
+        self.libro = pd.ExcelFile(self.path, engine=self.motor)
+        return self
+
+    def __exit__(self, *exc) -> None:
+        if self.libro is not None:
+            self.libro.close()
+            self.libro = None
+
+    def encabezado(self) -> pd.DataFrame:
+        # Solo la primera fila del XML de la hoja: con calamine, parse(nrows=0) decodifica
+        # la hoja completa, lo que duplicaba el costo de cada lectura.
+        try:
+            return pd.DataFrame(columns=leer_encabezado_xlsx(self.path, self.hoja))
+        except Exception:
+            return gf.Lectura_encabezado_excel(libro=self.libro, nom_hoja=self.hoja)
+
+    def _leer(self, encabezado: pd.Index, columnas: list[str]) -> pd.DataFrame:
+        return gf.Lectura_columnas_excel(
+            libro=self.libro, nom_hoja=self.hoja, encabezado=encabezado, columnas=columnas
+        )
+
+    def iter_lotes(self, encabezado: pd.Index, columnas: list[str], tam_lote: int) -> Iterator[pd.DataFrame]:
+        # pandas no permite leer Excel por partes: se recorre la hoja con openpyxl en modo
+        # read_only (memoria acotada) y cada lote pasa por el mismo parser que read_excel.
+        # Con motor openpyxl se reutiliza el libro ya abierto por pd.ExcelFile.
+        from openpyxl import load_workbook
+
+        seleccion = set(columnas)
+        posiciones = [i for i, col in enumerate(encabezado) if col in seleccion]
+        nombres = list(encabezado[posiciones])
+        propio = self.motor != "openpyxl"
+        libro = (
+            load_workbook(self.path, read_only=True, data_only=True) if propio else self.libro.book
+        )
+        try:
+            hoja = libro[self.hoja]
+            hoja.reset_dimensions()
+            inicio, lote = 0, []
+            for fila in hoja.iter_rows(min_row=2, values_only=True):
+                if all(valor is None for valor in fila):
+                    continue
+                lote.append([_celda_a_texto(fila[i]) if i < len(fila) else None for i in posiciones])
+                if len(lote) == tam_lote:
+                    yield self._lote_a_df(lote, nombres, inicio)
+                    inicio, lote = inicio + len(lote), []
+            if lote:
+                yield self._lote_a_df(lote, nombres, inicio)
+        finally:
+            if propio:
+                libro.close()
+
+    @staticmethod
+    def _lote_a_df(lote: list[list], nombres: list[str], inicio: int) -> pd.DataFrame:
+        df = TextParser(lote, names=nombres, header=None, dtype=str).read()
+        df.index = pd.RangeIndex(inicio, inicio + len(df))
+        return df
+
+
+class LectorCSV(LectorInsumo):
+    """Lector de exportaciones CSV. La hoja se ignora."""
+    motor = "csv"
+
+    def __init__(self, path: str | Path, hoja: str, sep: str = ",", encoding: str = "utf-8-sig"):
+        super().__init__(path, hoja)
+        self.sep = sep
+        self.encoding = encoding
+
+    def encabezado(self) -> pd.DataFrame:
+        return pd.read_csv(self.path, sep=self.sep, encoding=self.encoding, nrows=0, dtype=str)
+
+    def _leer(self, encabezado: pd.Index, columnas: list[str]) -> pd.DataFrame:
+        seleccion = set(columnas)
+        posiciones = [i for i, col in enumerate(encabezado) if col in seleccion]
+        df = pd.read_csv(
+            self.path, sep=self.sep, encoding=self.encoding, dtype=str, usecols=posiciones
+        )
+        df.columns = encabezado[posiciones]
+        return df
+
+    def iter_lotes(self, encabezado: pd.Index, columnas: list[str], tam_lote: int) -> Iterator[pd.DataFrame]:
+        seleccion = set(columnas)
+        posiciones = [i for i, col in enumerate(encabezado) if col in seleccion]
+        with pd.read_csv(
+            self.path, sep=self.sep, encoding=self.encoding, dtype=str,
+            usecols=posiciones, chunksize=tam_lote
+        ) as lector:
+            for lote in lector:
+                lote.columns = encabezado[posiciones]
+                yield lote
+
+
+class LectorParquet(LectorInsumo):
+    """Lector de exportaciones Parquet (requiere pyarrow). La hoja se ignora."""
+    motor = "parquet"
+
+    def encabezado(self) -> pd.DataFrame:
+        import pyarrow.parquet as pq
+        return pd.DataFrame(columns=pq.read_schema(self.path).names)
+
+    def _leer(self, encabezado: pd.Index, columnas: list[str]) -> pd.DataFrame:
+        seleccion = set(columnas)
+        df = pd.read_parquet(self.path, columns=[c for c in encabezado if c in seleccion])
+        return self._a_texto(df)
+
+    @staticmethod
+    def _a_texto(df: pd.DataFrame) -> pd.DataFrame:
+        # Misma representación que la lectura Excel con dtype=str
+        for col in df.columns:
+            if df[col].dtype != object:
+                df[col] = df[col].map(str, na_action="ignore").astype(object)
+        return df
+
+    def iter_lotes(self, encabezado: pd.Index, columnas: list[str], tam_lote: int) -> Iterator[pd.DataFrame]:
+        import pyarrow.parquet as pq
+
+        seleccion = set(columnas)
+        inicio = 0
+        archivo = pq.ParquetFile(self.path)
+        for lote in archivo.iter_batches(batch_size=tam_lote, columns=[c for c in encabezado if c in seleccion]):
+            df = self._a_texto(lote.to_pandas())
+            df.index = pd.RangeIndex(inicio, inicio + len(df))
+            inicio += len(df)
+            yield df
+
+
+def iterar_anticipado(iterable: Iterable, max_pendientes: int = 1) -> Iterator:
+    """
+    Recorre `iterable` en un hilo aparte, manteniendo hasta `max_pendientes` elementos ya
+    producidos: la lectura del siguiente lote se solapa con el procesamiento del actual.
+    Los errores del hilo lector se propagan al consumidor.
+
+    Args:
+        iterable (Iterable): Fuente de elementos (p. ej. `iter_lotes`).
+        max_pendientes (int): Elementos leídos por adelantado como máximo.
+
+    Yields:
+        Los elementos de `iterable`, en el mismo orden.
+    """
+    fin = object()
+    cola: queue.Queue = queue.Queue(maxsize=max(1, max_pendientes))
+    detenido = threading.Event()
+
+    def poner(elemento) -> bool:
+        while not detenido.is_set():
+            try:
+                cola.put(elemento, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def producir() -> None:
+        try:
+            for elemento in iterable:
+                if not poner(elemento):
+                    return
+            poner(fin)
+        except BaseException as e:
+            poner(e)
+
+    hilo = threading.Thread(target=producir, name="lectura_anticipada", daemon=True)
+    hilo.start()
+    try:
+        while True:
+            elemento = cola.get()
+            if elemento is fin:
+                return
+            if isinstance(elemento, BaseException):
+                raise elemento
+            yield elemento
+    finally:
+        detenido.set()
+        hilo.join()
+
+
+LECTORES_POR_EXTENSION = {
+    ".xlsx": LectorExcel,
+    ".xlsm": LectorExcel,
+    ".csv": LectorCSV,
+    ".parquet": LectorParquet,
+}
+
+
+def crear_lector(path: str | Path, hoja: str, cfg_lectura: Optional[dict] = None) -> LectorInsumo:
+    """
+    Crea el lector adecuado según la extensión del archivo y `config_insumos.lectura`.
+
+    Args:
+        path (str | Path): Ruta del insumo.
+        hoja (str): Hoja a leer (solo aplica a Excel).
+        cfg_lectura (dict | None): Configuración de lectura (motor_excel, csv).
+
+    Returns:
+        LectorInsumo: Lector listo para usarse con `with`.
+
+    Raises:
+        ValueError: Si la extensión del archivo no está soportada.
+    """
+    cfg_lectura = cfg_lectura or {}
+    extension = Path(path).suffix.lower()
+    if extension not in LECTORES_POR_EXTENSION:
+        raise ValueError(
+            f"Extensión no soportada: {extension}. Opciones: {list(LECTORES_POR_EXTENSION)}"
+        )
+
+    clase = LECTORES_POR_EXTENSION[extension]
+    if clase is LectorExcel:
+        return LectorExcel(path, hoja, motor=cfg_lectura.get("motor_excel"))
+    if clase is LectorCSV:
+        cfg_csv = cfg_lectura.get("csv", {})
+        return LectorCSV(
+            path, hoja, sep=cfg_csv.get("sep", ","), encoding=cfg_csv.get("encoding", "utf-8-sig")
+        )
+    return clase(path, hoja)
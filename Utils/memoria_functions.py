@@ -0,0 +1,261 @@
+# Plan de memoria: estrategia de ejecución (memoria, lotes o disco) según el tamaño estimado
+#
+# Solo biblioteca estándar y psutil: se ejecuta antes de importar pandas y de cargar ventas.
+from __future__ import annotations
+from loguru import logger
+from pathlib import Path
+from statistics import median
+from typing import Any, Dict, List, Optional, Tuple
+import json
+import os
+import time
+import psutil
+from Utils.perfilado_functions import MonitorRecursos
+from Utils.preflight_functions import EXTENSIONES_EXCEL, dimensiones_xlsx, leer_encabezado_csv
+
+MB = 1024**2
+# Bytes leídos del inicio de un CSV para estimar el largo promedio de sus filas
+MUESTRA_CSV = 1024 * 1024
+# Percentil de los bytes por celda observados que se usa como estimación
+PERCENTIL_CALIBRACION = 0.9
+
+
+class PlanificadorMemoria:
+    """
+    Elige cómo procesar la base de ventas antes de cargarla:
+
+    - "memoria": base completa en memoria (el pico estimado cabe en el límite).
+    - "lotes": por lotes con lectura anticipada y escritura en segundo plano; `tam_lote`
+      se calcula para que los lotes en vuelo quepan en el límite.
+    - "disco": lotes sin colas en memoria (ni lectura anticipada ni escritura en segundo
+      plano): cada lote homologado se escribe a disco antes de leer el siguiente.
+
+    El pico se estima como un costo fijo (procesos de carga, pools) más celdas proyectadas
+    (filas × columnas configuradas) × bytes por celda. Las filas salen del rango
+    `<dimension>` de la hoja (o, si no lo declara, del tamaño comprimido); el límite es el
+    menor entre `presupuesto_mb` y una fracción de la memoria disponible (psutil).
+
+    El pico real del proceso y sus hijos se mide hasta `registrar` y se guarda en
+    `path_calibracion`; las estimaciones siguientes calibran los bytes por celda con esas
+    observaciones (ver `modelo`). Las bases que no superan el costo fijo no lo alteran.
+    """
+
+    def __init__(self, cfg_memoria: Dict[str, Any], config_insumos: Dict[str, Any]):
+        """
+        Args:
+            cfg_memoria (Dict[str, Any]): Sección `ejecucion.memoria`.
+            config_insumos (Dict[str, Any]): Sección `config_insumos` (hoja, columnas, CSV).
+        """
+        self.cfg = cfg_memoria
+        self.config_insumos = config_insumos
+        self.path_calibracion = Path(cfg_memoria.get("path_calibracion", "Calibracion/memoria.json"))
+        self.observaciones: List[Dict[str, Any]] = self._cargar_calibracion()
+        self.plan: Optional[Dict[str, Any]] = None
+        self._monitor: Optional[MonitorRecursos] = None
+
+    def _cargar_calibracion(self) -> List[Dict[str, Any]]:
+        if not self.path_calibracion.is_file():
+            return []
+        try:
+            return json.loads(self.path_calibracion.read_text(encoding="utf-8"))
+        except (OSError, ValueError) as e:
+            logger.warning(f"Calibración de memoria ilegible, se usan los valores por defecto: {e}")
+            return []
+
+    def _calibrado(self, clave: str, por_defecto: float) -> float:
+        """Mediana de `clave` en las observaciones registradas, o el valor configurado si no hay."""
+        valores = [obs[clave] for obs in self.observaciones if obs.get(clave)]
+        return median(valores) if valores else por_defecto
+
+    def modelo(self) -> Tuple[float, float]:
+        """
+        Costo fijo (MB) y bytes por celda del pico. Los bytes por celda se calibran con el
+        percentil `PERCENTIL_CALIBRACION` del exceso sobre el costo fijo por celda observado
+        (conservador: una carga desde la caché de insumos cuesta bastante menos que una
+        lectura del Excel, y subestimar el pico es lo que interrumpe una ejecución).
+
+        Returns:
+            Tuple[float, float]: (costo_fijo_mb, bytes_por_celda).
+        """
+        fijo = float(self.cfg.get("costo_fijo_mb", 150))
+        por_celda = sorted(
+            (obs["mb_observado"] - fijo) * MB / obs["celdas_en_memoria"]
+            for obs in self.observaciones
+            if obs.get("celdas_en_memoria") and obs["mb_observado"] > fijo
+        )
+        if not por_celda:
+            return fijo, float(self.cfg.get("bytes_por_celda", 170))
+        return fijo, por_celda[min(len(por_celda) - 1, int(PERCENTIL_CALIBRACION * len(por_celda)))]
+
+    def estimar(self, path_vtas: str | Path) -> Dict[str, Any]:
+        """
+        Estima filas y pico de memoria de la carga de `path_vtas` sin leer sus datos.
+
+        Args:
+            path_vtas (str | Path): Insumo de ventas (.xlsx/.xlsm, .csv o .parquet).
+
+        Returns:
+            Dict[str, Any]: filas, columnas (proyectadas), origen de las filas, bytes del
+            archivo, bytes por celda usados y mb_estimado.
+        """
+        path = Path(path_vtas)
+        base_vtas = self.config_insumos["base_vtas"]
+        columnas = len(base_vtas["cols_vtas"])
+        bytes_comprimidos = path.stat().st_size
+        filas, origen = None, "tamaño comprimido"
+        sufijo = path.suffix.lower()
+
+        if sufijo in EXTENSIONES_EXCEL:
+            dimensiones = dimensiones_xlsx(path, base_vtas["nom_hoja"])
+            bytes_comprimidos = dimensiones["bytes_comprimidos"]
+            if dimensiones["filas"] is not None:
+                filas, origen = dimensiones["filas"], "dimensión de la hoja"
+        elif sufijo == ".csv":
+            cfg_csv = self.config_insumos.get("lectura", {}).get("csv", {})
+            with open(path, "rb") as archivo:
+                muestra = archivo.read(MUESTRA_CSV)
+            lineas = muestra.count(b"\n")
+            if lineas > 1:
+                filas = max(0, round(bytes_comprimidos / (len(muestra) / lineas)) - 1)
+                origen = "muestra del CSV"
+            columnas = min(columnas, len(leer_encabezado_csv(path, cfg_csv.get("sep", ";"), cfg_csv.get("encoding", "utf-8-sig"))))
+        elif sufijo == ".parquet":
+            try:
+                import pyarrow.parquet as pq
+                filas, origen = pq.ParquetFile(path).metadata.num_rows, "metadatos parquet"
+            except ImportError:
+                pass
+
+        if filas is None:
+            por_celda = self._calibrado("bytes_comprimidos_por_celda", self.cfg.get("bytes_comprimidos_por_celda", 6))
+            filas = round(bytes_comprimidos / (por_celda * columnas))
+
+        costo_fijo_mb, bytes_por_celda = self.modelo()
+        return {
+            "filas": filas,
+            "columnas": columnas,
+            "origen_filas": origen,
+            "bytes_comprimidos": bytes_comprimidos,
+            "costo_fijo_mb": round(costo_fijo_mb, 1),
+            "bytes_por_celda": round(bytes_por_celda, 1),
+            "calibrado": bool(self.observaciones),
+            "mb_estimado": round(costo_fijo_mb + filas * columnas * bytes_por_celda / MB, 1),
+        }
+
+    def planificar(
+        self,
+        path_vtas: str | Path,
+        tam_lote_max: Optional[int] = None,
+        cfg_concurrencia: Optional[Dict[str, Any]] = None,
+    ) -> Dict[str, Any]:
+        """
+        Estima la carga de `path_vtas`, la compara con la memoria disponible y el presupuesto,
+        y elige el modo de ejecución. Desde aquí se mide el pico real hasta `registrar`.
+
+        Args:
+            path_vtas (str | Path): Insumo de ventas.
+            tam_lote_max (int | None): Tamaño máximo de lote (`ejecucion.streaming.tam_lote`).
+            cfg_concurrencia (Dict[str, Any] | None): Sección `ejecucion.concurrencia` activa:
+                cuántos lotes pueden estar en memoria a la vez en modo "lotes".
+
+        Returns:
+            Dict[str, Any]: modo, tam_lote (None en modo "memoria"), límite, disponible y la
+            estimación (ver `estimar`).
+        """
+        estimacion = self.estimar(path_vtas)
+        disponible_mb = psutil.virtual_memory().available / MB
+        limite_mb = disponible_mb * self.cfg.get("fraccion_disponible", 0.7)
+        if self.cfg.get("presupuesto_mb"):
+            limite_mb = min(limite_mb, self.cfg["presupuesto_mb"])
+
+        min_lote = self.cfg.get("min_lote", 10000)
+        tam_lote_max = tam_lote_max or self.cfg.get("tam_lote_max", 500000)
+        mb_por_fila = estimacion["columnas"] * estimacion["bytes_por_celda"] / MB
+        # Lotes en memoria a la vez: el actual, los leídos por adelantado y el que se escribe
+        en_vuelo = 1
+        if cfg_concurrencia:
+            if cfg_concurrencia.get("lectura_anticipada"):
+                en_vuelo += cfg_concurrencia.get("max_lotes_pendientes", 2)
+            if cfg_concurrencia.get("escritura_segundo_plano"):
+                en_vuelo += 1
+
+        # Memoria para filas, descontado el costo fijo
+        para_filas_mb = max(limite_mb - estimacion["costo_fijo_mb"], 0.0)
+
+        if estimacion["mb_estimado"] <= limite_mb:
+            modo, tam_lote = "memoria", None
+        elif mb_por_fila * min_lote * en_vuelo <= para_filas_mb:
+            modo, tam_lote = "lotes", min(int(para_filas_mb / (mb_por_fila * en_vuelo)), tam_lote_max)
+        else:
+            modo = "disco"
+            tam_lote = max(1000, min(int(para_filas_mb / mb_por_fila), min_lote))
+
+        self.plan = {
+            "modo": modo,
+            "tam_lote": tam_lote,
+            "lotes_en_vuelo": en_vuelo if modo == "lotes" else 1,
+            "limite_mb": round(limite_mb, 1),
+            "disponible_mb": round(disponible_mb, 1),
+            "presupuesto_mb": self.cfg.get("presupuesto_mb"),
+            "estimacion": estimacion,
+        }
+        logger.info(
+            f"Plan de memoria: modo '{modo}'{f' (lotes de {tam_lote} filas)' if tam_lote else ''}; "
+            f"estimado {estimacion['mb_estimado']} MB para {estimacion['filas']} filas × "
+            f"{estimacion['columnas']} columnas ({estimacion['origen_filas']}; {estimacion['costo_fijo_mb']} MB "
+            f"fijos + {estimacion['bytes_por_celda']} B/celda{'' if estimacion['calibrado'] else ', sin calibrar'}); "
+            f"límite {self.plan['limite_mb']} MB de {self.plan['disponible_mb']} MB disponibles"
+        )
+        self._monitor = MonitorRecursos("plan_memoria", intervalo=0.05, incluir_hijos=True).__enter__()
+        return self.plan
+
+    @staticmethod
+    def ajustar_concurrencia(plan: Dict[str, Any], cfg_concurrencia: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        """En modo "disco" desactiva las colas en memoria (lectura anticipada y escritura en segundo plano)."""
+        if plan["modo"] != "disco" or not cfg_concurrencia:
+            return cfg_concurrencia
+        return {**cfg_concurrencia, "lectura_anticipada": False, "escritura_segundo_plano": False}
+
+    def registrar(self, filas: Optional[int] = None) -> Optional[Dict[str, Any]]:
+        """
+        Cierra la medición iniciada en `planificar` y agrega la observación a la calibración.
+
+        Args:
+            filas (int | None): Filas realmente procesadas (si se conocen).
+
+        Returns:
+            Dict[str, Any] | None: Observación registrada (MB estimado y observado, celdas en memoria).
+        """
+        if self._monitor is None or self.plan is None:
+            return None
+        self._monitor.__exit__(None, None, None)
+        estimacion = self.plan["estimacion"]
+        filas = filas if filas is not None else estimacion["filas"]
+        tam_lote = self.plan["tam_lote"]
+        filas_en_memoria = min(filas, tam_lote * self.plan["lotes_en_vuelo"]) if tam_lote else filas
+        mb_observado = max(self._monitor.rss_pico_mb - self._monitor.rss_inicio_mb, 0.0)
+        observacion = {
+            "fecha": time.strftime("%Y-%m-%d %H:%M:%S"),
+            "modo": self.plan["modo"],
+            "filas": filas,
+            "filas_en_memoria": filas_en_memoria,
+            "columnas": estimacion["columnas"],
+            # Estimación de lo que estuvo en memoria a la vez (la base completa o los lotes en vuelo)
+            "mb_estimado": round(
+                estimacion["costo_fijo_mb"] + filas_en_memoria * estimacion["columnas"] * estimacion["bytes_por_celda"] / MB, 1
+            ),
+            "mb_observado": round(mb_observado, 1),
+            "celdas_en_memoria": filas_en_memoria * estimacion["columnas"],
+            "bytes_comprimidos_por_celda": round(estimacion["bytes_comprimidos"] / (filas * estimacion["columnas"]), 2) if filas else None,
+        }
+        self.observaciones = [*self.observaciones, observacion][-self.cfg.get("max_observaciones", 20):]
+        self.path_calibracion.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path_calibracion.with_name(f".{self.path_calibracion.name}.tmp")
+        tmp.write_text(json.dumps(self.observaciones, indent=2, ensure_ascii=False), encoding="utf-8")
+        os.replace(tmp, self.path_calibracion)
+        self._monitor = None
+        logger.info(
+            f"Memoria observada: {observacion['mb_observado']} MB (estimado {observacion['mb_estimado']} MB) "
+            f"→ calibración en {self.path_calibracion}"
+        )
+        return observacion
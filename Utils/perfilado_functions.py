@@ -0,0 +1,270 @@
+# Medición de tiempo y memoria por etapa
+from __future__ import annotations
+from contextlib import contextmanager
+from functools import wraps
+from importlib.util import find_spec
+from loguru import logger
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, Optional
+import json
+import os
+import threading
+import time
+import psutil
+
+
+def segundos_desde_inicio_proceso() -> float:
+    """Segundos transcurridos desde que el sistema operativo creó el proceso actual."""
+    return time.time() - psutil.Process().create_time()
+
+
+class MonitorRecursos:
+    """
+    Mide una etapa: tiempo de reloj, tiempo de CPU del proceso y pico de memoria residente
+    (RSS), muestreada en un hilo aparte mientras dura la etapa. Se usa como context manager:
+
+        with MonitorRecursos("carga_vtas") as monitor:
+            df = carga(...)
+        monitor.filas = len(df)
+        monitor.resumen()
+    """
+
+    def __init__(self, nombre: str, intervalo: float = 0.01, incluir_hijos: bool = False):
+        """
+        Args:
+            nombre (str): Nombre de la etapa.
+            intervalo (float): Segundos entre muestras de memoria.
+            incluir_hijos (bool): Sumar la RSS de los procesos hijos (pools de carga y de
+                homologación particionada).
+        """
+        self.nombre = nombre
+        self.intervalo = intervalo
+        self.filas: Optional[int] = None
+        self.segundos = 0.0
+        self.cpu_segundos = 0.0
+        self.rss_inicio_mb = 0.0
+        self.rss_pico_mb = 0.0
+        self.incluir_hijos = incluir_hijos
+        self._proceso = psutil.Process()
+        self._detener = threading.Event()
+        self._hilo: Optional[threading.Thread] = None
+
+    def _rss_mb(self) -> float:
+        rss = self._proceso.memory_info().rss
+        if self.incluir_hijos:
+            for hijo in self._proceso.children(recursive=True):
+                try:
+                    rss += hijo.memory_info().rss
+                except psutil.Error:
+                    # El hijo terminó entre el listado y la lectura
+                    pass
+        return rss / 1024**2
+
+    def _muestrear(self) -> None:
+        while not self._detener.wait(self.intervalo):
+            self.rss_pico_mb = max(self.rss_pico_mb, self._rss_mb())
+
+    def __enter__(self) -> "MonitorRecursos":
+        self.rss_inicio_mb = self.rss_pico_mb = self._rss_mb()
+        self._hilo = threading.Thread(target=self._muestrear, daemon=True)
+        self._hilo.start()
+        self._cpu_inicio = time.process_time()
+        self._inicio = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.segundos = time.perf_counter() - self._inicio
+        self.cpu_segundos = time.process_time() - self._cpu_inicio
+        self._detener.set()
+        self._hilo.join()
+        self.rss_pico_mb = max(self.rss_pico_mb, self._rss_mb())
+
+    def resumen(self) -> Dict[str, Any]:
+        """
+        Returns:
+            Dict[str, Any]: segundos, cpu_segundos, rss_inicio_mb, rss_pico_mb, rss_delta_mb,
+            filas y filas_seg (estas dos solo si se asignó `filas`).
+        """
+        resumen = {
+            "segundos": round(self.segundos, 4),
+            "cpu_segundos": round(self.cpu_segundos, 4),
+            "rss_inicio_mb": round(self.rss_inicio_mb, 1),
+            "rss_pico_mb": round(self.rss_pico_mb, 1),
+            "rss_delta_mb": round(self.rss_pico_mb - self.rss_inicio_mb, 1),
+        }
+        if self.filas is not None:
+            resumen["filas"] = self.filas
+            resumen["filas_seg"] = round(self.filas / self.segundos) if self.segundos > 0 else None
+        return resumen
+
+
+class ReporteEjecucion:
+    """
+    Reporte estructurado de una ejecución: una entrada por etapa con tiempo de reloj, tiempo
+    de CPU, pico de RSS, filas y filas/segundo. Una etapa que se mide varias veces (p. ej.
+    una vez por lote) acumula tiempos y filas y conserva el mayor pico de memoria.
+
+        reporte = ReporteEjecucion()
+        with reporte.etapa("carga_vtas") as etapa:
+            df = carga(...)
+            etapa.filas = len(df)
+        reporte.guardar("Resultados/homologación_vtas")
+    """
+
+    def __init__(self):
+        self.inicio = time.time()
+        self._inicio_perf = time.perf_counter()
+        self._cpu_inicio = time.process_time()
+        self.etapas: Dict[str, Dict[str, Any]] = {}
+        self.datos: Dict[str, Any] = {}
+
+    @contextmanager
+    def etapa(self, nombre: str) -> Iterator[MonitorRecursos]:
+        """
+        Mide el bloque como la etapa `nombre`. Las filas se registran asignando
+        `etapa.filas` dentro del bloque.
+
+        Args:
+            nombre (str): Nombre de la etapa.
+
+        Yields:
+            MonitorRecursos: Monitor de la etapa.
+        """
+        monitor = MonitorRecursos(nombre)
+        try:
+            with monitor:
+                yield monitor
+        finally:
+            self._acumular(monitor)
+
+    def medir(self, nombre: str) -> Callable:
+        """
+        Decorador equivalente a `etapa`: si la función devuelve un objeto con longitud
+        (DataFrame, lista), esa longitud se registra como filas.
+
+        Args:
+            nombre (str): Nombre de la etapa.
+        """
+        def decorador(funcion: Callable) -> Callable:
+            @wraps(funcion)
+            def envoltura(*args, **kwargs):
+                with self.etapa(nombre) as monitor:
+                    resultado = funcion(*args, **kwargs)
+                    if hasattr(resultado, "__len__"):
+                        monitor.filas = len(resultado)
+                return resultado
+            return envoltura
+        return decorador
+
+    def _acumular(self, monitor: MonitorRecursos) -> None:
+        actual = self.etapas.setdefault(monitor.nombre, {
+            "veces": 0, "segundos": 0.0, "cpu_segundos": 0.0, "rss_pico_mb": 0.0, "filas": None
+        })
+        actual["veces"] += 1
+        actual["segundos"] += monitor.segundos
+        actual["cpu_segundos"] += monitor.cpu_segundos
+        actual["rss_pico_mb"] = max(actual["rss_pico_mb"], monitor.rss_pico_mb)
+        if monitor.filas is not None:
+            actual["filas"] = (actual["filas"] or 0) + monitor.filas
+
+    def resumen(self) -> Dict[str, Any]:
+        """
+        Returns:
+            Dict[str, Any]: Reporte serializable (inicio, totales, etapas y `datos` adicionales).
+        """
+        etapas = {}
+        for nombre, medida in self.etapas.items():
+            filas, segundos = medida["filas"], medida["segundos"]
+            etapas[nombre] = {
+                "veces": medida["veces"],
+                "segundos": round(segundos, 4),
+                "cpu_segundos": round(medida["cpu_segundos"], 4),
+                "rss_pico_mb": round(medida["rss_pico_mb"], 1),
+                "filas": filas,
+                "filas_seg": round(filas / segundos) if filas is not None and segundos > 0 else None,
+            }
+        return {
+            "inicio": time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(self.inicio)),
+            "pid": os.getpid(),
+            "total": {
+                "segundos": round(time.perf_counter() - self._inicio_perf, 4),
+                "cpu_segundos": round(time.process_time() - self._cpu_inicio, 4),
+                "rss_pico_mb": round(max([m["rss_pico_mb"] for m in self.etapas.values()], default=0.0), 1),
+            },
+            "etapas": etapas,
+            **self.datos,
+        }
+
+    def guardar(self, path_base: str | Path) -> Path:
+        """
+        Escribe el reporte como JSON en "<path_base>.reporte.json" (junto al resultado).
+
+        Args:
+            path_base (str | Path): Ruta del resultado sin extensión.
+
+        Returns:
+            Path: Ruta del reporte.
+        """
+        path_base = Path(path_base)
+        path = path_base.with_name(path_base.name + ".reporte.json")
+        tmp = path.with_name(f".{path.name}.tmp")
+        resumen = self.resumen()
+        tmp.write_text(json.dumps(resumen, indent=2, ensure_ascii=False, default=str), encoding="utf-8")
+        os.replace(tmp, path)
+        logger.info(
+            "Reporte de ejecución → {}\n{}",
+            path,
+            "\n".join(
+                f"  {nombre:<20} {m['segundos']:>9.2f} s  CPU {m['cpu_segundos']:>9.2f} s  "
+                f"pico {m['rss_pico_mb']:>8.0f} MB  filas/s {m['filas_seg'] or '-'}"
+                for nombre, m in resumen["etapas"].items()
+            ),
+        )
+        return path
+
+
+@contextmanager
+def perfilar(perfilador: Optional[str], path_base: str | Path) -> Iterator[None]:
+    """
+    Perfila el bloque con cProfile o pyinstrument y guarda el volcado junto al resultado:
+    "<path_base>.perfil.prof" (cProfile, legible con pstats/snakeviz) o
+    "<path_base>.perfil.html" (pyinstrument). Sin perfilador no hace nada.
+
+    Args:
+        perfilador (str | None): "cprofile", "pyinstrument" o None.
+        path_base (str | Path): Ruta del resultado sin extensión.
+    """
+    if not perfilador:
+        yield
+        return
+    if perfilador == "pyinstrument" and find_spec("pyinstrument") is None:
+        logger.warning("pyinstrument no está instalado. Se usará cProfile.")
+        perfilador = "cprofile"
+    if perfilador not in ("cprofile", "pyinstrument"):
+        raise ValueError(f"Perfilador no soportado: {perfilador}. Opciones: ['cprofile', 'pyinstrument']")
+
+    path_base = Path(path_base)
+    if perfilador == "cprofile":
+        import cProfile
+
+        perfil = cProfile.Profile()
+        perfil.enable()
+        try:
+            yield
+        finally:
+            perfil.disable()
+            path = path_base.with_name(path_base.name + ".perfil.prof")
+            perfil.dump_stats(path)
+            logger.info(f"Perfil cProfile → {path}")
+    else:
+        from pyinstrument import Profiler
+
+        perfil = Profiler()
+        perfil.start()
+        try:
+            yield
+        finally:
+            perfil.stop()
+            path = path_base.with_name(path_base.name + ".perfil.html")
+            path.write_text(perfil.output_html(), encoding="utf-8")
+            logger.info(f"Perfil pyinstrument → {path}")
@@ -0,0 +1,351 @@
+# Verificación previa de configuración, rutas y encabezados (solo biblioteca estándar)
+#
+# Este módulo no importa pandas, numpy ni lectores de Excel: se ejecuta antes de cargarlos
+# para que un insumo mal nombrado o una columna faltante fallen en milisegundos.
+from __future__ import annotations
+from pathlib import Path, PurePosixPath
+from typing import Any, Dict, List, Optional
+import csv
+import re
+import xml.etree.ElementTree as ET
+import zipfile
+
+
+NS_MAIN = "{http://schemas.openxmlformats.org/spreadsheetml/2006/main}"
+NS_REL = "{http://schemas.openxmlformats.org/officeDocument/2006/relationships}"
+NS_PKG_REL = "{http://schemas.openxmlformats.org/package/2006/relationships}"
+EXTENSIONES_EXCEL = {".xlsx", ".xlsm"}
+FORMATOS_RESULTADO = {"xlsx", "csv", "parquet"}
+TIPOS_ESQUEMA = {"category", "string", "numerico", "texto"}
+
+
+def _columna_a_indice(ref: str) -> int:
+    """ "C5" -> 2 (posición de columna base 0)."""
+    letras = re.match(r"[A-Z]+", ref).group(0)
+    indice = 0
+    for letra in letras:
+        indice = indice * 26 + (ord(letra) - ord("A") + 1)
+    return indice - 1
+
+
+def _desduplicar(columnas: List[str]) -> List[str]:
+    """Renombra encabezados repetidos igual que pandas: "Cod Cliente", "Cod Cliente.1", ..."""
+    conteo: Dict[str, int] = {}
+    resultado = []
+    for col in columnas:
+        actual = conteo.get(col, 0)
+        while actual > 0:
+            conteo[col] = actual + 1
+            col = f"{col}.{actual}"
+            actual = conteo.get(col, 0)
+        resultado.append(col)
+        conteo[col] = actual + 1
+    return resultado
+
+
+def _ruta_hoja(libro: zipfile.ZipFile, nom_hoja: str) -> str:
+    """Ruta dentro del zip del XML de la hoja `nom_hoja`."""
+    workbook = ET.fromstring(libro.read("xl/workbook.xml"))
+    rid = None
+    hojas = []
+    for hoja in workbook.iter(f"{NS_MAIN}sheet"):
+        hojas.append(hoja.get("name"))
+        if hoja.get("name") == nom_hoja:
+            rid = hoja.get(f"{NS_REL}id")
+    if rid is None:
+        raise ValueError(f"La hoja '{nom_hoja}' no existe. Hojas disponibles: {hojas}")
+
+    relaciones = ET.fromstring(libro.read("xl/_rels/workbook.xml.rels"))
+    for rel in relaciones.iter(f"{NS_PKG_REL}Relationship"):
+        if rel.get("Id") == rid:
+            destino = rel.get("Target")
+            if destino.startswith("/"):
+                return destino.lstrip("/")
+            return str(PurePosixPath("xl") / destino)
+    raise ValueError(f"No se encontró la relación {rid} de la hoja '{nom_hoja}'")
+
+
+def _textos_compartidos(libro: zipfile.ZipFile, indices: set[int]) -> Dict[int, str]:
+    """Lee de sharedStrings.xml solo hasta el mayor índice pedido (no el archivo completo)."""
+    if not indices or "xl/sharedStrings.xml" not in libro.namelist():
+        return {}
+    maximo = max(indices)
+    textos: Dict[int, str] = {}
+    i = 0
+    with libro.open("xl/sharedStrings.xml") as archivo:
+        for _, elem in ET.iterparse(archivo, events=("end",)):
+            if elem.tag != f"{NS_MAIN}si":
+                continue
+            if i in indices:
+                textos[i] = "".join(t.text or "" for t in elem.iter(f"{NS_MAIN}t"))
+            elem.clear()
+            i += 1
+            if i > maximo:
+                break
+    return textos
+
+
+def leer_encabezado_xlsx(path: str | Path, nom_hoja: str) -> List[str]:
+    """
+    Encabezado (primera fila) de una hoja .xlsx leyendo el XML del libro con zipfile, sin
+    descomprimir más que la primera fila de la hoja y el inicio de las cadenas compartidas.
+
+    Args:
+        path (str | Path): Ruta del libro.
+        nom_hoja (str): Nombre de la hoja.
+
+    Returns:
+        List[str]: Nombres de columna con la misma deduplicación que pandas.
+
+    Raises:
+        ValueError: Si la hoja no existe o el archivo no es un .xlsx válido.
+    """
+    try:
+        libro = zipfile.ZipFile(path)
+    except zipfile.BadZipFile as e:
+        raise ValueError(f"{Path(path).name} no es un libro .xlsx válido: {e}") from e
+
+    with libro:
+        celdas: Dict[int, tuple[str, str]] = {}
+        with libro.open(_ruta_hoja(libro, nom_hoja)) as archivo:
+            for _, elem in ET.iterparse(archivo, events=("end",)):
+                if elem.tag == f"{NS_MAIN}c":
+                    tipo = elem.get("t", "n")
+                    if tipo == "inlineStr":
+                        valor = "".join(t.text or "" for t in elem.iter(f"{NS_MAIN}t"))
+                    else:
+                        v = elem.find(f"{NS_MAIN}v")
+                        valor = v.text if v is not None and v.text is not None else ""
+                    posicion = _columna_a_indice(elem.get("r")) if elem.get("r") else len(celdas)
+                    celdas[posicion] = (tipo, valor)
+                elif elem.tag == f"{NS_MAIN}row":
+                    break
+
+        textos = _textos_compartidos(libro, {int(v) for t, v in celdas.values() if t == "s" and v})
+
+    if not celdas:
+        return []
+    columnas = []
+    for posicion in range(max(celdas) + 1):
+        tipo, valor = celdas.get(posicion, ("n", ""))
+        if tipo == "s" and valor:
+            valor = textos.get(int(valor), "")
+        elif tipo == "n" and valor.endswith(".0"):
+            valor = valor[:-2]
+        columnas.append(valor if valor != "" else f"Unnamed: {posicion}")
+    return _desduplicar(columnas)
+
+
+def dimensiones_xlsx(path: str | Path, nom_hoja: str) -> Dict[str, Optional[int]]:
+    """
+    Tamaño de una hoja .xlsx sin leer sus celdas: rango declarado en `<dimension>` (al inicio
+    del XML de la hoja) y tamaños del XML descomprimido y comprimido (índice del zip).
+
+    Args:
+        path (str | Path): Ruta del libro.
+        nom_hoja (str): Nombre de la hoja.
+
+    Returns:
+        Dict[str, int | None]: filas (sin encabezado) y columnas del rango, o None si la hoja
+        no declara un rango completo; bytes_xml y bytes_comprimidos de la hoja.
+
+    Raises:
+        ValueError: Si la hoja no existe o el archivo no es un .xlsx válido.
+    """
+    try:
+        libro = zipfile.ZipFile(path)
+    except zipfile.BadZipFile as e:
+        raise ValueError(f"{Path(path).name} no es un libro .xlsx válido: {e}") from e
+
+    with libro:
+        ruta = _ruta_hoja(libro, nom_hoja)
+        info = libro.getinfo(ruta)
+        rango = None
+        with libro.open(ruta) as archivo:
+            for _, elem in ET.iterparse(archivo, events=("start",)):
+                if elem.tag == f"{NS_MAIN}dimension":
+                    rango = elem.get("ref")
+                    break
+                if elem.tag == f"{NS_MAIN}sheetData":
+                    break
+
+    filas = columnas = None
+    # Algunos generadores declaran solo "A1" aunque la hoja tenga datos: no sirve de estimación
+    if rango and ":" in rango:
+        inicio, fin = rango.split(":")
+        filas = int(re.search(r"\d+", fin).group(0)) - int(re.search(r"\d+", inicio).group(0))
+        columnas = _columna_a_indice(fin) - _columna_a_indice(inicio) + 1
+    return {"filas": filas, "columnas": columnas, "bytes_xml": info.file_size, "bytes_comprimidos": info.compress_size}
+
+
+def leer_encabezado_csv(path: str | Path, sep: str = ";", encoding: str = "utf-8-sig") -> List[str]:
+    """
+    Encabezado de un archivo CSV.
+
+    Args:
+        path (str | Path): Ruta del archivo.
+        sep (str): Separador.
+        encoding (str): Codificación.
+
+    Returns:
+        List[str]: Nombres de columna con la misma deduplicación que pandas.
+    """
+    with open(path, "r", encoding=encoding, newline="") as archivo:
+        return _desduplicar(next(csv.reader(archivo, delimiter=sep), []))
+
+
+def _leer_encabezado(path: Path, nom_hoja: str, cfg_lectura: Dict[str, Any]) -> Optional[List[str]]:
+    """Encabezado según la extensión; None si el formato no se puede leer sin dependencias (Parquet)."""
+    extension = path.suffix.lower()
+    if extension in EXTENSIONES_EXCEL:
+        return leer_encabezado_xlsx(path, nom_hoja)
+    if extension == ".csv":
+        cfg_csv = cfg_lectura.get("csv", {})
+        return leer_encabezado_csv(path, cfg_csv.get("sep", ";"), cfg_csv.get("encoding", "utf-8-sig"))
+    return None
+
+
+def _verificar_config(config: Dict[str, Any]) -> List[str]:
+    """Claves obligatorias y valores enumerados de la configuración."""
+    errores = []
+    obligatorias = [
+        ("config_insumos", "path_insumos"),
+        ("config_insumos", "base_vtas", "nom_base"),
+        ("config_insumos", "base_vtas", "nom_hoja"),
+        ("config_insumos", "base_vtas", "cols_vtas"),
+        ("config_insumos", "drivers", "nom_base"),
+        ("config_insumos", "drivers", "nom_hoja"),
+        ("config_insumos", "drivers", "cols_drivers"),
+        ("dict_cols", "cols_ventas"),
+        ("dict_cols", "cols_drivers"),
+        ("Resultados", "path_resultado"),
+    ]
+    for claves in obligatorias:
+        actual: Any = config
+        for clave in claves:
+            actual = actual.get(clave) if isinstance(actual, dict) else None
+        if actual in (None, "", {}):
+            errores.append(f"Configuración: falta la clave {' > '.join(claves)}")
+    if errores:
+        return errores
+
+    base_vtas = config["config_insumos"]["base_vtas"]
+    for alias, tipo in (base_vtas.get("esquema") or {}).items():
+        if alias not in base_vtas["cols_vtas"]:
+            errores.append(f"Configuración: el esquema usa el alias desconocido '{alias}'")
+        if tipo not in TIPOS_ESQUEMA:
+            errores.append(f"Configuración: tipo '{tipo}' de '{alias}' no soportado. Opciones: {sorted(TIPOS_ESQUEMA)}")
+
+    cfg_canon = config["config_insumos"].get("canonicalizacion") or {}
+    cols_drivers = config["config_insumos"]["drivers"]["cols_drivers"]
+    for alias in cfg_canon.get("claves_drivers", []):
+        if alias not in cols_drivers:
+            errores.append(f"Configuración: canonicalizacion.claves_drivers usa el alias desconocido '{alias}'")
+
+    cfg_resumen = config["Resultados"].get("resumen") or {}
+    if cfg_resumen.get("activo"):
+        esquema = base_vtas.get("esquema") or {}
+        for alias in [*cfg_resumen.get("agrupar_por", []), *cfg_resumen.get("valores", [])]:
+            if alias not in base_vtas["cols_vtas"]:
+                errores.append(f"Configuración: Resultados.resumen usa el alias desconocido '{alias}'")
+            elif esquema and alias not in esquema:
+                errores.append(f"Configuración: Resultados.resumen usa '{alias}', que no está en el esquema de ventas")
+
+    cfg_historial = config["Resultados"].get("historial") or {}
+    if cfg_historial.get("activo"):
+        # Alias con que se particiona y consulta (ver Utils.historial_functions)
+        for alias in ["anio_mes", "cliente_clave", "agente_comercial_clave", "agente_comercial"]:
+            if alias not in base_vtas["cols_vtas"]:
+                errores.append(f"Configuración: Resultados.historial requiere el alias '{alias}' en cols_vtas")
+
+    cfg_particionado = config["Resultados"].get("particionado") or {}
+    if cfg_particionado.get("activo"):
+        columna = cfg_particionado.get("columna")
+        esquema = base_vtas.get("esquema") or {}
+        if columna in base_vtas["cols_vtas"]:
+            if esquema and columna not in esquema:
+                errores.append(f"Configuración: Resultados.particionado.columna '{columna}' no está en el esquema de ventas")
+        elif columna not in cols_drivers:
+            errores.append(f"Configuración: Resultados.particionado.columna usa el alias desconocido '{columna}'")
+
+    formatos = config["Resultados"].get("formatos", ["xlsx"])
+    for formato in [formatos] if isinstance(formatos, str) else formatos:
+        if formato not in FORMATOS_RESULTADO:
+            errores.append(f"Configuración: formato de resultado '{formato}' no soportado. Opciones: {sorted(FORMATOS_RESULTADO)}")
+    return errores
+
+
+def verificar_insumo(path: Path, nom_hoja: str, columnas: Dict[str, str], cfg_lectura: Dict[str, Any]) -> List[str]:
+    """
+    Existencia del insumo y presencia de las columnas esperadas en su encabezado.
+
+    Args:
+        path (Path): Ruta del insumo.
+        nom_hoja (str): Hoja a verificar (solo Excel).
+        columnas (Dict[str, str]): Alias -> nombre real de las columnas esperadas.
+        cfg_lectura (Dict[str, Any]): Sección `config_insumos.lectura` (separador CSV).
+
+    Returns:
+        List[str]: Errores encontrados; vacía si el insumo es válido.
+    """
+    if not path.is_file():
+        return [f"Archivo no encontrado: {path.name} en {path.parent}"]
+    try:
+        encabezado = _leer_encabezado(path, nom_hoja, cfg_lectura)
+    except (ValueError, KeyError, OSError, ET.ParseError, UnicodeDecodeError) as e:
+        return [f"{path.name}: no se pudo leer el encabezado ({e})"]
+    if encabezado is None:
+        return []
+    faltantes = [col for col in columnas.values() if col not in encabezado]
+    if faltantes:
+        return [f"{path.name} [{nom_hoja}]: faltan columnas {faltantes}"]
+    return []
+
+
+def preflight(config: Dict[str, Any]) -> List[str]:
+    """
+    Verifica, antes de importar pandas, que la ejecución pueda arrancar: claves de
+    configuración, carpetas de insumos y resultados, existencia de los insumos y columnas
+    esperadas en sus encabezados (.xlsx/.xlsm con zipfile + XML, .csv con csv; los Parquet
+    se verifican luego al leerlos). En modo servicio solo se verifican los drivers.
+
+    Args:
+        config (Dict[str, Any]): Configuración combinada (config.yml + editable.yml).
+
+    Returns:
+        List[str]: Errores encontrados; vacía si todo está en orden.
+    """
+    errores = _verificar_config(config)
+    if errores:
+        return errores
+
+    config_insumos = config["config_insumos"]
+    cfg_lectura = config_insumos.get("lectura", {})
+    path_insumos = Path(config_insumos["path_insumos"])
+    for carpeta, nombre in [(path_insumos, "insumos"), (Path(config["Resultados"]["path_resultado"]), "resultados")]:
+        if not carpeta.is_dir():
+            errores.append(f"La carpeta de {nombre} no existe: {carpeta.resolve()}")
+    if errores:
+        return errores
+
+    base_vtas, drivers = config_insumos["base_vtas"], config_insumos["drivers"]
+    cfg_ejecucion = config.get("ejecucion") or {}
+    cfg_multicanal = cfg_ejecucion.get("multicanal") or {}
+    if (cfg_ejecucion.get("servicio") or {}).get("activo"):
+        # En modo servicio las ventas llegan después; cada archivo se verifica al llegar
+        archivos_vtas = []
+    elif cfg_multicanal.get("activo"):
+        patrones = cfg_multicanal.get("archivos", [])
+        patrones = [patrones] if isinstance(patrones, str) else patrones
+        archivos_vtas = sorted({p for patron in patrones for p in path_insumos.glob(patron) if p.is_file()})
+        if not archivos_vtas:
+            errores.append(f"Ningún archivo de ventas coincide con {patrones} en {path_insumos.resolve()}")
+    else:
+        archivos_vtas = [path_insumos / base_vtas["nom_base"]]
+
+    for path_vtas in archivos_vtas:
+        errores += verificar_insumo(path_vtas, base_vtas["nom_hoja"], base_vtas["cols_vtas"], cfg_lectura)
+    errores += verificar_insumo(
+        path_insumos / drivers["nom_base"], drivers["nom_hoja"], drivers["cols_drivers"], cfg_lectura
+    )
+    return errores
@@ -0,0 +1,209 @@
+# Motor de reglas declarativas para las columnas del semáforo
+from __future__ import annotations
+from importlib.util import find_spec
+from typing import Any, Dict, List, Optional
+from loguru import logger
+import numpy as np
+import pandas as pd
+
+
+MOTORES_REGLAS = ["pandas", "polars"]
+
+
+class MotorReglas:
+    """
+    Evalúa en una sola pasada las reglas de homologación definidas en `reglas_homologacion`
+    (config.yml) sobre una base de ventas.
+
+    - Las condiciones sobre columnas de entrada se evalúan una única vez y se comparten entre
+      todas las salidas.
+    - Las búsquedas en drivers se resuelven con `IndiceDrivers`; las posiciones de cada
+      (clave de ventas, clave de drivers) se calculan una sola vez.
+    - Cada salida se construye sobre un único arreglo NumPy y se asigna al DataFrame al final,
+      sin Series intermedias.
+
+    Fuentes de valor admitidas en `defecto`, `valor` y `respaldo`:
+        {literal: X} · {columna: alias} (valor original de ventas) ·
+        {salida: alias} (última salida calculada, o la entrada si aún no existe) ·
+        {busqueda: nombre, respaldo: fuente}.
+
+    Condiciones: {columna: alias, igual: X} o {columna: alias, en: [X, Y]}; con
+    `sobre: salida` se evalúan sobre la salida ya calculada. En `si`, el prefijo "!" niega.
+    """
+
+    def __init__(self, cfg_reglas: Dict[str, Any], cols_vtas: Dict[str, str], cols_drivers: Dict[str, str], indice):
+        """
+        Args:
+            cfg_reglas (Dict[str, Any]): Sección `reglas_homologacion` de la configuración.
+            cols_vtas (Dict[str, str]): Alias -> nombre real de columnas de ventas.
+            cols_drivers (Dict[str, str]): Alias -> nombre real de columnas de drivers.
+            indice (IndiceDrivers): Índice de drivers ya construido.
+        """
+        self.cols_vtas = cols_vtas
+        self.cols_drivers = cols_drivers
+        self.indice = indice
+        self.condiciones: Dict[str, Dict[str, Any]] = cfg_reglas.get("condiciones", {})
+        self.busquedas: Dict[str, Dict[str, str]] = cfg_reglas.get("busquedas", {})
+        self.salidas: List[Dict[str, Any]] = cfg_reglas["salidas"]
+        self._validar()
+
+    def _validar(self) -> None:
+        """Verifica que las referencias entre condiciones, búsquedas y salidas existan."""
+        for nombre, busqueda in self.busquedas.items():
+            if busqueda["clave_drivers"] not in self.cols_drivers or busqueda["valor"] not in self.cols_drivers:
+                raise ValueError(f"Búsqueda '{nombre}': columnas de drivers desconocidas {busqueda}")
+        for salida in self.salidas:
+            for caso in salida.get("casos", []):
+                for cond in caso["si"]:
+                    if cond.lstrip("!") not in self.condiciones:
+                        raise ValueError(f"Salida '{salida['columna']}': condición desconocida '{cond}'")
+
+    def columnas_entrada(self) -> List[str]:
+        """
+        Nombres reales de las columnas referenciadas por condiciones, búsquedas y fuentes de
+        valor (incluye las salidas, que pueden leerse antes de calcularse). Las salidas solo
+        dependen de estas columnas.
+        """
+        alias: List[str] = []
+
+        def recorrer(nodo: Any) -> None:
+            if isinstance(nodo, dict):
+                for clave, valor in nodo.items():
+                    if clave in ("columna", "salida", "clave_vtas") and isinstance(valor, str):
+                        alias.append(valor)
+                    else:
+                        recorrer(valor)
+            elif isinstance(nodo, list):
+                for elemento in nodo:
+                    recorrer(elemento)
+
+        recorrer([self.condiciones, self.busquedas, self.salidas])
+        return list(dict.fromkeys(self._col(a) for a in alias))
+
+    def columnas_salida(self) -> List[str]:
+        """Nombres reales de las columnas que escriben las salidas, sin repetir."""
+        return list(dict.fromkeys(self._col(salida["columna"]) for salida in self.salidas))
+
+    def _col(self, alias: str) -> str:
+        """Nombre real de una columna de ventas; si no es un alias se usa tal cual (p. ej. 'status')."""
+        return self.cols_vtas.get(alias, alias)
+
+    @staticmethod
+    def _valores_cond(cond: Dict[str, Any]) -> list:
+        return list(cond["en"]) if "en" in cond else [cond["igual"]]
+
+    def _comparar_serie(self, serie: pd.Series, cond: Dict[str, Any]) -> np.ndarray:
+        """Evalúa una condición sobre una columna de ventas; en categóricas compara códigos."""
+        valores = self._valores_cond(cond)
+        if isinstance(serie.dtype, pd.CategoricalDtype):
+            codigos_cond = serie.cat.categories.get_indexer(valores)
+            codigos_cond = codigos_cond[codigos_cond >= 0]
+            return np.isin(serie.cat.codes.to_numpy(), codigos_cond)
+        return serie.isin(valores).to_numpy(dtype=bool, na_value=False)
+
+    def _comparar_arreglo(self, arreglo: np.ndarray, cond: Dict[str, Any]) -> np.ndarray:
+        """Evalúa una condición sobre una salida ya calculada (arreglo de objetos)."""
+        valores = self._valores_cond(cond)
+        if len(valores) == 1:
+            return np.asarray(arreglo == valores[0], dtype=bool)
+        return np.asarray(pd.Series(arreglo).isin(valores).to_numpy(), dtype=bool)
+
+    def aplicar(self, df_vtas: pd.DataFrame) -> pd.DataFrame:
+        """
+        Calcula todas las salidas y las asigna en `df_vtas`.
+
+        Args:
+            df_vtas (pd.DataFrame): Base de ventas.
+
+        Returns:
+            pd.DataFrame: `df_vtas` con las columnas de salida actualizadas.
+        """
+        n = len(df_vtas)
+        entradas: Dict[str, np.ndarray] = {}
+        salidas: Dict[str, np.ndarray] = {}
+        mascaras: Dict[str, np.ndarray] = {}
+        posiciones: Dict[tuple, np.ndarray] = {}
+
+        def entrada(alias: str) -> np.ndarray:
+            if alias not in entradas:
+                entradas[alias] = df_vtas[self._col(alias)].to_numpy(dtype=object, na_value=np.nan)
+            return entradas[alias]
+
+        def ultima(alias: str) -> np.ndarray:
+            return salidas[alias] if alias in salidas else entrada(alias)
+
+        def mascara(nombre: str) -> np.ndarray:
+            if nombre.startswith("!"):
+                return ~mascara(nombre[1:])
+            cond = self.condiciones[nombre]
+            if cond.get("sobre") == "salida":
+                return self._comparar_arreglo(ultima(cond["columna"]), cond)
+            if nombre not in mascaras:
+                mascaras[nombre] = self._comparar_serie(df_vtas[self._col(cond["columna"])], cond)
+            return mascaras[nombre]
+
+        def fuente(spec: Dict[str, Any], m: np.ndarray) -> np.ndarray:
+            if "literal" in spec:
+                return np.full(int(m.sum()), spec["literal"], dtype=object)
+            if "columna" in spec:
+                return entrada(spec["columna"])[m]
+            if "salida" in spec:
+                return ultima(spec["salida"])[m]
+            busqueda = self.busquedas[spec["busqueda"]]
+            clave = (busqueda["clave_vtas"], busqueda["clave_drivers"])
+            if clave not in posiciones:
+                posiciones[clave] = self.indice.posiciones(
+                    df_vtas[self._col(busqueda["clave_vtas"])], self.cols_drivers[busqueda["clave_drivers"]]
+                )
+            vals = self.indice.valores(posiciones[clave][m], self.cols_drivers[busqueda["valor"]])
+            if "respaldo" in spec:
+                faltantes = pd.isna(vals)
+                if faltantes.any():
+                    vals[faltantes] = fuente(spec["respaldo"], m)[faltantes]
+            return vals
+
+        todas = np.ones(n, dtype=bool)
+        for salida in self.salidas:
+            res = np.array(fuente(salida["defecto"], todas), dtype=object, copy=True)
+            asignado = np.zeros(n, dtype=bool)
+            for caso in salida.get("casos", []):
+                m = ~asignado
+                for cond in caso["si"]:
+                    m &= mascara(cond)
+                if m.any():
+                    res[m] = fuente(caso["valor"], m)
+                    asignado |= m
+            salidas[salida["columna"]] = res
+
+        for alias, res in salidas.items():
+            df_vtas[self._col(alias)] = res
+        return df_vtas
+
+
+def crear_motor_reglas(
+    nombre: Optional[str], cfg_reglas: Dict[str, Any], cols_vtas: Dict[str, str], cols_drivers: Dict[str, str], indice
+) -> MotorReglas:
+    """
+    Motor de reglas según `ejecucion.motor_reglas`, con respaldo a pandas si el motor pedido
+    es desconocido o no está instalado.
+
+    Args:
+        nombre (str | None): "pandas" (por defecto) o "polars".
+        cfg_reglas (Dict[str, Any]): Sección `reglas_homologacion`.
+        cols_vtas (Dict[str, str]): Alias -> nombre real de columnas de ventas.
+        cols_drivers (Dict[str, str]): Alias -> nombre real de columnas de drivers.
+        indice (IndiceDrivers): Índice de drivers ya construido.
+
+    Returns:
+        MotorReglas: `MotorReglas` o `MotorReglasPolars`.
+    """
+    if nombre == "polars":
+        if find_spec("polars") is not None:
+            from Utils.reglas_polars_functions import MotorReglasPolars
+
+            logger.info("Motor de reglas: polars")
+            return MotorReglasPolars(cfg_reglas, cols_vtas, cols_drivers, indice)
+        logger.warning("Motor de reglas 'polars' no instalado. Se usará pandas.")
+    elif nombre not in (None, "pandas"):
+        logger.warning(f"Motor de reglas desconocido '{nombre}'. Opciones: {MOTORES_REGLAS}. Se usará pandas.")
+    return MotorReglas(cfg_reglas, cols_vtas, cols_drivers, indice)
@@ -0,0 +1,137 @@
+# Motor de reglas declarativas evaluado con Polars (plan perezoso, joins hash multihilo)
+from __future__ import annotations
+from functools import reduce
+from typing import Any, Dict, List, Tuple
+import numpy as np
+import pandas as pd
+import polars as pl
+from Utils.reglas_functions import MotorReglas
+
+
+class MotorReglasPolars(MotorReglas):
+    """
+    Evalúa las mismas reglas de `reglas_homologacion`, con la misma semántica que
+    `MotorReglas`, como un único plan perezoso de Polars:
+
+    - Cada par (clave de ventas, clave de drivers) es un left join hash contra drivers
+      reducidos a la última fila por clave (igual que `IndiceDrivers`); las claves nulas
+      cruzan entre sí, como en la ruta pandas. Las claves de ventas se cruzan normalizadas
+      como en `IndiceDrivers.claves_consulta`.
+    - Cada salida es una cadena `when/then/otherwise`: el primer caso que se cumple gana.
+    - Las condiciones sobre valores nulos son falsas (también al negarlas con "!"
+      se parte de falso, como `isin` en pandas).
+
+    Polars ejecuta los joins y las expresiones en todos los núcleos. Las salidas se asignan
+    en `df_vtas` como columnas object con NaN en los vacíos, igual que `MotorReglas`.
+    """
+
+    def __init__(self, cfg_reglas: Dict[str, Any], cols_vtas: Dict[str, str], cols_drivers: Dict[str, str], indice):
+        """
+        Args:
+            cfg_reglas (Dict[str, Any]): Sección `reglas_homologacion` de la configuración.
+            cols_vtas (Dict[str, str]): Alias -> nombre real de columnas de ventas.
+            cols_drivers (Dict[str, str]): Alias -> nombre real de columnas de drivers.
+            indice (IndiceDrivers): Índice de drivers; se usa su `df_drivers`.
+        """
+        super().__init__(cfg_reglas, cols_vtas, cols_drivers, indice)
+        self._tablas: List[Tuple[str, str, str, pl.DataFrame]] = self._tablas_busqueda()
+
+    def _tablas_busqueda(self) -> List[Tuple[str, str, str, pl.DataFrame]]:
+        """
+        Una tabla de drivers por par (clave de ventas, clave de drivers), con la clave y una
+        columna por búsqueda ("__b_<nombre>"), reducida a la última fila de cada clave.
+        Cada elemento es (columna de ventas, columna clave de drivers, clave "__k<i>", tabla).
+        """
+        por_par: Dict[Tuple[str, str], List[str]] = {}
+        for nombre, busqueda in self.busquedas.items():
+            por_par.setdefault((busqueda["clave_vtas"], busqueda["clave_drivers"]), []).append(nombre)
+
+        df_drivers = self.indice.df_drivers
+        tablas = []
+        for i, ((clave_vtas, clave_drivers), nombres) in enumerate(por_par.items()):
+            col_clave = self.cols_drivers[clave_drivers]
+            columnas = list(dict.fromkeys([col_clave, *(self.cols_drivers[self.busquedas[n]["valor"]] for n in nombres)]))
+            drv = pl.from_pandas(df_drivers[columnas].astype(object)).select(
+                pl.col(col_clave).cast(pl.String).alias(f"__k{i}"),
+                *(pl.col(self.cols_drivers[self.busquedas[n]["valor"]]).cast(pl.String).alias(f"__b_{n}") for n in nombres),
+            )
+            tablas.append(
+                (self._col(clave_vtas), col_clave, f"__k{i}", drv.unique(subset=[f"__k{i}"], keep="last", maintain_order=True))
+            )
+        return tablas
+
+    def aplicar(self, df_vtas: pd.DataFrame) -> pd.DataFrame:
+        """
+        Calcula todas las salidas con Polars y las asigna en `df_vtas`.
+
+        Args:
+            df_vtas (pd.DataFrame): Base de ventas.
+
+        Returns:
+            pd.DataFrame: `df_vtas` con las columnas de salida actualizadas.
+        """
+        entradas = [col for col in self.columnas_entrada() if col in df_vtas.columns]
+        # Claves de ventas tal como se buscan en drivers (normalizadas, sin tocar las de ventas)
+        consultas = {
+            f"__q{i}": self.indice.claves_consulta(df_vtas[col_vtas], col_drivers)
+            for i, (col_vtas, col_drivers, _, _) in enumerate(self._tablas)
+        }
+        plan = pl.from_pandas(df_vtas[entradas].assign(**consultas)).lazy().with_columns(
+            pl.col(pl.Categorical).cast(pl.String)
+        )
+        for i, (_, _, col_clave, tabla) in enumerate(self._tablas):
+            plan = plan.join(
+                tabla.lazy(),
+                left_on=pl.col(f"__q{i}").cast(pl.String),
+                right_on=col_clave,
+                how="left",
+                nulls_equal=True,
+                maintain_order="left",
+            )
+
+        calculadas: set[str] = set()
+
+        def ultima(alias: str) -> pl.Expr:
+            return pl.col(f"__s_{alias}") if alias in calculadas else pl.col(self._col(alias))
+
+        def mascara(nombre: str) -> pl.Expr:
+            if nombre.startswith("!"):
+                return ~mascara(nombre[1:])
+            cond = self.condiciones[nombre]
+            columna = ultima(cond["columna"]) if cond.get("sobre") == "salida" else pl.col(self._col(cond["columna"]))
+            valores = self._valores_cond(cond)
+            expr = columna == valores[0] if len(valores) == 1 else columna.is_in(valores)
+            return expr.fill_null(False)
+
+        def fuente(spec: Dict[str, Any]) -> pl.Expr:
+            if "literal" in spec:
+                return pl.lit(spec["literal"])
+            if "columna" in spec:
+                return pl.col(self._col(spec["columna"]))
+            if "salida" in spec:
+                return ultima(spec["salida"])
+            valor = pl.col(f"__b_{spec['busqueda']}")
+            return pl.coalesce(valor, fuente(spec["respaldo"])) if "respaldo" in spec else valor
+
+        orden: List[str] = []
+        for salida in self.salidas:
+            expr = fuente(salida["defecto"])
+            casos = salida.get("casos", [])
+            if casos:
+                cadena = None
+                for caso in casos:
+                    m = reduce(lambda a, b: a & b, (mascara(c) for c in caso["si"]), pl.lit(True))
+                    cadena = pl.when(m) if cadena is None else cadena.when(m)
+                    cadena = cadena.then(fuente(caso["valor"]))
+                expr = cadena.otherwise(expr)
+            plan = plan.with_columns(expr.alias(f"__s_{salida['columna']}"))
+            calculadas.add(salida["columna"])
+            if salida["columna"] not in orden:
+                orden.append(salida["columna"])
+
+        resultado = plan.select([f"__s_{alias}" for alias in orden]).collect()
+        for alias in orden:
+            valores = np.asarray(resultado[f"__s_{alias}"].to_numpy(), dtype=object)
+            valores[pd.isna(valores)] = np.nan
+            df_vtas[self._col(alias)] = valores
+        return df_vtas
@@ -0,0 +1,123 @@
+# Resumen del semáforo: conteo de status y totales de venta por oficina, agente y mes
+from typing import Dict, List, Optional
+import numpy as np
+import pandas as pd
+from Utils.exclusive_functions import VerificadorCodigos, factorizar_filas
+
+# Status del semáforo con columna propia en el resumen; cualquier otro valor cuenta en OTRO_STATUS
+STATUS_SEMAFORO = [
+    VerificadorCodigos.RESULTADO_OK,
+    VerificadorCodigos.RESULTADO_SIN_COD_AC,
+    VerificadorCodigos.RESULTADO_SIN_COD_CORREGIDO,
+]
+OTRO_STATUS = "Otro status"
+COL_FILAS = "Filas"
+# Parciales acumulados (uno por lote) antes de combinarlos, para acotar la memoria por lotes
+MAX_PARCIALES = 16
+
+
+class ResumenSemaforo:
+    """
+    Agregados del semáforo por grupo (p. ej. Oficina de ventas, Agente Comercial, Año/Mes):
+    filas por status (`STATUS_SEMAFORO` y `OTRO_STATUS`), total de filas y suma de las
+    columnas de venta.
+
+    Cada `agregar` es una sola pasada vectorizada (código de grupo con `factorizar_filas` y
+    `np.bincount`); los parciales de varios lotes se combinan en `resultado`, por lo que el
+    resumen se calcula igual en modo completo y por lotes.
+    """
+
+    def __init__(self, cols_grupo: List[str], cols_valor: List[str], status_col: str = "status"):
+        """
+        Args:
+            cols_grupo (List[str]): Columnas de agrupación (nombres reales).
+            cols_valor (List[str]): Columnas numéricas a totalizar (nombres reales).
+            status_col (str): Columna de status homologado.
+        """
+        self.cols_grupo = cols_grupo
+        self.cols_valor = cols_valor
+        self.status_col = status_col
+        self.filas = 0
+        self._parciales: List[pd.DataFrame] = []
+
+    def agregar(self, df_vtas: pd.DataFrame) -> None:
+        """
+        Agrega al resumen una base (o lote) ya homologada.
+
+        Args:
+            df_vtas (pd.DataFrame): Ventas con la columna de status.
+        """
+        if not len(df_vtas):
+            return
+        grupos, n_grupos = factorizar_filas(df_vtas, self.cols_grupo)
+        # Los códigos aparecen en orden creciente: cada máximo nuevo es una primera aparición
+        maximo = np.maximum.accumulate(grupos)
+        primeras = np.flatnonzero(np.r_[True, maximo[1:] > maximo[:-1]])
+        parcial = df_vtas[self.cols_grupo].iloc[primeras].astype(object).reset_index(drop=True)
+
+        # Índice de status por fila: posición en STATUS_SEMAFORO u OTRO_STATUS (la última)
+        codigos, valores = pd.factorize(df_vtas[self.status_col].to_numpy(dtype=object))
+        posicion = {status: i for i, status in enumerate(STATUS_SEMAFORO)}
+        por_valor = np.array([posicion.get(valor, len(STATUS_SEMAFORO)) for valor in valores] + [len(STATUS_SEMAFORO)])
+        estados = por_valor[codigos]
+
+        k = len(STATUS_SEMAFORO) + 1
+        conteos = np.bincount(grupos * k + estados, minlength=n_grupos * k).reshape(n_grupos, k)
+        for i, nombre in enumerate([*STATUS_SEMAFORO, OTRO_STATUS]):
+            parcial[nombre] = conteos[:, i]
+        parcial[COL_FILAS] = conteos.sum(axis=1)
+        for col in self.cols_valor:
+            pesos = pd.to_numeric(df_vtas[col], errors="coerce").to_numpy(dtype=float, na_value=0.0)
+            parcial[col] = np.bincount(grupos, weights=np.nan_to_num(pesos), minlength=n_grupos)
+        self._parciales.append(parcial)
+        self.filas += len(df_vtas)
+        if len(self._parciales) >= MAX_PARCIALES:
+            self._combinar()
+
+    def _combinar(self) -> pd.DataFrame:
+        """Reduce los parciales a uno solo, sumando los de un mismo grupo."""
+        if len(self._parciales) > 1:
+            self._parciales = [
+                pd.concat(self._parciales, ignore_index=True)
+                .groupby(self.cols_grupo, dropna=False, sort=False)
+                .sum()
+                .reset_index()
+            ]
+        return self._parciales[0]
+
+    def resultado(self) -> pd.DataFrame:
+        """
+        Resumen combinado de todo lo agregado, ordenado por las columnas de agrupación.
+
+        Returns:
+            pd.DataFrame: Una fila por grupo: columnas de agrupación, conteo por status, filas
+            y totales de venta.
+        """
+        columnas = [*self.cols_grupo, *STATUS_SEMAFORO, OTRO_STATUS, COL_FILAS, *self.cols_valor]
+        if not self._parciales:
+            return pd.DataFrame(columns=columnas)
+        return self._combinar()[columnas].sort_values(self.cols_grupo, kind="stable").reset_index(drop=True)
+
+    def totales(self) -> Dict[str, int]:
+        """Filas por status en todo lo agregado."""
+        resumen = self.resultado()
+        return {nombre: int(resumen[nombre].sum()) for nombre in [*STATUS_SEMAFORO, OTRO_STATUS]}
+
+
+def crear_resumen(cfg_resumen: Optional[Dict], cols_vtas: Dict[str, str]) -> Optional[ResumenSemaforo]:
+    """
+    Resumen del semáforo según `Resultados.resumen`, o None si no está activo.
+
+    Args:
+        cfg_resumen (Dict | None): Sección `Resultados.resumen` (activo, agrupar_por, valores).
+        cols_vtas (Dict[str, str]): Alias -> nombre real de columnas de ventas.
+
+    Returns:
+        ResumenSemaforo | None: Resumen vacío listo para `agregar`.
+    """
+    if not cfg_resumen or not cfg_resumen.get("activo"):
+        return None
+    return ResumenSemaforo(
+        cols_grupo=[cols_vtas[alias] for alias in cfg_resumen.get("agrupar_por", [])],
+        cols_valor=[cols_vtas[alias] for alias in cfg_resumen.get("valores", [])],
+    )
@@ -0,0 +1,215 @@
+# Generador de insumos sintéticos (ventas y drivers) para pruebas de rendimiento
+from __future__ import annotations
+from loguru import logger
+from pathlib import Path
+from typing import Dict, Iterator, Optional
+import re
+import numpy as np
+import pandas as pd
+from Utils.escritores_functions import (
+    MAX_FILAS_XLSX, EscritorCSV, EscritorParquet, EscritorResultado, EscritorXlsxwriter
+)
+
+
+OFICINAS = ["MEDELLIN", "BOGOTA", "CALI", "BARRANQUILLA", "BUCARAMANGA", "PEREIRA", "CARTAGENA", "IBAGUE"]
+REGIONALES = ["ANTIOQUIA", "CENTRO", "OCCIDENTE", "COSTA", "ORIENTE"]
+TIPOS_NO_ATENCION = ["D", "T"]
+CAMBIOS_ECOM = ["OK", "CAMBIO COD ECOM", "SIN COD ECOM"]
+
+
+def _encabezado_excel(columnas: list[str]) -> list[str]:
+    """
+    Encabezado tal como aparece en el libro: "Cod Cliente.1" vuelve a ser "Cod Cliente" si
+    la columna base ya está antes (pandas agrega el sufijo al leer encabezados duplicados).
+    """
+    encabezado = []
+    for col in columnas:
+        base = re.sub(r"\.\d+$", "", col)
+        encabezado.append(base if base != col and base in encabezado else col)
+    return encabezado
+
+
+def _escritor_insumo(path: Path, formato: str, hoja: str) -> EscritorResultado:
+    if formato == "xlsx":
+        return EscritorXlsxwriter(path, hoja=hoja)
+    if formato == "csv":
+        return EscritorCSV(path)
+    if formato == "parquet":
+        return EscritorParquet(path)
+    raise ValueError(f"Formato de insumo sintético no soportado: {formato}. Opciones: ['xlsx', 'csv', 'parquet']")
+
+
+class GeneradorSintetico:
+    """
+    Genera bases de ventas y drivers con los nombres de columna de config.yml y una
+    distribución controlada de los casos que recorren las reglas del semáforo.
+
+    Los códigos de cliente y de agente de ventas existen en drivers en una proporción
+    `cobertura`; el resto no encuentra su llave, como ocurre con los insumos reales.
+    """
+
+    def __init__(
+        self,
+        cols_vtas: Dict[str, str],
+        cols_drivers: Dict[str, str],
+        prop_tipo_i: float = 0.5,
+        prop_cod_hash: float = 0.1,
+        prop_sin_asignar: float = 0.2,
+        prop_drv_duplicados: float = 0.02,
+        cobertura: float = 0.9,
+        semilla: int = 0,
+    ):
+        """
+        Args:
+            cols_vtas (Dict[str, str]): Alias -> nombre real de columnas de ventas.
+            cols_drivers (Dict[str, str]): Alias -> nombre real de columnas de drivers.
+            prop_tipo_i (float): Proporción de filas con Tipo de Venta "I".
+            prop_cod_hash (float): Proporción de filas con Agente Comercial - Clave "#".
+            prop_sin_asignar (float): Proporción de filas con Agente Comercial "Sin asignar".
+            prop_drv_duplicados (float): Proporción de filas de drivers que repiten la llave
+                de cliente (Cod Actual) con otros valores.
+            cobertura (float): Proporción de clientes y agentes presentes en drivers.
+            semilla (int): Semilla del generador aleatorio.
+        """
+        for nombre, valor in [("prop_tipo_i", prop_tipo_i), ("prop_cod_hash", prop_cod_hash),
+                              ("prop_sin_asignar", prop_sin_asignar),
+                              ("prop_drv_duplicados", prop_drv_duplicados), ("cobertura", cobertura)]:
+            if not 0 <= valor <= 1:
+                raise ValueError(f"{nombre} debe estar entre 0 y 1: {valor}")
+        self.cols_vtas = cols_vtas
+        self.cols_drivers = cols_drivers
+        self.prop_tipo_i = prop_tipo_i
+        self.prop_cod_hash = prop_cod_hash
+        self.prop_sin_asignar = prop_sin_asignar
+        self.prop_drv_duplicados = prop_drv_duplicados
+        self.cobertura = cobertura
+        self.semilla = semilla
+
+    @staticmethod
+    def _dimensiones(filas: int) -> tuple[int, int]:
+        """Número de clientes y de agentes acorde al tamaño de la base de ventas."""
+        return max(1_000, filas // 40), max(50, filas // 5_000)
+
+    def drivers(self, filas_vtas: int) -> pd.DataFrame:
+        """
+        Base de drivers: una fila por cliente cubierto más `prop_drv_duplicados` filas que
+        repiten la llave de cliente con otro jefe de ventas.
+
+        Args:
+            filas_vtas (int): Filas de la base de ventas que acompaña a estos drivers.
+
+        Returns:
+            pd.DataFrame: Drivers con las columnas de `cols_drivers` (nombres de pandas).
+        """
+        rng = np.random.default_rng(self.semilla + 1)
+        n_clientes, n_agentes = self._dimensiones(filas_vtas)
+        clientes = np.arange(n_clientes)
+        cubiertos = clientes[rng.random(n_clientes) < self.cobertura]
+        duplicados = rng.choice(cubiertos, int(len(cubiertos) * self.prop_drv_duplicados))
+        cliente = np.concatenate([cubiertos, duplicados])
+        n = len(cliente)
+
+        agente = rng.integers(0, int(n_agentes * self.cobertura) or 1, n)
+        jefe = rng.integers(0, max(5, n_agentes // 10), n)
+        cod_cliente = (1_000_000 + cliente).astype(str)
+        cod_agente = np.char.add("AC", np.char.zfill(agente.astype(str), 5))
+        c = self.cols_drivers
+        return pd.DataFrame({
+            c["regional"]: np.array(REGIONALES)[rng.integers(0, len(REGIONALES), n)],
+            c["cod_sap"]: cod_agente,
+            c["nom_agente_comercial"]: np.char.add("AGENTE ", cod_agente),
+            c["cambio_cod_ecom_crm"]: np.array(CAMBIOS_ECOM)[rng.choice(len(CAMBIOS_ECOM), n, p=[0.7, 0.2, 0.1])],
+            c["mes"]: rng.integers(1, 13, n).astype(str),
+            c["cod_cliente"]: cod_cliente,
+            c["cod_actual"]: cod_cliente,
+            c["cod_jefe_ventas"]: np.char.add("JV", np.char.zfill(jefe.astype(str), 3)),
+            c["jefe_ventas"]: np.char.add("JEFE DE VENTAS ", jefe.astype(str)),
+            c["cod_cliente_alt"]: np.char.add("ECOM", cod_cliente),
+            c["concat"]: np.char.add(cod_agente, cod_cliente),
+        })
+
+    def iter_ventas(self, filas: int, tam_bloque: int = 250_000) -> Iterator[pd.DataFrame]:
+        """
+        Base de ventas por bloques (memoria acotada también para millones de filas).
+
+        Args:
+            filas (int): Filas totales a generar.
+            tam_bloque (int): Filas por bloque.
+
+        Yields:
+            pd.DataFrame: Bloque con las columnas de `cols_vtas`.
+        """
+        rng = np.random.default_rng(self.semilla)
+        n_clientes, n_agentes = self._dimensiones(filas)
+        meses = np.array([f"2025/{m:02d}" for m in range(1, 13)])
+        c = self.cols_vtas
+        for inicio in range(0, filas, tam_bloque):
+            n = min(tam_bloque, filas - inicio)
+            cliente = (1_000_000 + rng.integers(0, n_clientes, n)).astype(str)
+            agente = np.char.add("AC", np.char.zfill(rng.integers(0, n_agentes, n).astype(str), 5))
+            tipo = np.where(rng.random(n) < self.prop_tipo_i, "I",
+                            np.array(TIPOS_NO_ATENCION)[rng.integers(0, len(TIPOS_NO_ATENCION), n)])
+            yield pd.DataFrame({
+                c["anio_mes"]: meses[rng.integers(0, len(meses), n)],
+                c["tipo_venta"]: tipo,
+                c["oficina_ventas"]: np.array(OFICINAS)[rng.integers(0, len(OFICINAS), n)],
+                c["cliente_clave"]: cliente,
+                c["cliente"]: np.char.add("CLIENTE ", cliente),
+                c["codigo_ecom"]: np.char.add("E", cliente),
+                c["agente_comercial_clave"]: np.where(rng.random(n) < self.prop_cod_hash, "#", agente),
+                c["agente_comercial"]: np.where(rng.random(n) < self.prop_sin_asignar, "Sin asignar",
+                                                np.char.add("AGENTE ", agente)),
+                c["venta_dinero"]: rng.gamma(2.0, 150_000.0, n).round(2),
+                c["venta_kg"]: rng.gamma(2.0, 5.0, n).round(3),
+                c["venta_un"]: rng.integers(1, 200, n),
+            })
+
+    def escribir(
+        self,
+        path_dir: str | Path,
+        filas: int,
+        nom_vtas: str,
+        hoja_vtas: str,
+        nom_drivers: str,
+        hoja_drivers: str,
+        formato_vtas: Optional[str] = None,
+    ) -> tuple[Path, Path]:
+        """
+        Escribe la base de ventas y la de drivers en `path_dir`.
+
+        Args:
+            path_dir (str | Path): Carpeta destino (se crea si no existe).
+            filas (int): Filas de la base de ventas.
+            nom_vtas (str): Nombre del archivo de ventas sin extensión.
+            hoja_vtas (str): Hoja de ventas (solo xlsx).
+            nom_drivers (str): Nombre del archivo de drivers sin extensión.
+            hoja_drivers (str): Hoja de drivers.
+            formato_vtas (str | None): xlsx | csv | parquet. Por defecto xlsx si las filas
+                caben en una hoja y parquet si no.
+
+        Returns:
+            tuple[Path, Path]: (ruta de ventas, ruta de drivers).
+
+        Raises:
+            ValueError: Si se pide xlsx con más filas de las que admite una hoja.
+        """
+        path_dir = Path(path_dir)
+        path_dir.mkdir(parents=True, exist_ok=True)
+        formato_vtas = formato_vtas or ("xlsx" if filas <= MAX_FILAS_XLSX else "parquet")
+        if formato_vtas == "xlsx" and filas > MAX_FILAS_XLSX:
+            raise ValueError(f"{filas} filas no caben en una hoja xlsx ({MAX_FILAS_XLSX}); use csv o parquet.")
+
+        with _escritor_insumo(path_dir / nom_vtas, formato_vtas, hoja_vtas) as escritor_vtas:
+            for bloque in self.iter_ventas(filas):
+                escritor_vtas.escribir_lote(bloque)
+
+        df_drivers = self.drivers(filas)
+        df_drivers.columns = _encabezado_excel(list(df_drivers.columns))
+        with _escritor_insumo(path_dir / nom_drivers, "xlsx", hoja_drivers) as escritor_drv:
+            escritor_drv.escribir_df(df_drivers)
+
+        logger.info(
+            f"Insumos sintéticos: {filas} filas de ventas ({formato_vtas}), "
+            f"{len(df_drivers)} filas de drivers → {path_dir}"
+        )
+        return escritor_vtas.path, escritor_drv.path
@@ -1 +1,171 @@
-# Funciones de transformación del proyecto
\ No newline at end of file
+# Funciones de transformación del proyecto
+from importlib.util import find_spec
+from loguru import logger
+import numpy as np
+import pandas as pd
+
+
+def _tipo_texto() -> str:
+    """Tipo de texto compacto: `string[pyarrow]` si pyarrow está instalado, si no `string`."""
+    return "string[pyarrow]" if find_spec("pyarrow") is not None else "string"
+
+
+def _a_numerico(serie: pd.Series) -> pd.Series:
+    """
+    Convierte texto a número reduciendo a entero cuando todos los valores lo permiten.
+    Los valores no numéricos quedan como NaN y se reportan en el log.
+    """
+    numerica = pd.to_numeric(serie, errors="coerce")
+    invalidos = int((numerica.isna() & serie.notna()).sum())
+    if invalidos:
+        logger.warning(f"Columna '{serie.name}': {invalidos} valores no numéricos convertidos a vacío.")
+    if numerica.notna().all() and (numerica % 1 == 0).all():
+        return pd.to_numeric(numerica, downcast="integer")
+    return numerica
+
+
+CONVERSORES_TIPO = {
+    "category": lambda serie: serie.astype("category"),
+    "string": lambda serie: serie.astype(_tipo_texto()),
+    "numerico": _a_numerico,
+    "texto": lambda serie: serie,
+}
+
+
+def aplicar_esquema(df: pd.DataFrame, esquema: dict | None, cols: dict) -> pd.DataFrame:
+    """
+    Convierte un DataFrame leído como texto al esquema tipado de la configuración y
+    descarta las columnas no declaradas en él.
+
+    Tipos soportados: "category", "string" (pyarrow si está disponible), "numerico"
+    (reducido a entero cuando es posible) y "texto" (sin conversión).
+
+    Args:
+        df (pd.DataFrame): DataFrame leído con dtype=str.
+        esquema (dict | None): {alias: tipo}. Si es None o vacío, `df` se devuelve sin cambios.
+        cols (dict): Alias -> nombre real de las columnas.
+
+    Returns:
+        pd.DataFrame: DataFrame con los tipos del esquema y solo sus columnas.
+
+    Raises:
+        ValueError: Si el esquema declara un tipo desconocido o una columna ausente.
+    """
+    if not esquema:
+        return df
+
+    tipos = {cols.get(alias, alias): tipo for alias, tipo in esquema.items()}
+    desconocidos = {tipo for tipo in tipos.values() if tipo not in CONVERSORES_TIPO}
+    if desconocidos:
+        raise ValueError(f"Tipos de esquema no soportados: {desconocidos}. Opciones: {list(CONVERSORES_TIPO)}")
+    faltantes = set(tipos) - set(df.columns)
+    if faltantes:
+        raise ValueError(f"Columnas del esquema ausentes en la base: {faltantes}")
+
+    memoria_antes = df.memory_usage(deep=True).sum()
+    df = df[[col for col in df.columns if col in tipos]].copy()
+    for col, tipo in tipos.items():
+        df[col] = CONVERSORES_TIPO[tipo](df[col])
+
+    memoria_despues = df.memory_usage(deep=True).sum()
+    logger.info(
+        f"Esquema aplicado: {len(tipos)} columnas, memoria {memoria_antes / 1e6:.1f} MB → {memoria_despues / 1e6:.1f} MB"
+    )
+    return df
+
+
+def _canonizar_valores(valores: pd.Series, cfg: dict) -> pd.Series:
+    """
+    Aplica a una Serie de valores únicos no nulos las operaciones activas en `cfg`, con las
+    operaciones de texto vectorizadas de pyarrow cuando está instalado.
+    """
+    valores = valores.astype(str).astype(_tipo_texto())
+    if cfg.get("recortar", True):
+        valores = valores.str.strip()
+    if cfg.get("quitar_decimal_cero", True):
+        # "12345.0" / "12345.00" (número leído de Excel como flotante) → "12345"
+        valores = valores.str.replace(r"^(-?\d+)\.0+$", r"\1", regex=True)
+    if cfg.get("quitar_ceros_izquierda", True):
+        # Solo claves numéricas: "012345" → "12345", "000" → "0"; "AC00012" no cambia
+        valores = valores.str.replace(r"^0+(\d+)$", r"\1", regex=True)
+    if cfg.get("mayusculas", False):
+        valores = valores.str.upper()
+    return valores
+
+
+def _canonizar_serie(serie: pd.Series, cfg: dict) -> tuple[pd.Series | None, int, int]:
+    """
+    Normaliza `serie` una sola vez por valor distinto y difunde el resultado por código.
+    Devuelve la Serie normalizada (None si ningún valor cambia), los valores distintos y
+    las filas que cambiaron.
+    """
+    if isinstance(serie.dtype, pd.CategoricalDtype):
+        codigos = serie.cat.codes.to_numpy()
+        unicos = pd.Series(serie.cat.categories, dtype=object)
+    else:
+        codigos, unicos = pd.factorize(serie)
+        unicos = pd.Series(unicos, dtype=object)
+    canonicos = _canonizar_valores(unicos, cfg)
+    cambiados = (canonicos != unicos).to_numpy(dtype=bool, na_value=False)
+    if not cambiados.any():
+        return None, 0, 0
+
+    filas = int(np.bincount(codigos[codigos >= 0], minlength=len(unicos))[cambiados].sum())
+    if isinstance(serie.dtype, pd.CategoricalDtype):
+        codigos_canon, categorias = pd.factorize(canonicos)
+        codigos = np.where(codigos >= 0, codigos_canon[codigos], -1)
+        nueva = pd.Series(pd.Categorical.from_codes(codigos, categories=categorias), index=serie.index, name=serie.name)
+    else:
+        valores = pd.array(canonicos.to_numpy(dtype=object), dtype=serie.dtype)
+        nueva = pd.Series(valores.take(codigos, allow_fill=True), index=serie.index, name=serie.name)
+    return nueva, int(cambiados.sum()), filas
+
+
+def canonizar_serie(serie: pd.Series, cfg: dict | None) -> pd.Series:
+    """
+    Valores de `serie` normalizados como en `canonizar_claves`, sin modificar `serie`.
+
+    Args:
+        serie (pd.Series): Claves a normalizar.
+        cfg (dict | None): Sección `config_insumos.canonicalizacion`. Si es None o no está
+            activa, se devuelve `serie`.
+
+    Returns:
+        pd.Series: Serie normalizada, con el tipo e índice de `serie`.
+    """
+    if not cfg or not cfg.get("activo"):
+        return serie
+    nueva, _, _ = _canonizar_serie(serie, cfg)
+    return serie if nueva is None else nueva
+
+
+def canonizar_claves(df: pd.DataFrame, columnas: list, cfg: dict | None) -> pd.DataFrame:
+    """
+    Normaliza columnas clave para que los cruces con drivers sean exactos: " 12345",
+    "12345.0" y "012345" quedan como "12345".
+
+    Las operaciones se aplican una sola vez por valor distinto (categorías de una columna
+    categórica o valores únicos de `pd.factorize`) y se difunden a las filas por código,
+    conservando el tipo de la columna. Las columnas categóricas fusionan las categorías que
+    quedan iguales.
+
+    Args:
+        df (pd.DataFrame): DataFrame con las columnas clave (se modifica en el lugar).
+        columnas (list): Nombres reales de las columnas a normalizar.
+        cfg (dict | None): Sección `config_insumos.canonicalizacion` (recortar,
+            quitar_decimal_cero, quitar_ceros_izquierda, mayusculas). Si es None o no está
+            activa, `df` se devuelve sin cambios.
+
+    Returns:
+        pd.DataFrame: `df` con las columnas clave normalizadas.
+    """
+    if not cfg or not cfg.get("activo"):
+        return df
+
+    for col in columnas:
+        nueva, valores, filas = _canonizar_serie(df[col], cfg)
+        if nueva is None:
+            continue
+        df[col] = nueva
+        logger.info(f"Canonicalización '{col}': {valores} valores distintos normalizados ({filas} filas).")
+    return df
@@ -0,0 +1,7 @@
+# Las pruebas importan los módulos del proyecto (Utils, Scripts, Controllers) desde la raíz.
+import sys
+from pathlib import Path
+
+_RAIZ = str(Path(__file__).resolve().parents[1])
+if _RAIZ not in sys.path:
+    sys.path.insert(0, _RAIZ)
@@ -0,0 +1,78 @@
+# Checkpoints de --resume: solo se reanuda con la misma huella, y los archivos Arrow devuelven
+# los mismos tipos y valores con que se escribieron.
+import numpy as np
+import pandas as pd
+from Utils.arrow_functions import escribir_arrow, leer_arrow
+from Utils.checkpoint_functions import AlmacenCheckpoints, huella_ejecucion
+
+
+def _df() -> pd.DataFrame:
+    return pd.DataFrame({
+        "categoria": pd.Categorical(["I", "D", "I", None]),
+        "texto": pd.Series(["a", None, "c", "d"], dtype="string[pyarrow]"),
+        "objeto": pd.Series(["x", np.nan, np.nan, "z"], dtype=object),
+        "numero": [1.5, np.nan, 3.0, 4.0],
+        "entero": [1, 2, 3, 4],
+    })
+
+
+def test_huella_cambia_con_insumos_y_configuracion(tmp_path):
+    path = tmp_path / "ventas.csv"
+    path.write_text("a;b\n1;2\n", encoding="utf-8")
+    huella = huella_ejecucion([path], {"reglas": 1})
+    assert huella == huella_ejecucion([path], {"reglas": 1})
+    assert huella != huella_ejecucion([path], {"reglas": 2})
+    path.write_text("a;b\n1;3\n", encoding="utf-8")
+    assert huella != huella_ejecucion([path], {"reglas": 1})
+
+
+def test_checkpoint_de_misma_huella_se_reanuda(tmp_path):
+    AlmacenCheckpoints(tmp_path, "ventas", "h1").guardar("carga_vtas", _df())
+
+    almacen = AlmacenCheckpoints(tmp_path, "ventas", "h1")
+    assert almacen.ultima_valida() == "carga_vtas"
+    pd.testing.assert_frame_equal(almacen.cargar("carga_vtas"), _df())
+
+
+def test_checkpoint_de_otra_huella_se_ignora(tmp_path):
+    previo = AlmacenCheckpoints(tmp_path, "ventas", "h1")
+    previo.guardar("carga_vtas", _df())
+    previo.guardar("homologacion", _df())
+
+    almacen = AlmacenCheckpoints(tmp_path, "ventas", "h2")
+    assert almacen.ultima_valida() is None
+
+    # Guardar con la nueva huella descarta los checkpoints anteriores
+    almacen.guardar("carga_vtas", _df())
+    assert almacen.manifiesto["huella"] == "h2"
+    assert set(almacen.manifiesto["etapas"]) == {"carga_vtas"}
+    assert not (almacen.path / "homologacion.arrow").exists()
+    assert AlmacenCheckpoints(tmp_path, "ventas", "h1").ultima_valida() is None
+
+
+def test_checkpoint_sin_archivo_no_es_valido(tmp_path):
+    almacen = AlmacenCheckpoints(tmp_path, "ventas", "h1")
+    almacen.guardar("carga_vtas", _df())
+    almacen.guardar("homologacion", _df())
+    (almacen.path / "homologacion.arrow").unlink()
+    assert AlmacenCheckpoints(tmp_path, "ventas", "h1").ultima_valida() == "carga_vtas"
+
+
+def test_leer_arrow_restituye_tipos_y_vacios(tmp_path):
+    path = tmp_path / "datos.arrow"
+    df = _df()
+    tipos = escribir_arrow(df, path)
+    assert tipos["texto"] == "string[pyarrow]"
+
+    leido = leer_arrow(path, tipos)
+    pd.testing.assert_series_equal(leido.dtypes, df.dtypes)
+    pd.testing.assert_frame_equal(leido, df)
+    # Los vacíos de las columnas object vuelven como NaN (no None ni pd.NA)
+    assert leido["objeto"].map(lambda v: isinstance(v, float) and np.isnan(v)).tolist() == [False, True, True, False]
+
+
+def test_leer_arrow_por_rangos(tmp_path):
+    path = tmp_path / "datos.arrow"
+    tipos = escribir_arrow(_df(), path)
+    partes = [leer_arrow(path, tipos, 0, 3), leer_arrow(path, tipos, 3)]
+    pd.testing.assert_frame_equal(pd.concat(partes, ignore_index=True), _df())
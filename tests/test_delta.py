@@ -0,0 +1,165 @@
+# Delta de drivers: qué claves cuentan como modificadas, qué filas de ventas se recalculan y
+# que el resultado parchado sea idéntico al de una homologación completa.
+from copy import deepcopy
+from pathlib import Path
+import numpy as np
+import pandas as pd
+import pytest
+from Scripts.homologacion import crear_verificador, homologar_delta
+from Scripts.procesar_insumos import ProcesarInsumos
+from Utils.exclusive_functions import IndiceDrivers, VerificadorCodigos
+from Utils.general_functions import procesar_configuracion
+from Utils.incremental_functions import claves_modificadas, filas_afectadas
+from Utils.perfilado_functions import ReporteEjecucion
+
+CONFIG = procesar_configuracion(str(Path(__file__).resolve().parents[1] / "Controllers" / "settings" / "config.yml"))
+COLS_VTAS = CONFIG["dict_cols"]["cols_ventas"]
+COLS_DRIVERS = CONFIG["dict_cols"]["cols_drivers"]
+REGLAS = CONFIG["reglas_homologacion"]
+BUSQUEDAS = VerificadorCodigos.busquedas_de(REGLAS)
+N = np.nan
+
+# Cod SAP, Cambio Cod ECOM a CRM, Cod Actual, Cod Cliente.1, Cód. Jefe de Ventas, Jefe de Ventas
+DRIVERS = [
+    ("A1", "CAMBIO A1", "100", "ALT100", "J100", "Jefe 100"),
+    ("A1", "CAMBIO A1", "200", "ALT200", "J200", "Jefe 200"),
+    ("A2", N, "300", N, N, N),
+    ("A3", "CAMBIO A3", "400", "ALT400", "J400", "Jefe 400"),
+]
+COLUMNAS_DRIVERS = ["cod_sap", "cambio_cod_ecom_crm", "cod_actual", "cod_cliente_alt", "cod_jefe_ventas", "jefe_ventas"]
+
+# Tipo de Venta, Agente Comercial - Clave, Agente Comercial, Cliente - Clave, Código ECOM
+VENTAS = [
+    ("I", "A1", "Sin asignar", "100", "E1"),
+    ("I", "A1", "Ana", "200", "E2"),
+    ("I", "A2", "Sin asignar", "300", "E3"),
+    ("I", "A3", "Beto", "400", "E4"),
+    ("D", "A3", "Beto", "400", "E5"),
+    ("I", "#", "Sin asignar", "500", "E6"),
+    ("I", N, "Sin asignar", N, "E7"),
+]
+COLUMNAS_VENTAS = ["tipo_venta", "agente_comercial_clave", "agente_comercial", "cliente_clave", "codigo_ecom"]
+
+
+def _drivers(filas=DRIVERS) -> pd.DataFrame:
+    df = pd.DataFrame({col: pd.Series([N] * len(filas), dtype=object) for col in COLS_DRIVERS.values()})
+    for i, alias in enumerate(COLUMNAS_DRIVERS):
+        df[COLS_DRIVERS[alias]] = pd.Series([fila[i] for fila in filas], dtype=object)
+    return df
+
+
+def _ventas() -> pd.DataFrame:
+    df = pd.DataFrame({col: ["x"] * len(VENTAS) for col in COLS_VTAS.values()})
+    df[COLS_VTAS["anio_mes"]] = "2025/01"
+    for alias in ("venta_dinero", "venta_kg", "venta_un"):
+        df[COLS_VTAS[alias]] = "1"
+    for i, alias in enumerate(COLUMNAS_VENTAS):
+        df[COLS_VTAS[alias]] = pd.Series([fila[i] for fila in VENTAS], dtype=object)
+    return df
+
+
+def _cambiar(df: pd.DataFrame, fila: int, alias: str, valor) -> pd.DataFrame:
+    df = df.copy()
+    df.loc[fila, COLS_DRIVERS[alias]] = valor
+    return df
+
+
+def _modificadas(previo: pd.DataFrame, nuevo: pd.DataFrame, clave: str) -> set:
+    cols_valor = [COLS_DRIVERS[v] for _, c, v in BUSQUEDAS if c == clave]
+    return set(claves_modificadas(previo, nuevo, COLS_DRIVERS[clave], cols_valor))
+
+
+def test_sin_cambios_no_hay_claves_modificadas():
+    assert _modificadas(_drivers(), _drivers(), "cod_actual") == set()
+    assert _modificadas(_drivers(), _drivers(), "cod_sap") == set()
+
+
+def test_clave_agregada_y_eliminada():
+    nuevo = _drivers([*DRIVERS[1:], ("A4", "CAMBIO A4", "500", "ALT500", "J500", "Jefe 500")])
+    assert _modificadas(_drivers(), nuevo, "cod_actual") == {"100", "500"}
+    assert _modificadas(_drivers(), nuevo, "cod_sap") == {"A4"}
+
+
+def test_valor_no_buscado_no_cuenta_como_cambio():
+    # Regional no se lee por ninguna clave
+    assert _modificadas(_drivers(), _cambiar(_drivers(), 0, "regional", "R9"), "cod_actual") == set()
+
+
+def test_edicion_de_cod_sap_duplicado_no_vigente_no_cuenta():
+    # A1 se repite: la fila vigente es la última (fila 1); editar la fila 0 no cambia búsquedas
+    assert _modificadas(_drivers(), _cambiar(_drivers(), 0, "cambio_cod_ecom_crm", "OTRO"), "cod_sap") == set()
+    assert _modificadas(_drivers(), _cambiar(_drivers(), 1, "cambio_cod_ecom_crm", "OTRO"), "cod_sap") == {"A1"}
+
+
+def test_vacios_sobreviven_la_ida_y_vuelta_por_parquet(tmp_path):
+    path = tmp_path / "drivers.parquet"
+    _drivers().to_parquet(path, index=False)
+    previo = pd.read_parquet(path)
+    assert previo[COLS_DRIVERS["cambio_cod_ecom_crm"]].isna().sum() == 1
+    assert _modificadas(previo, _drivers(), "cod_actual") == set()
+    assert _modificadas(previo, _drivers(), "cod_sap") == set()
+
+
+def test_filas_afectadas_por_clave_modificada():
+    nuevo = _cambiar(_drivers(), 3, "cod_jefe_ventas", "J999")
+    posiciones, resumen = filas_afectadas(_ventas(), _drivers(), nuevo, BUSQUEDAS, COLS_VTAS, COLS_DRIVERS)
+    assert list(posiciones) == [3, 4]
+    assert resumen == {COLS_DRIVERS["cod_sap"]: 0, COLS_DRIVERS["cod_actual"]: 1}
+
+
+def test_filas_afectadas_con_claves_de_ventas_sin_normalizar():
+    df_vtas = _ventas()
+    df_vtas[COLS_VTAS["cliente_clave"]] = [" 100", "0200", "300.0", "400", "400 ", "500", N]
+    nuevo = _cambiar(_drivers(), 3, "cod_jefe_ventas", "J999")
+    indice = IndiceDrivers(nuevo, COLS_DRIVERS, BUSQUEDAS, CONFIG["config_insumos"]["canonicalizacion"])
+    posiciones, _ = filas_afectadas(df_vtas, _drivers(), nuevo, BUSQUEDAS, COLS_VTAS, COLS_DRIVERS, indice)
+    assert list(posiciones) == [3, 4]
+
+
+@pytest.fixture
+def entorno(tmp_path):
+    """Insumo de ventas en CSV, procesador y configuración de resultados en `tmp_path`."""
+    config_insumos = deepcopy(CONFIG["config_insumos"])
+    config_insumos["cache"] = {"activo": False}
+    config_insumos["lectura"] = {"csv": {"sep": ";", "encoding": "utf-8-sig"}}
+    path_vtas = tmp_path / "ventas.csv"
+    _ventas().to_csv(path_vtas, sep=";", encoding="utf-8-sig", index=False)
+    procesador = ProcesarInsumos(config_insumos=config_insumos, dict_cols=CONFIG["dict_cols"])
+    cfg_result = {"formatos": ["parquet"]}
+    return procesador, str(path_vtas), cfg_result, tmp_path
+
+
+def _homologar(entorno, df_drivers: pd.DataFrame, store: str, nombre: str):
+    procesador, path_vtas, cfg_result, tmp_path = entorno
+    reporte = ReporteEjecucion()
+    verificador = crear_verificador(df_drivers, CONFIG["dict_cols"], REGLAS, cfg_canon=procesador.cfg_canon)
+    out_path = str(tmp_path / nombre)
+    homologar_delta(procesador, verificador, path_vtas, cfg_result, out_path, {"path_store": str(tmp_path / store)}, reporte)
+    return pd.read_parquet(f"{out_path}.parquet"), reporte.datos["delta_drivers"]
+
+
+@pytest.mark.parametrize("cambio", [
+    pytest.param((0, "cod_jefe_ventas", "J999"), id="valor_cambiado"),
+    pytest.param((2, "cambio_cod_ecom_crm", "CAMBIO A2"), id="vacio_a_valor"),
+    pytest.param((0, "cod_actual", "999"), id="clave_reemplazada"),
+])
+def test_resultado_parchado_igual_a_homologacion_completa(entorno, cambio):
+    nuevo = _cambiar(_drivers(), *cambio)
+
+    previo, info = _homologar(entorno, _drivers(), "delta", "previo")
+    assert info["modo"] == "completo"
+    parchado, info = _homologar(entorno, nuevo, "delta", "parchado")
+    assert info["modo"] == "delta"
+    assert 0 < info["filas_recalculadas"] < len(VENTAS)
+    assert not parchado.equals(previo)
+
+    completo, info = _homologar(entorno, nuevo, "otro_store", "completo")
+    assert info["modo"] == "completo"
+    pd.testing.assert_frame_equal(parchado, completo)
+
+
+def test_mismos_drivers_reutilizan_el_resultado(entorno):
+    previo, _ = _homologar(entorno, _drivers(), "delta", "previo")
+    repetido, info = _homologar(entorno, _drivers(), "delta", "repetido")
+    assert info == {"modo": "sin_cambios", "filas_recalculadas": 0}
+    pd.testing.assert_frame_equal(repetido, previo)
@@ -0,0 +1,44 @@
+# Escritores de resultados: el destino solo se reemplaza al terminar sin errores y nunca
+# queda el temporal en la carpeta.
+import pandas as pd
+import pytest
+import Utils.escritores_functions as ef
+
+
+def _df() -> pd.DataFrame:
+    return pd.DataFrame({"cliente": ["C1", "C2"], "venta": [1.0, 2.5]})
+
+
+def test_escritura_completa_reemplaza_el_resultado(tmp_path):
+    with ef.EscritorCSV(tmp_path / "resultado") as escritor:
+        escritor.escribir_df(_df())
+    assert escritor.filas == 2
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["resultado.csv"]
+
+
+def test_escritura_interrumpida_conserva_el_resultado_previo(tmp_path):
+    (tmp_path / "resultado.csv").write_text("previo\n", encoding="utf-8")
+    with pytest.raises(RuntimeError):
+        with ef.EscritorCSV(tmp_path / "resultado") as escritor:
+            escritor.escribir_df(_df())
+            raise RuntimeError("corte")
+    assert (tmp_path / "resultado.csv").read_text(encoding="utf-8") == "previo\n"
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["resultado.csv"]
+
+
+def test_falla_al_renombrar_elimina_el_temporal(tmp_path, monkeypatch):
+    def replace(origen, destino):
+        raise PermissionError("destino abierto en otro programa")
+
+    monkeypatch.setattr(ef.os, "replace", replace)
+    with pytest.raises(PermissionError):
+        with ef.EscritorCSV(tmp_path / "resultado") as escritor:
+            escritor.escribir_df(_df())
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_escritores_base_son_abstractos(tmp_path):
+    with pytest.raises(TypeError):
+        ef.EscritorResultado(tmp_path / "resultado")
+    with pytest.raises(TypeError):
+        ef._EscritorXlsx(tmp_path / "resultado")
@@ -0,0 +1,100 @@
+# Historial: cada archivo de ventas (canal) tiene su corrida vigente por periodo, y una corrida
+# en curso no bloquea a otra que escribe en la misma base.
+from pathlib import Path
+import pandas as pd
+import pytest
+from Utils.general_functions import procesar_configuracion
+from Utils.historial_functions import HistorialVentas
+
+CONFIG = procesar_configuracion(str(Path(__file__).resolve().parents[1] / "Controllers" / "settings" / "config.yml"))
+COLS_VTAS = CONFIG["dict_cols"]["cols_ventas"]
+PERIODOS = ["2025/01", "2025/02"]
+
+
+def _ventas(cliente: str, agente: str, status: str, venta: float, filas_por_periodo: int) -> pd.DataFrame:
+    n = filas_por_periodo * len(PERIODOS)
+    return pd.DataFrame({
+        COLS_VTAS["anio_mes"]: [p for p in PERIODOS for _ in range(filas_por_periodo)],
+        COLS_VTAS["cliente_clave"]: [cliente] * n,
+        COLS_VTAS["agente_comercial_clave"]: [agente] * n,
+        COLS_VTAS["agente_comercial"]: [f"Agente {agente}"] * n,
+        COLS_VTAS["venta_dinero"]: [venta] * n,
+        "status": [status] * n,
+    })
+
+
+def _corrida(path_db: Path, archivo: str, df: pd.DataFrame) -> str:
+    historial = HistorialVentas(path_db, COLS_VTAS)
+    try:
+        historial.agregar(df)
+        return historial.confirmar(archivo, "huella")
+    finally:
+        historial.cerrar()
+
+
+@pytest.fixture
+def path_db(tmp_path) -> Path:
+    return tmp_path / "historial.sqlite"
+
+
+def test_canales_en_los_mismos_periodos_conviven(path_db):
+    _corrida(path_db, "Tenderos.xlsx", _ventas("C1", "A1", "OK", 1.0, 2))
+    _corrida(path_db, "Snackeros.xlsx", _ventas("C2", "A2", "SIN COD AC", 10.0, 3))
+
+    historial = HistorialVentas(path_db, COLS_VTAS)
+    try:
+        assert len(historial.consultar("SELECT * FROM ventas_vigentes")) == 10
+        assert list(historial.historial_cliente("C1")["anio_mes"]) == sorted(PERIODOS * 2)
+        assert list(historial.historial_cliente("C2")["anio_mes"]) == sorted(PERIODOS * 3)
+
+        totales = historial.totales_agente()
+        por_agente = totales.groupby("agente_comercial_clave")[["filas", "venta_dinero"]].sum()
+        assert por_agente.loc["A1"].tolist() == [4, 4.0]
+        assert por_agente.loc["A2"].tolist() == [6, 60.0]
+    finally:
+        historial.cerrar()
+
+
+def test_nueva_corrida_del_mismo_canal_reemplaza_solo_ese_canal(path_db):
+    _corrida(path_db, "Tenderos.xlsx", _ventas("C1", "A1", "OK", 1.0, 2))
+    _corrida(path_db, "Snackeros.xlsx", _ventas("C2", "A2", "OK", 10.0, 3))
+    ultima = _corrida(path_db, "Tenderos.xlsx", _ventas("C1", "A1", "SIN COD AC", 5.0, 1))
+
+    historial = HistorialVentas(path_db, COLS_VTAS)
+    try:
+        cliente = historial.historial_cliente("C1")
+        assert set(cliente["id_corrida"]) == {ultima}
+        assert list(cliente["status"]) == ["SIN COD AC"] * len(PERIODOS)
+        assert len(historial.historial_cliente("C1", todas_corridas=True)) == 2 * 2 + len(PERIODOS)
+        assert len(historial.historial_cliente("C2")) == 3 * len(PERIODOS)
+
+        totales = historial.totales_agente(agente="A1").set_index("anio_mes")
+        assert totales["SIN COD AC"].tolist() == [1, 1]
+        assert totales["venta_dinero"].tolist() == [5.0, 5.0]
+        assert len(historial.totales_agente(agente="A2")) == len(PERIODOS)
+    finally:
+        historial.cerrar()
+
+
+def test_corrida_en_curso_no_bloquea_ni_es_visible(path_db):
+    en_curso = HistorialVentas(path_db, COLS_VTAS)
+    en_curso.conexion.execute("PRAGMA busy_timeout = 1000")
+    try:
+        en_curso.agregar(_ventas("C1", "A1", "OK", 1.0, 2))
+        # Otro canal escribe y confirma mientras la primera corrida sigue abierta
+        _corrida(path_db, "Snackeros.xlsx", _ventas("C2", "A2", "OK", 10.0, 1))
+        historial = HistorialVentas(path_db, COLS_VTAS)
+        try:
+            assert historial.historial_cliente("C1", todas_corridas=True).empty
+            assert len(historial.historial_cliente("C2")) == len(PERIODOS)
+        finally:
+            historial.cerrar()
+    finally:
+        en_curso.cerrar()
+
+    # Sin `confirmar`, `cerrar` descarta las filas de la corrida
+    historial = HistorialVentas(path_db, COLS_VTAS)
+    try:
+        assert historial.consultar("SELECT COUNT(*) AS n FROM ventas WHERE cliente_clave = 'C1'")["n"].iloc[0] == 0
+    finally:
+        historial.cerrar()
@@ -0,0 +1,159 @@
+# Homologación incremental por periodo: qué periodos se recalculan, cuándo se omite la
+# exportación y qué se purga del almacén.
+import os
+from copy import deepcopy
+from pathlib import Path
+import numpy as np
+import pandas as pd
+import pytest
+from Scripts.homologacion import crear_verificador, homologar_incremental
+from Scripts.procesar_insumos import ProcesarInsumos
+from Utils.general_functions import procesar_configuracion
+from Utils.incremental_functions import AlmacenPeriodos
+from Utils.perfilado_functions import ReporteEjecucion
+
+CONFIG = procesar_configuracion(str(Path(__file__).resolve().parents[1] / "Controllers" / "settings" / "config.yml"))
+COLS_VTAS = CONFIG["dict_cols"]["cols_ventas"]
+COLS_DRIVERS = CONFIG["dict_cols"]["cols_drivers"]
+REGLAS = CONFIG["reglas_homologacion"]
+PERIODOS = ["2025/01", "2025/02", "2025/03"]
+N = np.nan
+
+# Cod SAP, Cambio Cod ECOM a CRM, Cod Actual, Cod Cliente.1, Cód. Jefe de Ventas, Jefe de Ventas
+DRIVERS = [
+    ("A1", "CAMBIO A1", "100", "ALT100", "J100", "Jefe 100"),
+    ("A2", N, "200", "ALT200", "J200", "Jefe 200"),
+]
+COLUMNAS_DRIVERS = ["cod_sap", "cambio_cod_ecom_crm", "cod_actual", "cod_cliente_alt", "cod_jefe_ventas", "jefe_ventas"]
+
+# Tipo de Venta, Agente Comercial - Clave, Agente Comercial, Cliente - Clave, Código ECOM
+VENTAS = [
+    ("I", "A1", "Sin asignar", "100", "E1"),
+    ("I", "A2", "Ana", "200", "E2"),
+    ("D", "#", "Sin asignar", "300", "E3"),
+]
+COLUMNAS_VENTAS = ["tipo_venta", "agente_comercial_clave", "agente_comercial", "cliente_clave", "codigo_ecom"]
+
+
+def _drivers(filas=DRIVERS) -> pd.DataFrame:
+    df = pd.DataFrame({col: pd.Series([N] * len(filas), dtype=object) for col in COLS_DRIVERS.values()})
+    for i, alias in enumerate(COLUMNAS_DRIVERS):
+        df[COLS_DRIVERS[alias]] = pd.Series([fila[i] for fila in filas], dtype=object)
+    return df
+
+
+def _ventas(periodos=PERIODOS) -> pd.DataFrame:
+    # Periodos intercalados: el resultado debe conservar el orden original de las filas
+    filas = [(periodo, *venta) for venta in VENTAS for periodo in periodos]
+    df = pd.DataFrame({col: ["x"] * len(filas) for col in COLS_VTAS.values()})
+    df[COLS_VTAS["anio_mes"]] = [fila[0] for fila in filas]
+    for alias in ("venta_dinero", "venta_kg", "venta_un"):
+        df[COLS_VTAS[alias]] = "1"
+    for i, alias in enumerate(COLUMNAS_VENTAS, start=1):
+        df[COLS_VTAS[alias]] = pd.Series([fila[i] for fila in filas], dtype=object)
+    return df
+
+
+class Entorno:
+    """Insumo de ventas en CSV, almacén y resultado en una carpeta temporal."""
+
+    def __init__(self, tmp_path: Path):
+        config_insumos = deepcopy(CONFIG["config_insumos"])
+        config_insumos["cache"] = {"activo": False}
+        config_insumos["lectura"] = {"csv": {"sep": ";", "encoding": "utf-8-sig"}}
+        self.procesador = ProcesarInsumos(config_insumos=config_insumos, dict_cols=CONFIG["dict_cols"])
+        self.path_vtas = tmp_path / "ventas.csv"
+        self.out_path = str(tmp_path / "resultado")
+        self.cfg_result = {"formatos": ["parquet", "csv"]}
+        self.cfg_incremental = {"path_store": str(tmp_path / "Incremental"), "col_periodo": "anio_mes"}
+
+    def escribir_ventas(self, df: pd.DataFrame) -> None:
+        df.to_csv(self.path_vtas, sep=";", encoding="utf-8-sig", index=False)
+
+    def homologar(self, df_drivers: pd.DataFrame, reglas=REGLAS) -> dict:
+        reporte = ReporteEjecucion()
+        verificador = crear_verificador(df_drivers, CONFIG["dict_cols"], reglas, cfg_canon=self.procesador.cfg_canon)
+        homologar_incremental(
+            self.procesador, verificador, str(self.path_vtas), self.cfg_result, self.out_path, self.cfg_incremental, reporte
+        )
+        return reporte.datos["incremental"]
+
+    def almacen(self) -> AlmacenPeriodos:
+        return AlmacenPeriodos(self.cfg_incremental["path_store"], self.path_vtas.stem)
+
+    def resultado(self) -> pd.DataFrame:
+        return pd.read_parquet(f"{self.out_path}.parquet")
+
+
+@pytest.fixture
+def entorno(tmp_path) -> Entorno:
+    entorno = Entorno(tmp_path)
+    entorno.escribir_ventas(_ventas())
+    assert entorno.homologar(_drivers())["recalculados"] == PERIODOS
+    return entorno
+
+
+def test_sin_cambios_no_recalcula_ni_exporta(entorno):
+    previo = entorno.resultado()
+    info = entorno.homologar(_drivers())
+    assert info["recalculados"] == []
+    assert info["exportacion"] == "omitida"
+    pd.testing.assert_frame_equal(entorno.resultado(), previo)
+
+
+def test_un_periodo_modificado_recalcula_solo_ese_periodo(entorno, tmp_path):
+    df_vtas = _ventas()
+    df_vtas.loc[df_vtas[COLS_VTAS["anio_mes"]] == "2025/02", COLS_VTAS["codigo_ecom"]] = "NUEVO"
+    entorno.escribir_ventas(df_vtas)
+
+    info = entorno.homologar(_drivers())
+    assert info["recalculados"] == ["2025/02"]
+    assert "exportacion" not in info
+
+    # El resultado armado desde el almacén es el de una ejecución desde cero
+    (tmp_path / "completo").mkdir()
+    completo = Entorno(tmp_path / "completo")
+    completo.escribir_ventas(df_vtas)
+    completo.homologar(_drivers())
+    pd.testing.assert_frame_equal(entorno.resultado(), completo.resultado())
+
+
+@pytest.mark.parametrize("cambio", ["drivers", "reglas"])
+def test_cambio_de_drivers_o_reglas_recalcula_todos_los_periodos(entorno, cambio):
+    if cambio == "drivers":
+        info = entorno.homologar(_drivers([DRIVERS[0], ("A2", "CAMBIO A2", "200", "ALT200", "J200", "Jefe 200")]))
+    else:
+        reglas = deepcopy(REGLAS)
+        reglas["salidas"][0]["defecto"] = {"literal": "OK!"}
+        info = entorno.homologar(_drivers(), reglas)
+    assert info["recalculados"] == PERIODOS
+    assert "exportacion" not in info
+
+
+@pytest.mark.parametrize("accion", ["eliminar", "tocar"])
+def test_archivo_de_salida_alterado_se_exporta_de_nuevo(entorno, accion):
+    path = Path(f"{entorno.out_path}.csv")
+    if accion == "eliminar":
+        path.unlink()
+    else:
+        estado = path.stat()
+        os.utime(path, ns=(estado.st_atime_ns, estado.st_mtime_ns + 1_000_000_000))
+
+    info = entorno.homologar(_drivers())
+    assert info["recalculados"] == []
+    assert "exportacion" not in info
+    assert path.is_file()
+    assert entorno.homologar(_drivers())["exportacion"] == "omitida"
+
+
+def test_periodo_eliminado_se_purga(entorno):
+    archivo = entorno.almacen().manifiesto["2025/03"]["archivo"]
+    entorno.escribir_ventas(_ventas(PERIODOS[:2]))
+
+    info = entorno.homologar(_drivers())
+    assert info["recalculados"] == []
+    assert "exportacion" not in info
+    almacen = entorno.almacen()
+    assert set(almacen.manifiesto) == set(PERIODOS[:2])
+    assert not (almacen.path / archivo).exists()
+    assert set(entorno.resultado()[COLS_VTAS["anio_mes"]]) == set(PERIODOS[:2])
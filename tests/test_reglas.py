@@ -0,0 +1,124 @@
+# Reglas del semáforo: las reglas configuradas (pandas y polars) y la fórmula Excel deben dar
+# los mismos valores que la implementación original de VerificadorCodigos.
+from importlib.util import find_spec
+from pathlib import Path
+import numpy as np
+import pandas as pd
+import pytest
+from Utils.exclusive_functions import IndiceDrivers, VerificadorCodigos
+from Utils.general_functions import procesar_configuracion
+from Utils.transformation_functions import aplicar_esquema
+
+CONFIG = procesar_configuracion(str(Path(__file__).resolve().parents[1] / "Controllers" / "settings" / "config.yml"))
+COLS_VTAS = CONFIG["dict_cols"]["cols_ventas"]
+COLS_DRIVERS = CONFIG["dict_cols"]["cols_drivers"]
+N = np.nan
+
+# Cod SAP, Cambio Cod ECOM a CRM, Cod Actual, Cod Cliente.1, Cód. Jefe de Ventas, Jefe de Ventas
+DRIVERS = [
+    ("A1", "CAMBIO A1", "100", "ALT100", "J100", "Jefe 100"),
+    ("A2", N, "200", N, N, N),                                   # cliente sin valores: respaldo
+    (N, "CAMBIO NULO", "300", "ALT300", "J300", "Jefe 300"),     # Cod SAP vacío
+    ("A1", "CAMBIO A1", "400", "ALT400", "J400", "Jefe 400"),    # Cod SAP repetido (un agente, varios clientes)
+    ("A3", "CAMBIO A3", "500", "ALT500a", "J500a", "Jefe 500a"),
+    ("A3", "CAMBIO A3", "500", "ALT500b", "J500b", "Jefe 500b"), # Cod Actual repetido: gana la última
+]
+
+# (Tipo de Venta, Agente Comercial - Clave, Agente Comercial, Cliente - Clave, Código ECOM)
+# → (status, Código ECOM, Agente Comercial - Clave, Agente Comercial) de la implementación original
+CASOS = [
+    (("D", "A1", "Ana", "100", "E0"), ("OK", "E0", "A1", "Ana")),
+    (("I", "A1", "Ana", "100", "E1"), ("CAMBIO A1", "ALT100", "A1", "Ana")),
+    (("I", "A9", "Ana", "999", "E2"), ("OK", "E2", "A9", "Ana")),
+    (("I", "A2", "Ana", "200", "E3"), ("OK", "E3", "A2", "Ana")),
+    (("I", "#", "Beto", "100", "E4"), ("SIN COD AC CORREGIDO", "ALT100", "#", "Beto")),
+    (("I", "#", "Sin asignar", "100", "E5"), ("SIN COD AC CORREGIDO", "ALT100", "J100", "Jefe 100")),
+    (("I", "#", "Sin asignar", "999", "E6"), ("SIN COD AC", "E6", "#", "Sin asignar")),
+    (("D", "#", "Sin asignar", "100", "E7"), ("OK", "E7", "#", "Sin asignar")),
+    (("I", N, "Sin asignar", N, "E8"), ("CAMBIO NULO", "E8", None, "Sin asignar")),
+    ((N, "A1", "Ana", "100", "E9"), ("OK", "E9", "A1", "Ana")),
+    (("I", "A3", "Sin asignar", "500", N), ("CAMBIO A3", "ALT500b", "J500b", "Jefe 500b")),
+    (("I", "A1", "Sin asignar", "200", "E11"), ("CAMBIO A1", "E11", "A1", "Sin asignar")),
+]
+# Cada caso se repite para que la ruta deduplicada agrupe filas
+REPETICIONES = 3
+
+MOTORES = [
+    pytest.param(None, id="formula"),
+    pytest.param("pandas", id="pandas"),
+    pytest.param("polars", id="polars", marks=pytest.mark.skipif(find_spec("polars") is None, reason="polars no instalado")),
+]
+
+
+def _drivers() -> pd.DataFrame:
+    columnas = ["cod_sap", "cambio_cod_ecom_crm", "cod_actual", "cod_cliente_alt", "cod_jefe_ventas", "jefe_ventas"]
+    df = pd.DataFrame({col: pd.Series([N] * len(DRIVERS), dtype=object) for col in COLS_DRIVERS.values()})
+    for i, alias in enumerate(columnas):
+        df[COLS_DRIVERS[alias]] = pd.Series([fila[i] for fila in DRIVERS], dtype=object)
+    return df
+
+
+def _ventas(tipado: bool) -> pd.DataFrame:
+    columnas = ["tipo_venta", "agente_comercial_clave", "agente_comercial", "cliente_clave", "codigo_ecom"]
+    filas = [entrada for entrada, _ in CASOS] * REPETICIONES
+    df = pd.DataFrame({col: ["x"] * len(filas) for col in COLS_VTAS.values()})
+    for alias in ("venta_dinero", "venta_kg", "venta_un"):
+        df[COLS_VTAS[alias]] = "1"
+    for i, alias in enumerate(columnas):
+        df[COLS_VTAS[alias]] = pd.Series([fila[i] for fila in filas], dtype=object)
+    if tipado:
+        df = aplicar_esquema(df, CONFIG["config_insumos"]["base_vtas"]["esquema"], COLS_VTAS)
+    return df
+
+
+@pytest.mark.parametrize("tipado", [False, True], ids=["texto", "esquema"])
+@pytest.mark.parametrize("deduplicar", [True, False], ids=["deduplicado", "filas"])
+@pytest.mark.parametrize("motor", MOTORES)
+def test_aplicar_igual_a_implementacion_original(motor, deduplicar, tipado):
+    verificador = VerificadorCodigos(
+        df_vtas=_ventas(tipado),
+        df_drivers=_drivers(),
+        cols_vtas=COLS_VTAS,
+        cols_drivers=COLS_DRIVERS,
+        reglas=CONFIG["reglas_homologacion"] if motor else None,
+        deduplicar=deduplicar,
+        motor_reglas=motor,
+    )
+    salidas = ["status", COLS_VTAS["codigo_ecom"], COLS_VTAS["agente_comercial_clave"], COLS_VTAS["agente_comercial"]]
+    assert verificador.columnas_salida() == salidas
+
+    df = verificador.aplicar()[salidas]
+    obtenido = [tuple(fila) for fila in df.astype(object).where(df.notna(), None).itertuples(index=False)]
+    assert obtenido == [esperado for _, esperado in CASOS] * REPETICIONES
+
+
+def test_busquedas_configuradas_iguales_a_formula():
+    assert sorted(VerificadorCodigos.busquedas_de(CONFIG["reglas_homologacion"])) == sorted(VerificadorCodigos.BUSQUEDAS)
+
+
+@pytest.mark.parametrize("motor", MOTORES)
+def test_claves_de_ventas_se_normalizan_solo_al_buscar(motor):
+    cfg_canon = CONFIG["config_insumos"]["canonicalizacion"]
+    sucias = [" 100", "0100", "100.0", " 100 "]
+    df_vtas = _ventas(tipado=False).iloc[: len(sucias)].copy()
+    df_vtas[COLS_VTAS["tipo_venta"]] = "I"
+    df_vtas[COLS_VTAS["agente_comercial"]] = "Sin asignar"
+    df_vtas[COLS_VTAS["agente_comercial_clave"]] = [" A1", "A1 ", "A1", "A9"]
+    df_vtas[COLS_VTAS["cliente_clave"]] = sucias
+    df_drivers = _drivers()
+    verificador = VerificadorCodigos(
+        df_vtas=df_vtas,
+        df_drivers=df_drivers,
+        cols_vtas=COLS_VTAS,
+        cols_drivers=COLS_DRIVERS,
+        indice=IndiceDrivers(df_drivers, COLS_DRIVERS, VerificadorCodigos.busquedas_de(CONFIG["reglas_homologacion"]), cfg_canon),
+        reglas=CONFIG["reglas_homologacion"] if motor else None,
+        deduplicar=False,
+        motor_reglas=motor,
+    )
+    df = verificador.aplicar()
+    # Los cruces encuentran "100" y "A1"; las claves de ventas quedan como venían
+    assert list(df[COLS_VTAS["cliente_clave"]]) == sucias
+    assert list(df[COLS_VTAS["codigo_ecom"]]) == ["ALT100"] * 4
+    assert list(df[COLS_VTAS["agente_comercial_clave"]]) == ["J100"] * 4
+    assert list(df["status"]) == ["CAMBIO A1", "CAMBIO A1", "CAMBIO A1", "OK"]